@@ -0,0 +1,111 @@
+"""
+bench_fairness_encoding.py
+
+Before/after benchmark of feature encoding for fairness model training.
+Compares peak memory (tracemalloc) and encode/fit time of:
+    - dense, dropped: pd.get_dummies with high-cardinality columns dropped (previous behaviour)
+    - dense, all:     pd.get_dummies keeping every attribute
+    - sparse, all:    OneHotEncoder CSR matrix keeping every attribute (current default)
+Numeric columns are scaled the same way in every case, so the differences come from the
+encoding and the attributes kept, not from feature scaling.
+
+Uses a seeded synthetic frame shaped like the Adult census dataset so it runs offline.
+Pass --adult to benchmark on the real dataset via fairlearn.datasets.fetch_adult.
+
+Usage:
+    python benchmarks/bench_fairness_encoding.py [--rows 200000] [--adult]
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+
+from src.compliance_checker.model_audit import (
+    encode_fairness_features,
+    FAIRNESS_SENSITIVE_COLUMNS,
+    DENSE_DROPPED_COLUMNS,
+)
+
+CATEGORY_SIZES = {
+    "workclass": 9,
+    "education": 16,
+    "marital-status": 7,
+    "occupation": 15,
+    "relationship": 6,
+    "race": 5,
+    "sex": 2,
+    "native-country": 42,
+}
+
+
+def synthetic_adult(rows: int, seed: int = 42):
+    """
+    Generates an Adult-like feature frame and binary target with the same categorical cardinalities.
+    """
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({
+        "age": rng.integers(17, 90, rows),
+        "fnlwgt": rng.integers(10_000, 1_500_000, rows),
+        "capital-gain": rng.exponential(500, rows).astype(int),
+        "capital-loss": rng.exponential(80, rows).astype(int),
+        "hours-per-week": rng.integers(1, 99, rows),
+    })
+    for column, size in CATEGORY_SIZES.items():
+        codes = rng.zipf(1.5, rows) % size
+        frame[column] = pd.Categorical.from_codes(codes, [f"{column}-{i}" for i in range(size)])
+    logits = (frame["age"] - 40) / 15 + (frame["hours-per-week"] - 40) / 20
+    target = (rng.random(rows) < 1 / (1 + np.exp(-logits))).astype(int)
+    return frame, pd.Series(target)
+
+
+def load_adult():
+    from fairlearn.datasets import fetch_adult
+
+    data = fetch_adult(as_frame=True)
+    return data.data.drop(columns=["education-num"]), (data.target == ">50K").astype(int)
+
+
+def run_case(X, y, drop_columns, sparse):
+    """
+    Encodes and fits a LogisticRegression, returning (seconds, peak_bytes, n_features).
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    features = encode_fairness_features(X.drop(columns=drop_columns), sparse=sparse)
+    LogisticRegression(max_iter=1000).fit(features, y)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, features.shape[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000, help="rows of synthetic data")
+    parser.add_argument("--adult", action="store_true", help="use the real Adult dataset (downloads it)")
+    args = parser.parse_args()
+
+    X, y = load_adult() if args.adult else synthetic_adult(args.rows)
+    cases = [
+        ("dense, dropped", DENSE_DROPPED_COLUMNS, False),
+        ("dense, all", FAIRNESS_SENSITIVE_COLUMNS, False),
+        ("sparse, all", FAIRNESS_SENSITIVE_COLUMNS, True),
+    ]
+
+    print(f"rows={len(X)}")
+    print(f"{'case':<16}{'features':>10}{'fit time (s)':>14}{'peak MiB':>12}")
+    for name, drop_columns, sparse in cases:
+        elapsed, peak, n_features = run_case(X, y, drop_columns, sparse)
+        print(f"{name:<16}{n_features:>10}{elapsed:>14.2f}{peak / 2**20:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
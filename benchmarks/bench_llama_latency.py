@@ -0,0 +1,56 @@
+"""
+bench_llama_latency.py
+
+Cold vs warm latency of local LLaMA summaries.
+Compares:
+    - reload per call: a new Llama(model_path=...) for every summary (previous behaviour)
+    - managed:         llama_manager keeps the model resident; the first request is cold
+                       (includes the load), later requests are warm
+
+Requires llama-cpp-python and a GGUF model file.
+
+Usage:
+    python benchmarks/bench_llama_latency.py --model models/llama-2-7b.Q4_K_M.gguf [--requests 3]
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import time
+import argparse
+
+from compliance_checker.llama_manager import Llama, LlamaModelManager
+
+PROMPT = "Write one sentence summarizing: 3 storage accounts are missing the 'env' tag."
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", required=True, help="path of the GGUF model file")
+    parser.add_argument("--requests", type=int, default=3)
+    parser.add_argument("--max-tokens", type=int, default=32)
+    args = parser.parse_args()
+    if Llama is None:
+        sys.exit("llama-cpp-python is not installed.")
+
+    print(f"{'case':<18}{'request':>8}{'seconds':>10}")
+    for i in range(args.requests):
+        start = time.perf_counter()
+        Llama(model_path=args.model, verbose=False)(PROMPT, max_tokens=args.max_tokens)
+        print(f"{'reload per call':<18}{i + 1:>8}{time.perf_counter() - start:>10.2f}")
+
+    manager = LlamaModelManager(args.model, idle_timeout=0, verbose=False)
+    for i in range(args.requests):
+        start = time.perf_counter()
+        manager.generate(PROMPT, max_tokens=args.max_tokens)
+        print(f"{'managed':<18}{i + 1:>8}{time.perf_counter() - start:>10.2f}")
+
+    stats = manager.stats()
+    print(f"load: {stats['last_load_seconds']:.2f} s, cold mean: {stats['cold']['mean_seconds']:.2f} s, "
+          f"warm mean: {(stats['warm']['mean_seconds'] or 0):.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+bench_pii_redaction.py
+
+Throughput benchmark of PII redaction on synthetic logs. Reports MB/s of:
+    - scan_text_for_pii:  the existing text scanner (match only), for reference
+    - find_pii_spans:     the bytes matcher used by redaction (match only)
+    - redact mask/token:  pii_redact.redact_file on one file, i.e. per core
+    - redact_files:       several files redacted in parallel worker processes
+
+Usage:
+    python benchmarks/bench_pii_redaction.py [--mib 32] [--files 8] [--workers 4]
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import time
+import shutil
+import argparse
+import tempfile
+
+from benchmarks import synthetic
+from compliance_checker import pii_scan, pii_redact
+
+# Average bytes per synthetic log line.
+LINE_BYTES = 100
+
+
+def throughput(func, size, repeats):
+    """
+    Returns the best MB/s of func() processing size bytes.
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return size / best / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mib", type=int, default=32, help="size of each log file")
+    parser.add_argument("--files", type=int, default=8, help="files for the parallel case")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--density", type=float, default=0.05, help="fraction of lines containing PII")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    text = synthetic.generate_log_text(args.mib * 2**20 // LINE_BYTES, pii_density=args.density, seed=args.mib)
+    data = text.encode()
+    work_dir = tempfile.mkdtemp()
+    try:
+        paths = []
+        for i in range(args.files):
+            path = os.path.join(work_dir, "logs", f"app-{i}.log")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(data)
+            paths.append(path)
+        output_dir = os.path.join(work_dir, "redacted")
+        key = b"benchmark-key"
+
+        cases = [
+            ("scan_text_for_pii", lambda: pii_scan.scan_text_for_pii(text), len(data)),
+            ("find_pii_spans", lambda: pii_scan.find_pii_spans(data), len(data)),
+            ("redact mask", lambda: pii_redact.redact_file(paths[0], os.path.join(output_dir, "one.log")), len(data)),
+            ("redact token", lambda: pii_redact.redact_file(paths[0], os.path.join(output_dir, "one.log"), "token", key),
+             len(data)),
+            (f"redact_files x{args.workers}", lambda: pii_redact.redact_files(paths, output_dir, "token", key, args.workers),
+             len(data) * len(paths)),
+        ]
+        print(f"file={len(data) / 2**20:.1f} MiB density={args.density} files={args.files}")
+        print(f"{'case':<22}{'MB/s':>10}")
+        for name, func, size in cases:
+            repeats = 1 if name == "scan_text_for_pii" else args.repeats
+            print(f"{name:<22}{throughput(func, size, repeats):>10.1f}")
+    finally:
+        shutil.rmtree(work_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+bench_report_rendering.py
+
+Before/after benchmark of saving a compliance report in JSON, Markdown and HTML.
+Compares wall time and peak memory (tracemalloc) of:
+    - separate passes: the exporters agentic_ai used before the single-pass renderer, copied
+                       below: export_report_to_file (json.dump), export_report_to_markdown
+                       (one write per line) and the list-and-join generate_html_report, each
+                       walking the results on its own
+    - single pass:     generate_reports, which normalizes the results once and feeds all three sinks
+
+The LLM summary and the Blob upload are stubbed out so only rendering is measured. The old
+Markdown exporter only knows the infra_scan, model_audit and pii_scan keys, so the tag policy
+findings are rendered by the single pass only.
+
+Usage:
+    python benchmarks/bench_report_rendering.py [--findings 200000] [--repeats 3]
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import io
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import contextlib
+import tracemalloc
+from html import escape
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from benchmarks import synthetic
+from compliance_checker import report
+
+
+def export_report_to_file(results, file_path):
+    # agentic_ai.export_report_to_file before the single-pass renderer
+    with open(file_path, "w") as f:
+        json.dump(results, f, indent=4)
+
+
+def export_report_to_markdown(results, file_path):
+    # agentic_ai.export_report_to_markdown before the single-pass renderer
+    with open(file_path, "w") as f:
+        f.write("# Compliance Report Summary\n\n")
+
+        infra = results.get('infra_scan', {})
+        f.write("## Infrastructure Scan\n\n")
+        summary = infra.get('summary', {})
+        f.write(f"- Total Resources Scanned: {summary.get('total', 0)}\n")
+        f.write(f"- Non-Compliant Resources: {summary.get('non_compliant', 0)}\n\n")
+
+        if infra.get('non_compliant_resources'):
+            f.write("### Non-Compliant Resources\n")
+            for resource in infra['non_compliant_resources']:
+                f.write(f"- **{resource['resource_name']}** ({resource['resource_type']}):\n")
+                for issue in resource['issues']:
+                    f.write(f"  - {issue}\n")
+            f.write("\n")
+
+        model_audit = results.get('model_audit', [])
+        f.write("## AI Model Governance Audit\n\n")
+        if model_audit:
+            for issue in model_audit:
+                f.write(f"- {issue}\n")
+        else:
+            f.write("No issues detected.\n")
+        f.write("\n")
+
+        pii_scan = results.get('pii_scan', {})
+        f.write("## PII Data Exposure Scan\n\n")
+        if any(pii_scan.values()):
+            for pii_type, items in pii_scan.items():
+                if items:
+                    f.write(f"- **{pii_type.capitalize()}**:\n")
+                    for item in items:
+                        f.write(f"  - {item}\n")
+        else:
+            f.write("No PII detected.\n")
+
+
+def generate_html_report(results, output_path):
+    # report.generate_html_report before the single-pass renderer, without the summary and upload
+    summary = report.clean_markdown(report.generate_summary_with_local_llama(results))
+    timestamp = datetime.now(timezone.utc).isoformat() + "Z"
+
+    html_parts = [
+        "<!DOCTYPE html>",
+        "<html lang='en'>",
+        "<head>",
+        "  <meta charset='UTF-8'>",
+        "  <meta name='viewport' content='width=device-width, initial-scale=1.0'>",
+        "  <title>Compliance Report</title>",
+        "  <style>",
+        "    body { font-family: Arial, sans-serif; margin: 20px; padding: 0; background: #f9f9f9; }",
+        "    h1, h2, h3 { color: #2c3e50; }",
+        "    pre { background: #ecf0f1; padding: 10px; border-radius: 5px; }",
+        "    ul { list-style-type: disc; margin-left: 20px; }",
+        "    hr { border: none; border-top: 1px solid #bdc3c7; margin: 20px 0; }",
+        "  </style>",
+        "</head>",
+        "<body>",
+        f"<h1>Compliance Report</h1>",
+        f"<p><em>Generated: {timestamp}</em></p>",
+        "<hr>",
+        "<h2>Executive Summary</h2>",
+        f"<p>{escape(summary)}</p>",
+        "<hr>"
+    ]
+
+    for module_name, findings in results.items():
+        html_parts.append(f"<h2>{escape(module_name.capitalize())} Scan Results</h2>")
+
+        if not findings:
+            html_parts.append("<p>No issues detected.</p>")
+            continue
+
+        if isinstance(findings, dict):
+            for key, value in findings.items():
+                html_parts.append(f"<h3>{escape(key)}</h3>")
+                if isinstance(value, list) and value:
+                    html_parts.append("<ul>")
+                    for item in value:
+                        html_parts.append(f"<li>{escape(str(item))}</li>")
+                    html_parts.append("</ul>")
+                else:
+                    html_parts.append(f"<p>{escape(str(value))}</p>")
+        elif isinstance(findings, list):
+            html_parts.append("<ul>")
+            for item in findings:
+                if isinstance(item, dict):
+                    item_str = ", ".join(f"{escape(str(k))}: {escape(str(v))}" for k, v in item.items())
+                    html_parts.append(f"<li>{item_str}</li>")
+                else:
+                    html_parts.append(f"<li>{escape(str(item))}</li>")
+            html_parts.append("</ul>")
+        else:
+            html_parts.append(f"<p>{escape(str(findings))}</p>")
+
+    html_parts.append("</body></html>")
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(html_parts))
+
+
+def separate_passes(results, output_dir):
+    # agentic_ai stored the infrastructure results under "infra_scan"
+    agentic_results = {"infra_scan" if name == "infrastructure" else name: findings for name, findings in results.items()}
+    export_report_to_file(agentic_results, os.path.join(output_dir, "report.json"))
+    export_report_to_markdown(agentic_results, os.path.join(output_dir, "report.md"))
+    generate_html_report(agentic_results, os.path.join(output_dir, "report.html"))
+
+
+def single_pass(results, output_dir):
+    report.generate_reports(results, output_dir=output_dir, basename="report", formats=("json", "markdown", "html"))
+
+
+def run_case(func, results, output_dir, repeats):
+    """
+    Returns (best seconds, peak bytes) of func(results, output_dir).
+    """
+    best = float("inf")
+    with patch.object(report, "generate_summary_with_local_llama", return_value="Benchmark summary."), \
+            patch.object(report, "AZURE_STORAGE_CONNECTION_STRING", None), \
+            contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeats):
+            start = time.perf_counter()
+            func(results, output_dir)
+            best = min(best, time.perf_counter() - start)
+        tracemalloc.start()
+        func(results, output_dir)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--findings", type=int, default=200_000, help="approximate number of findings")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    results = synthetic.generate_results(args.findings, seed=args.findings)
+    output_dir = tempfile.mkdtemp()
+    try:
+        print(f"findings={args.findings}")
+        print(f"{'case':<18}{'time (s)':>10}{'peak MiB':>12}")
+        for name, func in [("separate passes", separate_passes), ("single pass", single_pass)]:
+            elapsed, peak = run_case(func, results, output_dir, args.repeats)
+            print(f"{name:<18}{elapsed:>10.2f}{peak / 2**20:>12.1f}")
+    finally:
+        shutil.rmtree(output_dir)
+
+
+if __name__ == "__main__":
+    main()
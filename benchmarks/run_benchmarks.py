@@ -0,0 +1,191 @@
+"""
+run_benchmarks.py
+
+Benchmark suite for the compliance checker hot paths, run on seeded synthetic data at several input sizes:
+scan_text_for_pii, scan_resources, check_required_tags, audit_model, generate_markdown_report
+and generate_html_report (with the LLM summary and Blob upload stubbed out).
+
+Each case reports the best of several repeats. Results can be stored as baselines and later
+compared against them; a case regresses when it is slower than its baseline by more than the
+threshold (and by more than a small absolute margin, to ignore timer noise on tiny cases).
+Baselines are machine-specific: regenerate them on the machine that runs the check.
+
+Usage:
+    python benchmarks/run_benchmarks.py                   # run and print timings
+    python benchmarks/run_benchmarks.py --save-baseline   # store timings in benchmarks/baselines.json
+    python benchmarks/run_benchmarks.py --check           # exit 1 if any case regressed
+    python benchmarks/run_benchmarks.py --quick --only pii
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import io
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import contextlib
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+from unittest.mock import patch
+
+from benchmarks import synthetic
+from compliance_checker import pii_scan, infra_scan, tag_policy, model_audit, report
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+DEFAULT_THRESHOLD = 0.25
+# Regressions smaller than this many seconds are treated as noise.
+MIN_REGRESSION_SECONDS = 0.002
+
+
+class Benchmark(NamedTuple):
+    """
+    A benchmarked function: setup(size) returns the positional arguments for func.
+    """
+    name: str
+    func: Callable[..., Any]
+    setup: Callable[[int], tuple]
+    sizes: Tuple[int, ...]
+
+
+def _report_args(size: int) -> tuple:
+    return (synthetic.generate_results(size, seed=size),)
+
+
+def _markdown_report(output_dir: str) -> Callable[[Dict[str, Any]], None]:
+    def run(results):
+        report.generate_markdown_report(results, output_path=os.path.join(output_dir, "report.md"))
+    return run
+
+
+def _html_report(output_dir: str) -> Callable[[Dict[str, Any]], None]:
+    def run(results):
+        with patch.object(report, "generate_summary_with_local_llama", return_value="Benchmark summary."), \
+                patch.object(report, "AZURE_STORAGE_CONNECTION_STRING", None):
+            report.generate_html_report(results, output_path=os.path.join(output_dir, "index.html"))
+    return run
+
+
+def _audit_registry(models: List[Dict[str, Any]]) -> List[List[str]]:
+    return [model_audit.audit_model(model) for model in models]
+
+
+def build_benchmarks(output_dir: str) -> List[Benchmark]:
+    """
+    Returns the benchmark cases. Report benchmarks write into output_dir.
+    """
+    return [
+        Benchmark("scan_text_for_pii", pii_scan.scan_text_for_pii,
+                  lambda n: (synthetic.generate_log_text(n, pii_density=0.05, seed=n),), (1_000, 10_000, 100_000)),
+        Benchmark("scan_resources", infra_scan.scan_resources,
+                  lambda n: (synthetic.generate_resources(n, seed=n),), (1_000, 10_000, 100_000)),
+        Benchmark("check_required_tags", tag_policy.check_required_tags,
+                  lambda n: (synthetic.generate_resources(n, seed=n),), (1_000, 10_000, 100_000)),
+        Benchmark("audit_model", _audit_registry,
+                  lambda n: (synthetic.generate_model_registry(n, seed=n),), (100, 1_000, 10_000)),
+        Benchmark("generate_markdown_report", _markdown_report(output_dir), _report_args, (1_000, 10_000, 100_000)),
+        Benchmark("generate_html_report", _html_report(output_dir), _report_args, (1_000, 10_000, 100_000)),
+    ]
+
+
+def time_call(func: Callable[..., Any], args: tuple, repeats: int) -> float:
+    """
+    Returns the best wall time in seconds of func(*args) over the given number of repeats.
+    Output printed by func is suppressed.
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func(*args)
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmarks(benchmarks: List[Benchmark], repeats: int = 5, quick: bool = False) -> Dict[str, float]:
+    """
+    Runs every benchmark at each of its sizes (all but the largest in quick mode).
+    Returns timings keyed by "<name>[<size>]".
+    """
+    timings = {}
+    for benchmark in benchmarks:
+        sizes = benchmark.sizes[:-1] if quick else benchmark.sizes
+        for size in sizes:
+            key = f"{benchmark.name}[{size}]"
+            timings[key] = time_call(benchmark.func, benchmark.setup(size), repeats)
+            print(f"{key:<40}{timings[key] * 1000:>12.2f} ms")
+    return timings
+
+
+def find_regressions(
+    timings: Dict[str, float],
+    baselines: Dict[str, float],
+    threshold: float = DEFAULT_THRESHOLD
+) -> List[str]:
+    """
+    Returns a description of every case slower than its baseline by more than the threshold.
+    Cases without a baseline are ignored.
+    """
+    regressions = []
+    for key, seconds in timings.items():
+        baseline = baselines.get(key)
+        if baseline is None:
+            continue
+        if seconds > baseline * (1 + threshold) and seconds - baseline > MIN_REGRESSION_SECONDS:
+            regressions.append(f"{key}: {seconds * 1000:.2f} ms vs baseline {baseline * 1000:.2f} ms "
+                               f"(+{(seconds / baseline - 1) * 100:.0f}%)")
+    return regressions
+
+
+def load_baselines(path: str = BASELINE_PATH) -> Dict[str, float]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baselines(timings: Dict[str, float], path: str = BASELINE_PATH) -> None:
+    baselines = load_baselines(path)
+    baselines.update(timings)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(dict(sorted(baselines.items())), f, indent=2)
+        f.write("\n")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="skip the largest input size")
+    parser.add_argument("--only", help="run only benchmarks whose name contains this string")
+    parser.add_argument("--save-baseline", action="store_true", help="store timings as baselines")
+    parser.add_argument("--check", action="store_true", help="fail if any case regressed against its baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown as a fraction of the baseline (default 0.25)")
+    args = parser.parse_args()
+
+    output_dir = tempfile.mkdtemp()
+    try:
+        benchmarks = [b for b in build_benchmarks(output_dir) if not args.only or args.only in b.name]
+        timings = run_benchmarks(benchmarks, repeats=args.repeats, quick=args.quick)
+    finally:
+        shutil.rmtree(output_dir)
+
+    if args.save_baseline:
+        save_baselines(timings)
+        print(f"Baselines saved to {BASELINE_PATH}")
+    if args.check:
+        regressions = find_regressions(timings, load_baselines(), args.threshold)
+        if regressions:
+            print("Performance regressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("No performance regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+synthetic.py
+
+Seeded synthetic data generators for benchmarks: application logs with a controlled PII density,
+Azure resource inventories, model metadata registries and compliance result sets.
+The same seed always produces the same data.
+
+Functions:
+    - generate_log_text: Log lines, a given fraction of which contain a PII value.
+    - generate_json_log_lines: Structured JSON log lines with numeric IDs, a fraction of which contain a PII value.
+    - generate_resources: Azure resource inventory with a mix of complete and missing tags.
+    - generate_model_registry: Model metadata dicts as consumed by model_audit.audit_model.
+    - generate_results: A results dict shaped like main.run_all_checks output.
+"""
+
+import json
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+RESOURCE_TYPES = [
+    "Microsoft.Compute/virtualMachines",
+    "Microsoft.Storage/storageAccounts",
+    "Microsoft.Sql/servers/databases",
+    "Microsoft.Network/virtualNetworks",
+    "Microsoft.KeyVault/vaults",
+    "Microsoft.Web/sites",
+]
+TAG_VALUES = {"env": ["prod", "dev", "test"], "owner": ["teamA", "teamB", "teamC"], "cost_center": ["1234", "5678"]}
+LOG_LEVELS = ["INFO", "INFO", "INFO", "WARN", "ERROR", "DEBUG"]
+LOG_MESSAGES = [
+    "request completed status=200 duration_ms={n}",
+    "cache miss key=session:{n}",
+    "retrying upstream call attempt={n}",
+    "user profile updated fields={n}",
+    "batch job finished records={n}",
+]
+
+
+def _pii_value(rng: random.Random) -> str:
+    kind = rng.choice(["email", "phone", "ssn", "credit_card"])
+    if kind == "email":
+        return f"user{rng.randint(1, 99999)}@example{rng.randint(1, 50)}.com"
+    if kind == "phone":
+        return f"+61-4{rng.randint(10, 99)}-{rng.randint(100, 999)}-{rng.randint(100, 999)}"
+    if kind == "ssn":
+        return f"{rng.randint(100, 899)}-{rng.randint(10, 99)}-{rng.randint(1000, 9999)}"
+    return " ".join(f"{rng.randint(1000, 9999)}" for _ in range(4))
+
+
+def generate_log_text(lines: int, pii_density: float = 0.05, seed: int = 0) -> str:
+    """
+    Generates log text with the given number of lines; pii_density is the fraction of lines
+    that contain one PII value (email, phone, SSN or credit card number).
+    """
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    out = []
+    for i in range(lines):
+        timestamp = (start + timedelta(seconds=i)).isoformat()
+        message = rng.choice(LOG_MESSAGES).format(n=rng.randint(1, 5000))
+        line = f"{timestamp}Z {rng.choice(LOG_LEVELS)} svc=api-{rng.randint(1, 9)} req={rng.getrandbits(48):012x} {message}"
+        if rng.random() < pii_density:
+            line += f" contact={_pii_value(rng)}"
+        out.append(line)
+    return "\n".join(out) + "\n"
+
+
+def generate_json_log_lines(lines: int, pii_density: float = 0.05, seed: int = 0) -> str:
+    """
+    Generates JSON-lines logs (one object per line) with the given number of lines. Records carry
+    long numeric IDs and nested request data; pii_density is the fraction of records holding one
+    PII value, in the "user.contact" field or in the "message" text.
+    """
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    out = []
+    for i in range(lines):
+        record = {
+            "ts": (start + timedelta(seconds=i)).isoformat() + "Z",
+            "level": rng.choice(LOG_LEVELS),
+            "svc": f"api-{rng.randint(1, 9)}",
+            "trace_id": f"{rng.getrandbits(64):016x}",
+            "account_id": rng.randint(10**11, 10**12 - 1),
+            "request": {"method": "GET", "path": f"/v1/items/{rng.randint(1, 5000)}",
+                        "duration_ms": rng.randint(1, 5000), "bytes": rng.randint(10**9, 10**10)},
+            "user": {"id": rng.randint(10**9, 10**10 - 1)},
+            "message": rng.choice(LOG_MESSAGES).format(n=rng.randint(1, 5000)),
+        }
+        if rng.random() < pii_density:
+            value = _pii_value(rng)
+            if rng.random() < 0.5:
+                record["user"]["contact"] = value
+            else:
+                record["message"] += f" contact={value}"
+        out.append(json.dumps(record, separators=(",", ":")))
+    return "\n".join(out) + "\n"
+
+
+def generate_resources(count: int, tagged_ratio: float = 0.6, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Generates an Azure resource inventory. tagged_ratio is the fraction of resources carrying
+    all required tags; the rest miss a random subset.
+    """
+    rng = random.Random(seed)
+    resources = []
+    for i in range(count):
+        resource_type = rng.choice(RESOURCE_TYPES)
+        if rng.random() < tagged_ratio:
+            tag_names = list(TAG_VALUES)
+        else:
+            tag_names = [tag for tag in TAG_VALUES if rng.random() < 0.5]
+        name = f"{resource_type.split('/')[-1].lower()}-{i}"
+        resources.append({
+            "id": f"/subscriptions/00000000-0000-0000-0000-000000000000/resourceGroups/rg-{i % 50}/providers/{resource_type}/{name}",
+            "name": name,
+            "type": resource_type,
+            "tags": {tag: rng.choice(TAG_VALUES[tag]) for tag in tag_names},
+        })
+    return resources
+
+
+def generate_model_registry(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Generates model metadata dicts with varied training dates, group metrics and explainability tools.
+    """
+    rng = random.Random(seed)
+    now = datetime(2025, 1, 1)
+    models = []
+    for i in range(count):
+        precision = rng.uniform(0.7, 0.95)
+        models.append({
+            "name": f"model-{i}",
+            "last_trained": (now - timedelta(days=rng.randint(0, 120))).isoformat(),
+            "metrics": {
+                "precision_group_A": precision,
+                "precision_group_B": precision - rng.uniform(0, 0.2),
+                "recall_group_A": rng.uniform(0.6, 0.9),
+            },
+            "explainability_tools": rng.choice([[], ["SHAP"], ["SHAP", "LIME"]]),
+        })
+    return models
+
+
+def generate_results(findings: int, seed: int = 0) -> Dict[str, Any]:
+    """
+    Generates a results dict (infrastructure, model_audit, tag_policy, pii_scan) with roughly
+    the given total number of findings spread across the checks.
+    """
+    rng = random.Random(seed)
+    share = max(findings // 4, 1)
+    resources = generate_resources(share * 2, tagged_ratio=0.5, seed=seed)
+    untagged = [r for r in resources if "env" not in r["tags"]][:share]
+    missing = [r for r in resources if len(r["tags"]) < len(TAG_VALUES)][:share]
+    return {
+        "infrastructure": {
+            "summary": {"total": len(resources), "non_compliant": len(untagged)},
+            "non_compliant_resources": [
+                {"resource_name": r["name"], "resource_type": r["type"], "issues": ["Missing 'env' tag"]}
+                for r in untagged
+            ],
+        },
+        "model_audit": [
+            f"model-{i}: {rng.choice(['Model may be outdated (drift risk).', 'Explainability tools not documented for this model.'])}"
+            for i in range(share)
+        ],
+        "tag_policy": [
+            {
+                "resource_name": r["name"],
+                "resource_type": r["type"],
+                "missing_tags": [tag for tag in TAG_VALUES if tag not in r["tags"]],
+            }
+            for r in missing
+        ],
+        "pii_scan": {
+            "email": [f"user{i}@example.com" for i in range(share // 2)],
+            "phone": [f"+61-412-{i % 1000:03d}-{i % 997:03d}" for i in range(share // 4)],
+            "credit_card": [],
+            "ssn": [f"{100 + i % 800}-{10 + i % 89:02d}-{1000 + i % 8999:04d}" for i in range(share // 4)],
+        },
+    }
@@ -1,46 +1,72 @@
-from src.compliance_checker import infra_scan, model_audit, tag_policy, pii_scan, report
-
-def run_all_checks():
-    results = {}
-
-    try:
-        print("Running infrastructure scan...")
-        infra_results = infra_scan.scan_for_compliance()
-        print(f"Infrastructure findings: {infra_results}\n")
-        results["infrastructure"] = infra_results
-    except Exception as e:
-        print(f"Infrastructure scan failed: {e}")
-
-    try:
-        print("Running model governance audit...")
-        model_results = model_audit.run_model_audit()
-        print(f"Model audit findings: {model_results}\n")
-        results["model_audit"] = model_results
-    except Exception as e:
-        print(f"Model audit failed: {e}")
-
-    try:
-        print("Running tag policy check...")
-        tag_results = tag_policy.run_tag_policy_check()
-        print(f"Tag policy findings: {tag_results}\n")
-        results["tag_policy"] = tag_results
-    except Exception as e:
-        print(f"Tag policy check failed: {e}")
-
-    try:
-        print("Running PII log scan...")
-        pii_results = pii_scan.scan_file("data/sample_log.txt")
-        print(f"PII scan findings: {pii_results}\n")
-        results["pii_scan"] = pii_results
-    except Exception as e:
-        print(f"PII scan failed: {e}")
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'src')))
+
+import argparse
+
+from compliance_checker import report
+from compliance_checker.checks import CHECK_LABELS, DEFAULT_LOG_PATHS, run_standard_checks
+from compliance_checker.telemetry import Telemetry
+from compliance_checker.result_cache import ResultCache, DEFAULT_CACHE_DIR
+
+RESULTS_DIR = os.path.join("data", "results")
+
+def run_all_checks(timeouts=None, log_paths=DEFAULT_LOG_PATHS, telemetry=None, cache=None):
+    print(f"Running {len(CHECK_LABELS)} compliance checks concurrently...")
+    results, errors = run_standard_checks(log_paths=log_paths, timeouts=timeouts, telemetry=telemetry, cache=cache)
+
+    for name, label in CHECK_LABELS.items():
+        if name in results:
+            print(f"{label} findings: {results[name]}\n")
+        else:
+            print(f"{label} failed: {errors[name]}")
 
     return results
 
 if __name__ == "__main__":
-    all_results = run_all_checks()
+    parser = argparse.ArgumentParser(description="Run all compliance checks and write a Markdown report.")
+    parser.add_argument("--metrics", action="store_true",
+                        help="write per-check performance metrics (JSON and Prometheus text) next to the report")
+    parser.add_argument("--profile", action="store_true",
+                        help="also write a cProfile dump per check to data/results/profiles")
+    parser.add_argument("--jsonl", action="store_true",
+                        help="also export every finding to data/results/findings.jsonl")
+    parser.add_argument("--sharded-html", action="store_true",
+                        help="also write a paginated HTML report to data/results/report for very large finding sets")
+    parser.add_argument("--archive", action="store_true",
+                        help="append the results to the columnar archive in data/archive (requires pyarrow)")
+    parser.add_argument("--history", action="store_true",
+                        help="record the run in data/history/runs.db and report changes since the previous run")
+    parser.add_argument("--cache", action="store_true",
+                        help="reuse results of checks whose inputs are unchanged; cached results include raw "
+                             "findings such as PII matches, stored (owner-readable only) in --cache-dir")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="directory of the check result cache")
+    args = parser.parse_args()
+
+    telemetry = None
+    if args.metrics or args.profile:
+        telemetry = Telemetry(profile_dir=os.path.join(RESULTS_DIR, "profiles") if args.profile else None)
+
+    cache = ResultCache(args.cache_dir) if args.cache else None
+    all_results = run_all_checks(telemetry=telemetry, cache=cache)
     print("Summary of all compliance checks:")
     print(all_results)
 
+    diff = None
+    if args.history:
+        from compliance_checker.run_history import RunHistory
+        diff = RunHistory().record_and_diff(all_results)
+
     # Generate report file
-    report.generate_markdown_report(all_results)
+    report.generate_markdown_report(all_results, diff=diff)
+    if args.jsonl:
+        report.export_findings_jsonl(all_results, output_path=os.path.join(RESULTS_DIR, "findings.jsonl"))
+    if args.archive:
+        from compliance_checker.results_archive import append_run
+        print(f"Results appended to archive {append_run(all_results)}")
+    if args.sharded_html:
+        report.generate_sharded_html_report(all_results, output_dir=os.path.join(RESULTS_DIR, "report"))
+
+    if telemetry:
+        json_path, prom_path = telemetry.write(RESULTS_DIR)
+        print(f"Metrics saved to {json_path} and {prom_path}")
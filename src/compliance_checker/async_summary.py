@@ -0,0 +1,125 @@
+"""
+async_summary.py
+
+Runs executive summary generation in the background so reports can render their findings while
+the LLM is still producing the summary. Tokens are streamed from the model as they arrive; the
+report asks for the summary only when it is assembled, waiting at most until a deadline measured
+from the start of generation. If the LLM has not finished by then, generation is stopped at the
+next token and a template summary built from the finding counts is used instead.
+
+Classes/Functions:
+    - template_summary: Returns a summary paragraph derived from finding counts, without an LLM.
+    - SummaryCancelled: Raised into a generator's token callback to stop generation.
+    - BackgroundSummary: Generates a summary on a background thread with a deadline.
+"""
+
+import os
+import time
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from compliance_checker.render import normalize_results
+
+# Seconds from the start of generation after which the template summary is used.
+DEFAULT_SUMMARY_DEADLINE = float(os.getenv("LLM_SUMMARY_DEADLINE", "120"))
+
+
+def template_summary(results: Dict[str, Any]) -> str:
+    """
+    Returns a plain summary paragraph stating how many findings each check reported.
+    """
+    counts = []
+    for check in normalize_results(results):
+        total = sum(len(section.items) for section in check.sections if section.is_list)
+        counts.append((check.name, total))
+    flagged = [(name, total) for name, total in counts if total]
+    if not flagged:
+        return f"The compliance scan ran {len(counts)} check(s) and reported no findings."
+    details = ", ".join(f"{name} ({total})" for name, total in flagged)
+    clean = len(counts) - len(flagged)
+    return (
+        f"The compliance scan ran {len(counts)} check(s) and reported {sum(t for _, t in flagged)} finding(s): "
+        f"{details}. {clean} check(s) reported no findings. "
+        "An automated narrative summary was not available when this report was generated."
+    )
+
+
+class SummaryCancelled(Exception):
+    """
+    Raised from the token callback once the summary is no longer wanted.
+    """
+
+
+class BackgroundSummary:
+    """
+    Starts generate(results, on_token=callback) on a daemon thread when constructed.
+
+    generate: A summary generator that raises on failure, such as
+              functools.partial(llm_assist.generate_summary_with_local_llama, raise_errors=True);
+              an error message returned instead would be shown as the summary.
+    deadline: Seconds from construction that result() waits before falling back.
+    on_token: Optional callable receiving each streamed token (e.g. for progress output).
+    """
+
+    def __init__(
+        self,
+        generate: Callable[..., str],
+        results: Dict[str, Any],
+        deadline: float = DEFAULT_SUMMARY_DEADLINE,
+        on_token: Optional[Callable[[str], None]] = None
+    ):
+        self.results = results
+        self.deadline = deadline
+        self.on_token = on_token
+        self.tokens: List[str] = []
+        self.timed_out = False
+        self._generate = generate
+        self._summary = None
+        self._error = None
+        self._started = time.monotonic()
+        self._done = threading.Event()
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="llm-summary", daemon=True)
+        self._thread.start()
+
+    def _token(self, token: str) -> None:
+        if self._cancelled.is_set():
+            raise SummaryCancelled()
+        self.tokens.append(token)
+        if self.on_token is not None:
+            self.on_token(token)
+
+    def _run(self) -> None:
+        try:
+            self._summary = self._generate(self.results, on_token=self._token)
+        except Exception as e:
+            self._error = e
+        finally:
+            self._done.set()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def cancel(self) -> None:
+        """
+        Stops generation at the next streamed token.
+        """
+        self._cancelled.set()
+
+    def result(self) -> str:
+        """
+        Waits for the summary until the deadline and returns it. Returns the template summary
+        (and cancels generation) if it is not ready in time, or if generation raised or returned
+        None.
+        """
+        remaining = self.deadline - (time.monotonic() - self._started)
+        if not self._done.wait(max(remaining, 0)):
+            self.timed_out = True
+            self.cancel()
+            return template_summary(self.results)
+        if self._error is not None or self._summary is None:
+            return template_summary(self.results)
+        return self._summary
+
+    __call__ = result
@@ -0,0 +1,170 @@
+"""
+blob_upload.py
+
+Change-aware upload of report artifacts to Azure Blob Storage.
+A single BlobServiceClient (and its connection pool) is reused per connection string, artifacts are
+uploaded concurrently, text artifacts are stored gzip- or Brotli-compressed with a matching
+Content-Encoding, and a blob is skipped when the stored blob's Content-MD5 already matches the
+bytes that would be uploaded. Blobs a new upload no longer references can be deleted under a prefix.
+
+Functions:
+    - get_container_client: Returns a container client backed by a shared, pooled service client.
+    - prepare_artifact: Reads and compresses one artifact and computes its Content-MD5.
+    - upload_artifact: Uploads one artifact unless the stored blob is identical.
+    - upload_artifacts: Uploads several artifacts concurrently.
+    - delete_stale_blobs: Deletes the blobs under a prefix that are not in a set of names to keep.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Collection, Dict, NamedTuple, Optional
+
+from azure.core.exceptions import ResourceNotFoundError
+from azure.storage.blob import BlobServiceClient, ContentSettings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "image/svg+xml")
+# Compressing tiny files saves nothing and costs a header.
+MIN_COMPRESS_BYTES = 1024
+DEFAULT_UPLOAD_WORKERS = 8
+
+UPLOADED, SKIPPED, DELETED = "uploaded", "skipped", "deleted"
+
+
+class Artifact(NamedTuple):
+    """
+    The bytes to store for one blob, with the content settings describing them.
+    """
+    blob_name: str
+    data: bytes
+    content_type: str
+    content_encoding: Optional[str]
+    content_md5: bytes
+
+
+@lru_cache(maxsize=None)
+def _service_client(connection_string: str) -> BlobServiceClient:
+    return BlobServiceClient.from_connection_string(connection_string)
+
+
+def get_container_client(connection_string: str, container: str) -> Any:
+    """
+    Returns a ContainerClient. The underlying BlobServiceClient is created once per connection
+    string and reused, so its HTTP connection pool is shared across runs of a long-lived process.
+    """
+    return _service_client(connection_string).get_container_client(container)
+
+
+def _content_type(path: str) -> str:
+    content_type, _ = mimetypes.guess_type(path)
+    if path.endswith(".md"):
+        return "text/markdown; charset=utf-8"
+    if content_type and (content_type.startswith("text/") or content_type == "application/json"):
+        return f"{content_type}; charset=utf-8"
+    return content_type or "application/octet-stream"
+
+
+def _compress(data: bytes, compression: Optional[str]) -> tuple:
+    if compression == "br" and brotli is not None:
+        return brotli.compress(data), "br"
+    if compression in ("gzip", "br"):
+        # mtime=0 keeps the output (and so its MD5) identical for identical input.
+        return gzip.compress(data, compresslevel=9, mtime=0), "gzip"
+    return data, None
+
+
+def prepare_artifact(path: str, blob_name: str, compression: Optional[str] = "gzip") -> Artifact:
+    """
+    Reads a file and returns the Artifact to upload. Text-like files of at least MIN_COMPRESS_BYTES
+    are compressed with compression ("gzip", "br" or None); "br" falls back to gzip when the
+    brotli package is not installed.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    content_type = _content_type(path)
+    content_encoding = None
+    if len(data) >= MIN_COMPRESS_BYTES and content_type.startswith(COMPRESSIBLE_TYPES):
+        data, content_encoding = _compress(data, compression)
+    return Artifact(blob_name, data, content_type, content_encoding, hashlib.md5(data).digest())
+
+
+def _is_unchanged(blob_client: Any, artifact: Artifact) -> bool:
+    try:
+        settings = blob_client.get_blob_properties().content_settings
+    except ResourceNotFoundError:
+        return False
+    return (settings.content_md5 is not None and bytes(settings.content_md5) == artifact.content_md5
+            and settings.content_encoding == artifact.content_encoding
+            and settings.content_type == artifact.content_type)
+
+
+def upload_artifact(container_client: Any, path: str, blob_name: str, compression: Optional[str] = "gzip") -> str:
+    """
+    Uploads one file as blob_name unless the stored blob already has the same content and
+    encoding. Returns UPLOADED or SKIPPED.
+    """
+    artifact = prepare_artifact(path, blob_name, compression)
+    blob_client = container_client.get_blob_client(blob_name)
+    if _is_unchanged(blob_client, artifact):
+        return SKIPPED
+
+    blob_client.upload_blob(
+        artifact.data,
+        overwrite=True,
+        content_settings=ContentSettings(
+            content_type=artifact.content_type,
+            content_encoding=artifact.content_encoding,
+            content_md5=bytearray(artifact.content_md5),
+        ),
+    )
+    return UPLOADED
+
+
+def upload_artifacts(
+    container_client: Any,
+    artifacts: Dict[str, str],
+    compression: Optional[str] = "gzip",
+    max_workers: int = DEFAULT_UPLOAD_WORKERS
+) -> Dict[str, str]:
+    """
+    Uploads artifacts ({blob_name: local_path}) concurrently.
+    Returns {blob_name: status}, where status is UPLOADED, SKIPPED or "failed: <error>".
+    """
+    def upload(item):
+        blob_name, path = item
+        try:
+            return blob_name, upload_artifact(container_client, path, blob_name, compression)
+        except Exception as e:
+            return blob_name, f"failed: {e}"
+
+    if not artifacts:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(artifacts))) as executor:
+        return dict(executor.map(upload, artifacts.items()))
+
+
+def delete_stale_blobs(container_client: Any, prefix: str, keep: Collection[str]) -> Dict[str, str]:
+    """
+    Deletes every blob whose name starts with prefix and is not in keep.
+    Returns {blob_name: status}, where status is DELETED or "failed: <error>".
+    """
+    statuses = {}
+    for blob in container_client.list_blobs(name_starts_with=prefix):
+        if blob.name in keep:
+            continue
+        try:
+            container_client.delete_blob(blob.name)
+            statuses[blob.name] = DELETED
+        except ResourceNotFoundError:
+            # Already gone, e.g. removed by a concurrent upload.
+            statuses[blob.name] = DELETED
+        except Exception as e:
+            statuses[blob.name] = f"failed: {e}"
+    return statuses
@@ -0,0 +1,102 @@
+"""
+checks.py
+
+Defines the standard compliance checks and the shared inputs they require, for use by
+main.py and the scanner daemon.
+
+Functions:
+    - build_inputs: Returns the shared inputs (resource inventory, log file set) checks can require.
+    - build_checks: Returns the standard compliance checks, optionally a subset by name.
+    - run_standard_checks: Runs the standard checks concurrently and returns results and errors.
+"""
+
+import os
+import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from compliance_checker import infra_scan, model_audit, tag_policy, pii_scan
+from compliance_checker.orchestrator import CheckSpec, run_checks, PROCESS
+from compliance_checker.telemetry import Telemetry
+from compliance_checker.result_cache import ResultCache, fingerprint_files
+
+CHECK_LABELS = {
+    "infrastructure": "Infrastructure scan",
+    "model_audit": "Model audit",
+    "tag_policy": "Tag policy check",
+    "pii_scan": "PII scan",
+}
+
+DEFAULT_LOG_PATHS = ("data/sample_log.txt",)
+
+
+def _count_resources(result: Any, resources: List[Dict[str, Any]]) -> Dict[str, int]:
+    return {"resources": len(resources)}
+
+
+def _count_log_bytes(result: Any, log_files: List[str]) -> Dict[str, int]:
+    return {"files": len(log_files), "bytes": sum(os.path.getsize(path) for path in log_files)}
+
+
+def build_inputs(log_paths: Iterable[str] = DEFAULT_LOG_PATHS, timeouts: Optional[Dict[str, float]] = None) -> List[CheckSpec]:
+    """
+    Returns the shared inputs checks can require. Each is produced once per run.
+    """
+    timeouts = {"resource_inventory": 300, "log_files": 60, **(timeouts or {})}
+    return [
+        CheckSpec("resource_inventory", infra_scan.fetch_azure_resources, timeout=timeouts["resource_inventory"],
+                  count_items=lambda resources: {"resources": len(resources)}),
+        CheckSpec("log_files", pii_scan.list_log_files, timeout=timeouts["log_files"], args=(list(log_paths),),
+                  count_items=lambda files: {"files": len(files)}),
+    ]
+
+
+def build_checks(names: Optional[Iterable[str]] = None, timeouts: Optional[Dict[str, float]] = None) -> List[CheckSpec]:
+    """
+    Returns the compliance checks to run, optionally only those named. The infrastructure scan and
+    tag policy check share one resource inventory fetch. The PII scan is CPU-bound and runs in its
+    own process; the others mostly wait on I/O and run in threads.
+    Raises ValueError for unknown check names.
+    """
+    timeouts = {"infrastructure": 60, "model_audit": 120, "tag_policy": 60, "pii_scan": 600, **(timeouts or {})}
+    checks = [
+        CheckSpec("infrastructure", infra_scan.scan_for_compliance, timeout=timeouts["infrastructure"],
+                  requires=("resource_inventory",), count_items=_count_resources,
+                  cache_key=lambda resources: resources, cache_config=lambda: infra_scan.CACHE_VERSION),
+        # The drift verdict depends on today's date, so cached audits are only reused the same day.
+        CheckSpec("model_audit", model_audit.run_model_audit, timeout=timeouts["model_audit"],
+                  # Without a registry path run_model_audit audits the single demo model.
+                  count_items=lambda issues: {"models": 1},
+                  cache_key=lambda: datetime.date.today().isoformat(), cache_config=lambda: model_audit.CACHE_VERSION),
+        CheckSpec("tag_policy", tag_policy.run_tag_policy_check, timeout=timeouts["tag_policy"],
+                  requires=("resource_inventory",), count_items=_count_resources,
+                  cache_key=lambda resources: resources, cache_config=tag_policy.policy_config),
+        CheckSpec("pii_scan", pii_scan.scan_files, kind=PROCESS, timeout=timeouts["pii_scan"],
+                  requires=("log_files",), count_items=_count_log_bytes,
+                  cache_key=fingerprint_files, cache_config=pii_scan.scan_config),
+    ]
+    if names is None:
+        return checks
+
+    names = list(names)
+    unknown = [name for name in names if name not in CHECK_LABELS]
+    if unknown:
+        raise ValueError(f"Unknown checks: {', '.join(unknown)}")
+    return [check for check in checks if check.name in names]
+
+
+def run_standard_checks(
+    names: Optional[Iterable[str]] = None,
+    log_paths: Iterable[str] = DEFAULT_LOG_PATHS,
+    timeouts: Optional[Dict[str, float]] = None,
+    telemetry: Optional[Telemetry] = None,
+    cache: Optional[ResultCache] = None
+) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    Runs the standard checks (or the named subset) concurrently, recording metrics into telemetry
+    and reusing results for unchanged inputs from cache, if given.
+    Returns (results, errors) keyed by check name, with results in check order.
+    """
+    checks = build_checks(names, timeouts=timeouts)
+    results, errors = run_checks(checks, inputs=build_inputs(log_paths, timeouts=timeouts),
+                                 telemetry=telemetry, cache=cache)
+    return results, errors
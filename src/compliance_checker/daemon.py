@@ -0,0 +1,362 @@
+"""
+daemon.py
+
+Long-running scanner daemon that keeps libraries, Azure credentials, compiled PII patterns and the
+local LLaMA model warm, and accepts scan jobs over a local HTTP API. Jobs go into a bounded queue
+and are run by a fixed pool of worker threads; clients poll for status.
+
+The API has no authentication and job results hold the PII found, so access is limited to the
+local user: by default it is served on a Unix socket readable and writable by the owner only.
+TCP on localhost is opt-in (--tcp); it rejects requests whose Host header is not a loopback
+name, so web pages cannot reach it through DNS rebinding. Jobs may only scan log paths under
+the configured log roots (--log-root, default: data).
+
+API:
+    GET  /health          -> {"status": "ok", "queued": int, "workers": int}
+    POST /jobs            -> 202 {"job_id": str, "status": "queued"}; 429 if the queue is full
+                             body: {"checks": [...], "log_paths": [...], "timeouts": {...}, "report": "markdown"|"html"}
+    GET  /jobs/<job_id>   -> {"job_id", "status", "submitted_at", "started_at", "finished_at", "results", "errors"}
+
+Usage:
+    python src/compliance_checker/daemon.py [--socket data/daemon.sock | --tcp [--host 127.0.0.1] [--port 8765]]
+                                            [--log-root DIR ...] [--workers 2] [--queue-size 16] [--preload-llm]
+
+Classes/Functions:
+    - JobManager: Bounded job queue, worker threads and job status store.
+    - run_scan_job: Default job runner; runs the requested checks and optionally writes a report.
+    - warm_up: Resolves credentials and optionally loads the local LLaMA model ahead of the first job.
+    - validate_job: Rejects malformed job requests and log paths outside the log roots.
+    - create_server: Creates the HTTP server (Unix socket or TCP) bound to a JobManager.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import queue
+import socketserver
+import threading
+import uuid
+import argparse
+from collections import OrderedDict
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from compliance_checker import infra_scan, llm_assist, report
+from compliance_checker.llama_manager import get_model_manager
+from compliance_checker.checks import DEFAULT_LOG_PATHS, build_checks, run_standard_checks
+
+REPORT_FORMATS = ("markdown", "html")
+DEFAULT_SOCKET_PATH = os.path.join("data", "daemon.sock")
+# Directories jobs may scan logs under, unless configured otherwise.
+DEFAULT_LOG_ROOTS = ("data",)
+# Host header values accepted over TCP, with or without a port.
+LOOPBACK_HOSTS = ("localhost", "127.0.0.1", "[::1]")
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def run_scan_job(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Runs the checks requested by a job and optionally writes a Markdown or HTML report.
+    Returns {"results": {...}, "errors": {...}}.
+    """
+    results, errors = run_standard_checks(
+        params.get("checks"),
+        log_paths=params.get("log_paths") or DEFAULT_LOG_PATHS,
+        timeouts=params.get("timeouts"),
+    )
+    if params.get("report") == "markdown":
+        report.generate_markdown_report(results)
+    elif params.get("report") == "html":
+        report.generate_html_report(results)
+    return {"results": results, "errors": errors}
+
+
+def _within(path: str, roots: Iterable[str]) -> bool:
+    real = os.path.realpath(path)
+    for root in roots:
+        root = os.path.realpath(root)
+        if os.path.commonpath([real, root]) == root:
+            return True
+    return False
+
+
+def validate_job(params: Dict[str, Any], log_roots: Iterable[str] = DEFAULT_LOG_ROOTS) -> None:
+    """
+    Raises ValueError if a job request is malformed (checks or log_paths not lists of strings,
+    timeouts not an object of numbers), names unknown checks or report formats, or asks for log
+    paths outside log_roots (after resolving symbolic links and "..").
+    """
+    if not isinstance(params, dict):
+        raise ValueError("Job request must be a JSON object")
+    for field in ("checks", "log_paths"):
+        value = params.get(field)
+        if value is not None and not (isinstance(value, list) and all(isinstance(item, str) for item in value)):
+            raise ValueError(f"'{field}' must be a list of strings")
+    timeouts = params.get("timeouts")
+    if timeouts is not None and not (isinstance(timeouts, dict) and all(
+            isinstance(value, (int, float)) and not isinstance(value, bool) for value in timeouts.values())):
+        raise ValueError("'timeouts' must be an object of numbers of seconds")
+    outside = [path for path in params.get("log_paths") or () if not _within(path, log_roots)]
+    if outside:
+        raise ValueError(f"Log paths outside the allowed roots: {', '.join(outside)}")
+    build_checks(params.get("checks"))
+    if params.get("report") not in (None,) + REPORT_FORMATS:
+        raise ValueError(f"Unknown report format: {params.get('report')}")
+
+
+class JobManager:
+    """
+    Bounded job queue served by a fixed number of worker threads.
+    Keeps the most recent finished jobs for status polling.
+    """
+
+    def __init__(
+        self,
+        runner: Callable[[Dict[str, Any]], Dict[str, Any]] = run_scan_job,
+        workers: int = 2,
+        queue_size: int = 16,
+        history: int = 256
+    ):
+        self.runner = runner
+        self.workers = workers
+        self.history = history
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self) -> None:
+        """
+        Starts the worker threads.
+        """
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"scan-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        """
+        Stops the worker threads after the jobs they are running finish.
+        """
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Queues a job and returns its status record. Raises queue.Full if the queue is at capacity.
+        """
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "status": "queued",
+            "params": params,
+            "submitted_at": _now(),
+            "started_at": None,
+            "finished_at": None,
+            "results": None,
+            "errors": None,
+        }
+        with self._lock:
+            self._queue.put_nowait(job["job_id"])
+            self._jobs[job["job_id"]] = job
+            self._trim_history()
+        return dict(job)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns a copy of a job's status record, or None if unknown.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def _trim_history(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job["status"] in ("succeeded", "failed")]
+        for job_id in finished[:max(len(finished) - self.history, 0)]:
+            del self._jobs[job_id]
+
+    def _work(self) -> None:
+        while True:
+            job_id = self._queue.get()
+            if job_id is None:
+                return
+            with self._lock:
+                job = self._jobs[job_id]
+                job.update(status="running", started_at=_now())
+            try:
+                output = self.runner(job["params"])
+                update = {"status": "succeeded", "results": output.get("results"), "errors": output.get("errors")}
+            except Exception as e:
+                update = {"status": "failed", "errors": {"job": str(e)}}
+            with self._lock:
+                job.update(finished_at=_now(), **update)
+
+
+class _JobRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP handler for the job API. The JobManager and log roots are taken from the server instance.
+    """
+
+    def _host_allowed(self) -> bool:
+        # Unix socket clients cannot be web pages; TCP requests must name a loopback host.
+        if not self.client_address:
+            return True
+        host = (self.headers.get("Host") or "").lower()
+        name = host.rsplit(":", 1)[0] if not host.endswith("]") else host
+        return name in LOOPBACK_HOSTS
+
+    def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+        payload = json.dumps(body, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if not self._host_allowed():
+            self._send_json(403, {"error": "Host not allowed"})
+            return
+        manager = self.server.job_manager
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok", "queued": manager.queued, "workers": manager.workers})
+        elif self.path.startswith("/jobs/"):
+            job = manager.get(self.path[len("/jobs/"):])
+            if job is None:
+                self._send_json(404, {"error": "Job not found"})
+            else:
+                job.pop("params", None)
+                self._send_json(200, job)
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        if not self._host_allowed():
+            self._send_json(403, {"error": "Host not allowed"})
+            return
+        if self.path != "/jobs":
+            self._send_json(404, {"error": "Not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            params = json.loads(self.rfile.read(length) or b"{}")
+            validate_job(params, self.server.log_roots)
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        try:
+            job = self.server.job_manager.submit(params)
+        except queue.Full:
+            self._send_json(429, {"error": "Job queue is full"})
+            return
+        self._send_json(202, {"job_id": job["job_id"], "status": job["status"]})
+
+    def address_string(self):
+        # Unix socket clients have no address tuple
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        # Create the socket readable and writable by the owner only, with no window where it is not.
+        umask = os.umask(0o177)
+        try:
+            socketserver.UnixStreamServer.server_bind(self)
+        finally:
+            os.umask(umask)
+        self.server_name, self.server_port = "localhost", 0
+
+
+def create_server(
+    job_manager: JobManager,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    socket_path: Optional[str] = None,
+    log_roots: Iterable[str] = DEFAULT_LOG_ROOTS
+):
+    """
+    Creates an HTTP server for the job API on a Unix socket if socket_path is given (mode 0600),
+    otherwise on TCP host:port. Jobs may only scan log paths under log_roots.
+    The caller is responsible for calling serve_forever() and starting the JobManager.
+    """
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        if os.path.dirname(socket_path):
+            os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+        server = _ThreadingUnixHTTPServer(socket_path, _JobRequestHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), _JobRequestHandler)
+    server.job_manager = job_manager
+    server.log_roots = tuple(log_roots)
+    return server
+
+
+def warm_up(preload_llm: bool = False, llm_idle_timeout: Optional[float] = None) -> None:
+    """
+    Resolves Azure credentials and, if requested, loads the local LLaMA model before the first job.
+    llm_idle_timeout overrides how long the model stays loaded without use (0 keeps it loaded).
+    Failures are reported but do not stop the daemon; the affected checks will report them per job.
+    """
+    try:
+        infra_scan.get_resource_client()
+    except Exception as e:
+        print(f"Azure credentials not available yet: {e}")
+    if preload_llm:
+        try:
+            get_model_manager(llm_assist.DEFAULT_LLAMA_MODEL_PATH, idle_timeout=llm_idle_timeout).load()
+        except Exception as e:
+            print(f"Local LLaMA model not loaded: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Azure AI Compliance Checker scanner daemon")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH, help="Unix socket path to serve on (mode 0600)")
+    parser.add_argument("--tcp", action="store_true",
+                        help="serve on TCP host:port instead; any local user can then submit jobs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--log-root", action="append", dest="log_roots", metavar="DIR",
+                        help=f"directory jobs may scan logs under (repeatable; default: {', '.join(DEFAULT_LOG_ROOTS)})")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--queue-size", type=int, default=16)
+    parser.add_argument("--preload-llm", action="store_true", help="load the local LLaMA model at startup")
+    parser.add_argument("--llm-idle-timeout", type=float,
+                        help="seconds the LLaMA model stays loaded without use (0 keeps it loaded)")
+    args = parser.parse_args()
+
+    warm_up(preload_llm=args.preload_llm, llm_idle_timeout=args.llm_idle_timeout)
+    manager = JobManager(workers=args.workers, queue_size=args.queue_size)
+    manager.start()
+    socket_path = None if args.tcp else args.socket
+    server = create_server(manager, host=args.host, port=args.port, socket_path=socket_path,
+                           log_roots=args.log_roots or DEFAULT_LOG_ROOTS)
+    print(f"Scanner daemon listening on {socket_path or f'http://{args.host}:{args.port}'}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Shutting down scanner daemon...")
+    finally:
+        server.server_close()
+        manager.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,13 +7,21 @@ Fetches resources, checks for compliance issues (e.g., missing tags), and genera
 
 from azure.identity import AzureCliCredential
 from azure.mgmt.resource import ResourceManagementClient
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from functools import lru_cache
 import json
 import os
 
+from compliance_checker.telemetry import stage
+
+# Bump when a change to scan_resources changes its findings for the same inventory.
+CACHE_VERSION = 1
+
+@lru_cache(maxsize=1)
 def get_subscription_id() -> str:
     """
     Returns the current Azure subscription ID using the Azure CLI.
+    Cached for the life of the process, so long-running callers resolve it once.
     """
     import subprocess
     result = subprocess.run(
@@ -24,18 +32,25 @@ def get_subscription_id() -> str:
     )
     return result.stdout.strip()
 
+@lru_cache(maxsize=1)
+def get_resource_client() -> ResourceManagementClient:
+    """
+    Returns a ResourceManagementClient for the current subscription using Azure CLI credentials.
+    The client (and its credential token cache) is created once and reused.
+    """
+    return ResourceManagementClient(AzureCliCredential(), get_subscription_id())
+
 def fetch_azure_resources() -> List[Dict[str, Any]]:
     """
     Fetches all resources in the current Azure subscription using Azure SDK.
-    Returns a list of resource dictionaries with name, type, and tags.
+    Returns a list of resource dictionaries with id, name, type, and tags.
     """
-    subscription_id = get_subscription_id()
-    credential = AzureCliCredential()
-    resource_client = ResourceManagementClient(credential, subscription_id)
+    resource_client = get_resource_client()
 
     resources = []
     for item in resource_client.resources.list():
         resources.append({
+            "id": item.id,
             "name": item.name,
             "type": item.type,
             "tags": item.tags or {}
@@ -72,12 +87,16 @@ def generate_summary_report(issues: List[Dict[str, Any]], total: int) -> Dict[st
         "non_compliant_resources": issues,
     }
 
-def scan_for_compliance() -> Dict[str, Any]:
+def scan_for_compliance(resources: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
     """
-    Runs the full compliance scan: fetches resources, scans for issues, and returns a summary report.
+    Runs the full compliance scan and returns a summary report.
+    Fetches resources from Azure unless an already-fetched resource inventory is provided.
     """
-    resources = fetch_azure_resources()
-    issues = scan_resources(resources)
+    if resources is None:
+        with stage("fetch"):
+            resources = fetch_azure_resources()
+    with stage("scan"):
+        issues = scan_resources(resources)
     return generate_summary_report(issues, total=len(resources))
 
 def save_report(report: Dict[str, Any], filepath: str = "data/results/infra_scan_report.json") -> None:
@@ -0,0 +1,212 @@
+"""
+llama_manager.py
+
+Process-wide manager for local LLaMA models. A model is loaded on first use, kept resident and
+shared by concurrent report generations, and unloaded after it has been idle for a configurable
+time. Inference on one model is serialized, since a llama.cpp context is not safe for concurrent
+use, and callers hold a lease while using a model so it is never unloaded under them.
+Cold (including the load) and warm request latencies are recorded for each model.
+
+Classes/Functions:
+    - LlamaModelManager: Lazily loads, shares and evicts one model.
+    - get_model_manager: Returns the process-wide manager for a model path.
+"""
+
+import os
+import gc
+import time
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+# Optional import for local LLaMA support
+try:
+    from llama_cpp import Llama
+except ImportError:
+    Llama = None
+
+# Seconds a model may stay unused before it is unloaded; 0 keeps it loaded.
+DEFAULT_IDLE_TIMEOUT = float(os.getenv("LLAMA_IDLE_TIMEOUT", "600"))
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def _load_llama(model_path: str, **model_kwargs: Any) -> Any:
+    if Llama is None:
+        raise ImportError("llama-cpp-python is not installed. Please install it with `pip install llama-cpp-python` to use local models.")
+    return Llama(model_path=model_path, **model_kwargs)
+
+
+class LlamaModelManager:
+    """
+    Owns one local model.
+
+    model_path:   Path of the GGUF model file.
+    idle_timeout: Seconds of inactivity after which the model is unloaded (0 or None: never).
+    loader:       Callable (model_path, **model_kwargs) -> model; defaults to llama_cpp.Llama.
+    model_kwargs: Extra keyword arguments for the loader (e.g. n_ctx, n_threads).
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        idle_timeout: Optional[float] = DEFAULT_IDLE_TIMEOUT,
+        loader: Callable[..., Any] = _load_llama,
+        **model_kwargs: Any
+    ):
+        self.model_path = model_path
+        self.idle_timeout = idle_timeout
+        self.loader = loader
+        self.model_kwargs = model_kwargs
+        self._model = None
+        self._leases = 0
+        self._last_used = time.monotonic()
+        self._timer = None
+        self._state_lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._inference_lock = threading.Lock()
+        self._stats = {
+            "loads": 0, "evictions": 0, "last_load_seconds": None,
+            "cold": {"requests": 0, "total_seconds": 0.0, "last_seconds": None},
+            "warm": {"requests": 0, "total_seconds": 0.0, "last_seconds": None},
+        }
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def load(self) -> bool:
+        """
+        Loads the model if it is not resident. Returns True if this call loaded it.
+        Concurrent callers wait for a single load instead of loading the weights twice.
+        """
+        with self._load_lock:
+            if self._model is not None:
+                return False
+            start = time.perf_counter()
+            model = self.loader(self.model_path, **self.model_kwargs)
+            elapsed = time.perf_counter() - start
+            with self._state_lock:
+                self._model = model
+                self._last_used = time.monotonic()
+                self._stats["loads"] += 1
+                self._stats["last_load_seconds"] = elapsed
+            self._schedule_eviction()
+            return True
+
+    @contextmanager
+    def acquire(self) -> Iterator[Any]:
+        """
+        Yields the loaded model, loading it first if needed. The model is not unloaded while
+        any caller holds it.
+        """
+        while True:
+            self.load()
+            with self._state_lock:
+                if self._model is not None:
+                    self._leases += 1
+                    model = self._model
+                    break
+        try:
+            yield model
+        finally:
+            with self._state_lock:
+                self._leases -= 1
+                self._last_used = time.monotonic()
+
+    def generate(self, prompt: str, **kwargs: Any) -> Dict[str, Any]:
+        """
+        Runs one completion and returns the raw llama.cpp response. Requests that had to load
+        the model are recorded as cold, others as warm.
+        """
+        start = time.perf_counter()
+        cold = self.load()
+        with self.acquire() as model, self._inference_lock:
+            response = model(prompt, **kwargs)
+        self._record_latency("cold" if cold else "warm", time.perf_counter() - start)
+        return response
+
+    def stream(self, prompt: str, **kwargs: Any) -> Iterator[str]:
+        """
+        Runs one streamed completion and yields its text as tokens arrive. The model stays
+        leased and locked until the generator is exhausted or closed, so callers that stop
+        early should close it (e.g. with contextlib.closing) to release the model at once.
+        """
+        start = time.perf_counter()
+        cold = self.load()
+        with self.acquire() as model, self._inference_lock:
+            for chunk in model(prompt, stream=True, **kwargs):
+                yield chunk["choices"][0]["text"]
+        self._record_latency("cold" if cold else "warm", time.perf_counter() - start)
+
+    def _record_latency(self, kind: str, seconds: float) -> None:
+        with self._state_lock:
+            stats = self._stats[kind]
+            stats["requests"] += 1
+            stats["total_seconds"] += seconds
+            stats["last_seconds"] = seconds
+
+    def unload(self) -> bool:
+        """
+        Unloads the model unless it is in use. Returns True if it was unloaded.
+        """
+        with self._state_lock:
+            if self._model is None or self._leases:
+                return False
+            model, self._model = self._model, None
+            self._stats["evictions"] += 1
+        close = getattr(model, "close", None)
+        if callable(close):
+            close()
+        del model
+        gc.collect()
+        return True
+
+    def _schedule_eviction(self, delay: Optional[float] = None) -> None:
+        if not self.idle_timeout:
+            return
+        with self._state_lock:
+            if self._timer is not None:
+                return
+            self._timer = threading.Timer(delay or self.idle_timeout, self._evict_if_idle)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _evict_if_idle(self) -> None:
+        with self._state_lock:
+            self._timer = None
+            if self._model is None:
+                return
+            idle = time.monotonic() - self._last_used
+            busy = self._leases > 0
+        if not busy and idle >= self.idle_timeout and self.unload():
+            return
+        self._schedule_eviction(self.idle_timeout if busy else max(self.idle_timeout - idle, 0.01))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns load/eviction counts and cold/warm latency totals, with mean latencies.
+        """
+        with self._state_lock:
+            stats = {key: dict(value) if isinstance(value, dict) else value for key, value in self._stats.items()}
+            stats["loaded"] = self._model is not None
+        for kind in ("cold", "warm"):
+            requests = stats[kind]["requests"]
+            stats[kind]["mean_seconds"] = stats[kind]["total_seconds"] / requests if requests else None
+        return stats
+
+
+def get_model_manager(model_path: str, idle_timeout: Optional[float] = None, **model_kwargs: Any) -> LlamaModelManager:
+    """
+    Returns the process-wide manager for model_path, creating it on first use.
+    idle_timeout (if given) updates the manager's timeout.
+    """
+    with _managers_lock:
+        manager = _managers.get(model_path)
+        if manager is None:
+            manager = LlamaModelManager(model_path, **model_kwargs)
+            _managers[model_path] = manager
+        if idle_timeout is not None:
+            manager.idle_timeout = idle_timeout
+        return manager
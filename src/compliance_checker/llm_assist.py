@@ -3,73 +3,185 @@ llm_assist.py
 
 Provides functions to generate executive summaries of compliance scan results using either a local LLaMA model or OpenAI's GPT models.
 Allows cost-effective local summarization by default, with optional OpenAI integration.
+The local model is loaded once per process and shared through llama_manager, which unloads it
+after an idle timeout. Summaries are cached by a hash of the canonicalized results, the model and
+the prompt version; a local model is identified by its absolute path, size and modification time (see summary_cache), so unchanged findings need no inference.
+Prompts are kept within a token budget by prompt_builder: large results are compressed into
+statistics and examples, and results too large even for that are summarized by map-reduce.
+Both generators can stream tokens to an on_token callback as they are produced; a callback that
+raises stops generation (see async_summary). By default failures are returned as an error
+message in place of the summary; with raise_errors=True they are raised, so callers with their
+own fallback (such as async_summary.BackgroundSummary) can use it. OpenAI requests go through
+the shared, rate-limited client of openai_pool, and many result sets can be summarized as one batch.
 
 Functions:
+    - build_summary_prompt: Builds the executive summary prompt for scan results within a token budget.
     - generate_summary_with_openai: Uses OpenAI API to summarize compliance scan results.
+    - generate_summaries_with_openai: Uses OpenAI API to summarize many result sets in one batch.
     - generate_summary_with_local_llama: Uses a local LLaMA model to summarize compliance scan results.
 """
 
 import os
-import json
+from contextlib import closing
+from typing import Dict
 
-# Optional import for local LLaMA support
-try:
-    from llama_cpp import Llama
-except ImportError:
-    Llama = None
+from compliance_checker.openai_pool import get_openai_client
+from compliance_checker.llama_manager import Llama, get_model_manager
+from compliance_checker.summary_cache import get_summary_cache, summary_key
+from compliance_checker.prompt_builder import build_prompt, summarize_results, DEFAULT_PROMPT_TOKENS
 
-from openai import OpenAI
+DEFAULT_LLAMA_MODEL_PATH = r".\models\llama-2-7b.Q4_K_M.gguf"
+# Bump whenever the prompt changes, so cached summaries from the old prompt are not reused.
+PROMPT_VERSION = 2
+# Token budget of each prompt; the 300-token answer must also fit the model's context window.
+PROMPT_TOKEN_BUDGET = int(os.getenv("LLM_PROMPT_TOKEN_BUDGET", str(DEFAULT_PROMPT_TOKENS)))
 
 
-def generate_summary_with_openai(scan_results: dict, model="gpt-3.5-turbo"):
+def build_summary_prompt(scan_results: dict, budget_tokens: int = PROMPT_TOKEN_BUDGET):
+    """
+    Returns the executive summary prompt for the given scan results, compressed to fit
+    budget_tokens, or None if the results need map-reduce summarization.
+    """
+    return build_prompt(scan_results, budget_tokens)
+
+
+def _openai_request(prompt: str, model: str) -> dict:
+    return {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": "You are a compliance and governance expert."},
+            {"role": "user", "content": prompt}
+        ],
+        "max_tokens": 300,
+        "temperature": 0.5,
+    }
+
+
+def _llama_model_id(model_path: str) -> str:
+    """
+    Identifies a local model file by absolute path, size and modification time, so models that
+    share a file name, or a model replaced in place, do not share cached summaries.
+    """
+    path = os.path.abspath(model_path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return f"llama:{path}"
+    return f"llama:{path}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def generate_summary_with_openai(scan_results: dict, model="gpt-3.5-turbo", use_cache=True, on_token=None, raise_errors=False):
     """
     Generate an executive summary of compliance scan results using OpenAI.
-    Returns a summary string or an error message.
+    Summaries of unchanged results are served from the summary cache unless use_cache is False.
+    If on_token is given, the response is streamed and every token (of every map-reduce step)
+    is passed to it as it arrives.
+    Returns a summary string or an error message, or raises the error if raise_errors is True.
     """
-    # Initialize the OpenAI client using environment variable for API key
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    
-    prompt = (
-        "You are a compliance and governance expert. "
-        "Write a one-paragraph executive summary of the Azure compliance scan results provided below. "
-        "Use formal plain English with no formatting — do not use markdown, bullet points, headings, or tables. "
-        "Just a professional paragraph summarizing the results.\n\n"
-        f"{json.dumps(scan_results, indent=2)}"
-    )
+    key = summary_key(scan_results, f"openai:{model}", PROMPT_VERSION)
+    cached = get_summary_cache().get(key) if use_cache else None
+    if cached is not None:
+        return cached
+
+    # Shared client using environment variable for API key
+    client = get_openai_client(os.getenv("OPENAI_API_KEY"))
+
+    def complete(prompt):
+        response = client.create_chat_completion(**_openai_request(prompt, model), stream=on_token is not None)
+        if on_token is None:
+            return response.choices[0].message.content.strip()
+        parts = []
+        with response:
+            for chunk in response:
+                token = chunk.choices[0].delta.content if chunk.choices else None
+                if token:
+                    on_token(token)
+                    parts.append(token)
+        return "".join(parts).strip()
 
     try:
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": "You are a compliance and governance expert."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=300,
-            temperature=0.5
-        )
-        return response.choices[0].message.content.strip()
+        summary, _ = summarize_results(scan_results, complete, PROMPT_TOKEN_BUDGET)
     except Exception as e:
+        if raise_errors:
+            raise
         return f"OpenAI summary failed: {str(e)}"
+    if use_cache:
+        get_summary_cache().put(key, summary)
+    return summary
+
+
+def generate_summaries_with_openai(results_by_name: Dict[str, dict], model="gpt-3.5-turbo", use_cache=True) -> Dict[str, str]:
+    """
+    Generate executive summaries of many result sets (e.g. one per subscription) using OpenAI.
+    Cached summaries are reused; result sets that fit one prompt are submitted together as a
+    rate-limited batch over pooled connections, and larger ones are summarized by map-reduce.
+    Returns {name: summary string or error message}.
+    """
+    summaries, keys, prompts = {}, {}, {}
+    for name, scan_results in results_by_name.items():
+        keys[name] = summary_key(scan_results, f"openai:{model}", PROMPT_VERSION)
+        cached = get_summary_cache().get(keys[name]) if use_cache else None
+        if cached is not None:
+            summaries[name] = cached
+        else:
+            prompts[name] = build_summary_prompt(scan_results)
+
+    single = [name for name, prompt in prompts.items() if prompt is not None]
+    client = get_openai_client(os.getenv("OPENAI_API_KEY"))
+    responses = client.submit_batch(_openai_request(prompts[name], model) for name in single)
+    for name, response in zip(single, responses):
+        if isinstance(response, Exception):
+            summaries[name] = f"OpenAI summary failed: {str(response)}"
+            continue
+        summaries[name] = response.choices[0].message.content.strip()
+        if use_cache:
+            get_summary_cache().put(keys[name], summaries[name])
+    for name, prompt in prompts.items():
+        if prompt is None:
+            summaries[name] = generate_summary_with_openai(results_by_name[name], model, use_cache)
+    return {name: summaries[name] for name in results_by_name}
 
-def generate_summary_with_local_llama(scan_results: dict, model_path=r".\models\llama-2-7b.Q4_K_M.gguf"):
+def generate_summary_with_local_llama(scan_results: dict, model_path=DEFAULT_LLAMA_MODEL_PATH, use_cache=True, on_token=None, raise_errors=False):
     """
     Generate an executive summary of compliance scan results using a local LLaMA model.
-    Returns a summary string or an error message.
+    Summaries of unchanged results are served from the summary cache unless use_cache is False.
+    If on_token is given, the completion is streamed and every token (of every map-reduce step)
+    is passed to it as it arrives.
+    Returns a summary string or an error message, or raises the error (RuntimeError if
+    llama-cpp-python is not installed) if raise_errors is True.
     """
+    key = summary_key(scan_results, _llama_model_id(model_path), PROMPT_VERSION)
+    cached = get_summary_cache().get(key) if use_cache else None
+    if cached is not None:
+        return cached
+
     if Llama is None:
-        return "llama-cpp-python is not installed. Please install it with `pip install llama-cpp-python` to use local models."
+        message = "llama-cpp-python is not installed. Please install it with `pip install llama-cpp-python` to use local models."
+        if raise_errors:
+            raise RuntimeError(message)
+        return message
+
+    manager = get_model_manager(model_path)
 
-    prompt = (
-        "You are a compliance and governance expert. "
-        "Write a one-paragraph executive summary of the Azure compliance scan results provided below. "
-        "Use formal plain English with no formatting — do not use markdown, bullet points, headings, or tables. "
-        "Just a professional paragraph summarizing the results.\n\n"
-        f"{json.dumps(scan_results, indent=2)}"
-    )
+    def complete(prompt):
+        if on_token is None:
+            response = manager.generate(prompt, max_tokens=300, temperature=0.5)
+            return response['choices'][0]['text'].strip()
+        parts = []
+        # Closing the stream releases the model at once if on_token stops generation.
+        with closing(manager.stream(prompt, max_tokens=300, temperature=0.5)) as tokens:
+            for token in tokens:
+                on_token(token)
+                parts.append(token)
+        return "".join(parts).strip()
 
     try:
-        llama = Llama(model_path=model_path)
-        response = llama(prompt, max_tokens=300, temperature=0.5)
-        return response['choices'][0]['text'].strip()
+        # Map steps queue on the manager's inference lock; one model cannot run them concurrently.
+        summary, _ = summarize_results(scan_results, complete, PROMPT_TOKEN_BUDGET)
     except Exception as e:
+        if raise_errors:
+            raise
         return f"Local LLaMA summary failed: {str(e)}"
+    if use_cache:
+        get_summary_cache().put(key, summary)
+    return summary
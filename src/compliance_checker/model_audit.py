@@ -3,26 +3,38 @@ model_audit.py
 
 Performs AI model governance audits and fairness analysis.
 Includes checks for model drift, bias, and explainability using metadata,
+data drift checks (PSI and KS) over mergeable feature histogram sketches,
 and demonstrates fairness metrics computation using Fairlearn and scikit-learn.
 
 Functions:
     - check_model_drift: Checks if a model is outdated based on last training date.
     - check_model_bias: Checks for bias in model precision metrics across groups.
     - check_model_explainability: Checks if explainability tools are documented.
+    - population_stability_index: Computes PSI between two feature histogram sketches.
+    - ks_statistic: Computes a binned Kolmogorov-Smirnov statistic between two sketches.
+    - check_feature_drift: Compares reference and live feature sketches for data drift.
     - audit_model: Aggregates audit issues for a given model's metadata.
-    - run_model_audit: Runs a demo audit on example model metadata.
+    - run_model_audit: Runs an audit on a model card registry, or a demo audit on example metadata.
+    - encode_fairness_features: One-hot encodes features for fairness model training (sparse or dense).
     - run_fairness_analysis: Runs a fairness audit using Fairlearn on a sample dataset.
 """
 
 import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterable, Union
 
+import numpy as np
 import pandas as pd
+from scipy import sparse as sp
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LogisticRegression
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import OneHotEncoder, MaxAbsScaler
 from fairlearn.metrics import MetricFrame, selection_rate, demographic_parity_difference, equalized_odds_difference
 from fairlearn.datasets import fetch_adult
 
+# Bump when a change to the audit rules changes verdicts for the same model metadata.
+CACHE_VERSION = 1
+
 
 def check_model_drift(model_metadata: Dict[str, Any], threshold_days: int = 30) -> bool:
     """
@@ -65,9 +77,145 @@ def check_model_explainability(metadata: Dict[str, Any]) -> bool:
     return not tools
 
 
+class HistogramSketch:
+    """
+    Fixed-memory histogram sketch of a single numeric feature.
+
+    Bin edges are fixed when the sketch is created (normally from reference data quantiles),
+    so live values can be folded in batch by batch and sketches built by different workers
+    can be merged by adding their counts. The two outermost bins are open-ended.
+    """
+
+    def __init__(self, edges: Iterable[float]):
+        self.edges = np.asarray(list(edges), dtype=float)
+        self.counts = np.zeros(len(self.edges) + 1, dtype=np.int64)
+
+    @classmethod
+    def from_reference(cls, values: Iterable[float], bins: int = 10) -> "HistogramSketch":
+        """
+        Builds a sketch whose edges are the reference quantiles (equal-frequency bins)
+        and which already contains the reference values.
+        """
+        data = np.asarray(list(values), dtype=float)
+        data = data[~np.isnan(data)]
+        if data.size == 0:
+            raise ValueError("Reference data must contain at least one numeric value")
+        edges = np.unique(np.quantile(data, np.linspace(0, 1, bins + 1)[1:-1]))
+        sketch = cls(edges)
+        sketch.update(data)
+        return sketch
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "HistogramSketch":
+        """
+        Rebuilds a sketch from the output of to_dict.
+        """
+        sketch = cls(data["edges"])
+        sketch.counts = np.asarray(data["counts"], dtype=np.int64)
+        return sketch
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns a JSON-serializable representation of the sketch.
+        """
+        return {"edges": self.edges.tolist(), "counts": self.counts.tolist()}
+
+    def empty_like(self) -> "HistogramSketch":
+        """
+        Returns an empty sketch with the same bin edges, e.g. for summarizing live data.
+        """
+        return HistogramSketch(self.edges)
+
+    @property
+    def total(self) -> int:
+        return int(self.counts.sum())
+
+    def update(self, values: Iterable[float]) -> "HistogramSketch":
+        """
+        Adds a batch of values to the sketch. NaN values are ignored.
+        """
+        data = np.asarray(list(values), dtype=float)
+        data = data[~np.isnan(data)]
+        if data.size:
+            bins = np.searchsorted(self.edges, data, side="right")
+            self.counts += np.bincount(bins, minlength=len(self.counts))
+        return self
+
+    def merge(self, other: "HistogramSketch") -> "HistogramSketch":
+        """
+        Adds the counts of another sketch with identical bin edges into this one.
+        """
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Cannot merge sketches with different bin edges")
+        self.counts += other.counts
+        return self
+
+
+SketchLike = Union[HistogramSketch, Dict[str, Any]]
+
+
+def _as_sketch(sketch: SketchLike) -> HistogramSketch:
+    return sketch if isinstance(sketch, HistogramSketch) else HistogramSketch.from_dict(sketch)
+
+
+def _proportions(sketch: HistogramSketch, epsilon: float = 0.0) -> np.ndarray:
+    proportions = sketch.counts / max(sketch.total, 1)
+    return np.clip(proportions, epsilon, None) if epsilon else proportions
+
+
+def population_stability_index(reference: SketchLike, live: SketchLike, epsilon: float = 1e-6) -> float:
+    """
+    Computes the Population Stability Index between a reference and a live sketch.
+    Values above ~0.2 are conventionally treated as significant drift.
+    """
+    reference, live = _as_sketch(reference), _as_sketch(live)
+    if not np.array_equal(reference.edges, live.edges):
+        raise ValueError("Sketches must share the same bin edges")
+    expected = _proportions(reference, epsilon)
+    actual = _proportions(live, epsilon)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def ks_statistic(reference: SketchLike, live: SketchLike) -> float:
+    """
+    Computes the Kolmogorov-Smirnov statistic between two sketches, evaluated at the bin edges.
+    """
+    reference, live = _as_sketch(reference), _as_sketch(live)
+    if not np.array_equal(reference.edges, live.edges):
+        raise ValueError("Sketches must share the same bin edges")
+    cdf_reference = np.cumsum(_proportions(reference))
+    cdf_live = np.cumsum(_proportions(live))
+    return float(np.max(np.abs(cdf_reference - cdf_live)))
+
+
+def check_feature_drift(
+    reference_sketches: Dict[str, SketchLike],
+    live_sketches: Dict[str, SketchLike],
+    psi_threshold: float = 0.2,
+    ks_threshold: float = 0.1
+) -> Dict[str, Dict[str, float]]:
+    """
+    Compares reference and live feature sketches.
+    Returns a dictionary of drifted features mapped to their PSI and KS values.
+    Features without live data are skipped.
+    """
+    drifted = {}
+    for feature, reference in reference_sketches.items():
+        live = live_sketches.get(feature)
+        if live is None or _as_sketch(live).total == 0:
+            continue
+        psi = population_stability_index(reference, live)
+        ks = ks_statistic(reference, live)
+        if psi > psi_threshold or ks > ks_threshold:
+            drifted[feature] = {"psi": psi, "ks": ks}
+    return drifted
+
+
 def audit_model(model_metadata: Dict[str, Any]) -> List[str]:
     """
     Aggregates audit issues for a given model's metadata.
+    Data drift is checked when the metadata carries 'reference_sketches' and 'live_sketches'
+    (feature name -> HistogramSketch or its to_dict form).
     Returns a list of issue descriptions.
     """
     issues = []
@@ -81,15 +229,35 @@ def audit_model(model_metadata: Dict[str, Any]) -> List[str]:
     if check_model_explainability(model_metadata):
         issues.append("Explainability tools not documented for this model.")
 
+    drifted = check_feature_drift(
+        model_metadata.get("reference_sketches", {}),
+        model_metadata.get("live_sketches", {})
+    )
+    for feature, stats in drifted.items():
+        issues.append(
+            f"Data drift detected in feature '{feature}' (PSI={stats['psi']:.3f}, KS={stats['ks']:.3f})."
+        )
+
     return issues
 
 
-def run_model_audit() -> List[str]:
+def run_model_audit(registry_path: Optional[str] = None, cache_path: Optional[str] = None) -> List[str]:
     """
-    Runs a demo model audit using placeholder metadata.
+    Runs a model audit. When registry_path is given, audits every model card in that directory
+    (see model_registry.audit_model_registry); otherwise runs a demo audit using placeholder metadata.
     Returns:
-        List of audit issue strings
+        List of audit issue strings, prefixed with the model name for registry audits
     """
+    if registry_path:
+        from compliance_checker.model_registry import audit_model_registry, DEFAULT_CACHE_PATH
+
+        registry = audit_model_registry(registry_path, cache_path=cache_path or DEFAULT_CACHE_PATH)
+        return [
+            f"{model['model_name']}: {issue}"
+            for model in registry["models"]
+            for issue in model["issues"]
+        ]
+
     example_model = {
         "last_trained": "2024-11-15T12:00:00",
         "metrics": {
@@ -102,9 +270,47 @@ def run_model_audit() -> List[str]:
     return audit_model(example_model)
 
 
-def run_fairness_analysis(use_fairlearn_demo: bool = True) -> Optional[Dict[str, Any]]:
+# Sensitive attributes are audited, not used as model inputs.
+FAIRNESS_SENSITIVE_COLUMNS = ["sex", "race"]
+# Columns dropped by the dense encoding path, mostly because dense dummies of them are too large.
+DENSE_DROPPED_COLUMNS = ["sex", "native-country", "race", "workclass", "marital-status", "occupation"]
+
+
+def encode_fairness_features(X: pd.DataFrame, sparse: bool = True):
+    """
+    One-hot encodes the categorical columns of a feature frame for model training.
+
+    Numeric columns are scaled with MaxAbsScaler (which preserves sparsity) in both forms, so the
+    model and its coefficients depend only on the attributes kept, not on the encoding.
+    With sparse=True, categorical columns are encoded with OneHotEncoder into a scipy CSR matrix, so
+    high-cardinality attributes such as 'occupation' and 'native-country' can be kept at little
+    memory cost. With sparse=False, the dense pd.get_dummies frame is returned for the columns given.
+    """
+    categorical = [c for c in X.columns if not pd.api.types.is_numeric_dtype(X[c])]
+    numeric = [c for c in X.columns if c not in categorical]
+    if not sparse:
+        if numeric:
+            X = X.assign(**dict(zip(numeric, MaxAbsScaler().fit_transform(X[numeric]).T)))
+        return pd.get_dummies(X, drop_first=True)
+
+    encoder = ColumnTransformer(
+        [
+            ("categorical", OneHotEncoder(handle_unknown="ignore"), categorical),
+            ("numeric", MaxAbsScaler(), numeric),
+        ],
+        sparse_threshold=1.0,
+    )
+    # Missing values in category columns become their own "nan" level.
+    X = X.astype({c: str for c in categorical})
+    # The transformer returns a dense array when no column produces sparse output (numeric-only frames).
+    return sp.csr_matrix(encoder.fit_transform(X))
+
+
+def run_fairness_analysis(use_fairlearn_demo: bool = True, sparse_features: bool = True) -> Optional[Dict[str, Any]]:
     """
     Runs a fairness audit using Fairlearn on a sample dataset.
+    By default features are one-hot encoded into a sparse matrix, keeping high-cardinality attributes;
+    sparse_features=False uses the previous dense encoding, which drops them.
     Returns a dictionary of fairness metrics or None if skipped or failed.
     """
     try:
@@ -116,7 +322,10 @@ def run_fairness_analysis(use_fairlearn_demo: bool = True) -> Optional[Dict[str,
         y = (data.target == ">50K").astype(int)
 
         sensitive_feature = X["sex"]
-        X = pd.get_dummies(X.drop(columns=["sex", "native-country", "race", "workclass", "marital-status", "occupation"]), drop_first=True)
+        if sparse_features:
+            X = encode_fairness_features(X.drop(columns=FAIRNESS_SENSITIVE_COLUMNS), sparse=True)
+        else:
+            X = encode_fairness_features(X.drop(columns=DENSE_DROPPED_COLUMNS), sparse=False)
 
         X_train, X_test, y_train, y_test, sf_train, sf_test = train_test_split(
             X, y, sensitive_feature, test_size=0.3, random_state=42
@@ -0,0 +1,188 @@
+"""
+model_registry.py
+
+Loads AI model metadata (model cards) from a directory tree of JSON/YAML files and audits each model.
+Files are parsed and audited in parallel, and the parsed metadata and audit verdicts are cached by
+path, mtime, size and content hash, so re-runs on a large registry only re-parse the files that changed.
+
+Functions:
+    - find_model_cards: Lists the model card files under a registry directory.
+    - load_model_card: Parses a single JSON/YAML model card.
+    - load_cache: Loads the registry cache from disk.
+    - save_cache: Saves the registry cache to disk.
+    - audit_model_registry: Audits every model card in a registry directory, reusing cached results.
+"""
+
+import os
+import json
+import hashlib
+import datetime
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
+
+# Optional import for YAML model cards
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+from compliance_checker.model_audit import audit_model
+
+MODEL_CARD_EXTENSIONS = (".json", ".yaml", ".yml")
+DEFAULT_CACHE_PATH = "data/results/model_registry_cache.json"
+CACHE_VERSION = 1
+
+# Below this many changed files a process pool costs more than it saves.
+PARALLEL_THRESHOLD = 32
+
+
+def find_model_cards(root: str) -> List[str]:
+    """
+    Recursively lists model card files (JSON/YAML) under the registry root, sorted by path.
+    """
+    paths = []
+    for dir_path, _, file_names in os.walk(root):
+        for file_name in file_names:
+            if file_name.lower().endswith(MODEL_CARD_EXTENSIONS):
+                paths.append(os.path.join(dir_path, file_name))
+    return sorted(paths)
+
+
+def _parse_bytes(path: str, content: bytes) -> Dict[str, Any]:
+    if path.lower().endswith(".json"):
+        data = json.loads(content)
+    else:
+        if yaml is None:
+            raise ImportError("PyYAML is not installed. Please install it with `pip install pyyaml` to read YAML model cards.")
+        data = yaml.safe_load(content)
+    if not isinstance(data, dict):
+        raise ValueError("Model card must contain a mapping at the top level")
+    # YAML turns ISO timestamps into datetime objects; keep the metadata JSON-serializable.
+    return json.loads(json.dumps(data, default=str))
+
+
+def load_model_card(path: str) -> Dict[str, Any]:
+    """
+    Parses a single JSON or YAML model card and returns its metadata dictionary.
+    """
+    with open(path, "rb") as f:
+        return _parse_bytes(path, f.read())
+
+
+def _parse_and_audit(path: str, cached_sha256: Optional[str]) -> Tuple[str, str, Optional[Dict[str, Any]], Optional[List[str]]]:
+    """
+    Worker: hashes the file and, unless the content matches the cached hash, parses and audits it.
+    Returns (path, sha256, metadata, issues); metadata and issues are None when the content is unchanged.
+    """
+    with open(path, "rb") as f:
+        content = f.read()
+    sha256 = hashlib.sha256(content).hexdigest()
+    if sha256 == cached_sha256:
+        return path, sha256, None, None
+
+    try:
+        metadata = _parse_bytes(path, content)
+    except Exception as e:
+        return path, sha256, {}, [f"Model card could not be parsed: {e}"]
+    return path, sha256, metadata, audit_model(metadata)
+
+
+def load_cache(cache_path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Loads cached registry entries keyed by file path. Returns an empty cache if missing or unreadable.
+    """
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != CACHE_VERSION:
+        return {}
+    return data.get("entries", {})
+
+
+def save_cache(entries: Dict[str, Dict[str, Any]], cache_path: str) -> None:
+    """
+    Saves registry entries to the cache file, replacing it atomically.
+    """
+    dir_path = os.path.dirname(cache_path)
+    if dir_path:
+        os.makedirs(dir_path, exist_ok=True)
+    tmp_path = f"{cache_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": CACHE_VERSION, "entries": entries}, f)
+    os.replace(tmp_path, cache_path)
+
+
+def audit_model_registry(
+    root: str,
+    cache_path: Optional[str] = DEFAULT_CACHE_PATH,
+    max_workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Audits every model card under the registry root.
+
+    Files whose path, mtime and size match the cache are not read at all; files whose content hash
+    still matches are not re-parsed. Cached verdicts are re-audited from cached metadata once per day,
+    since the drift check depends on the current date. Pass cache_path=None to disable caching.
+
+    Returns:
+        {
+            "models": [{"model_name": str, "path": str, "issues": List[str]}, ...],
+            "stats": {"total": int, "parsed": int, "cached": int}
+        }
+    """
+    cache = load_cache(cache_path) if cache_path else {}
+    today = datetime.date.today().isoformat()
+    entries = {}
+    stale = []
+
+    cache_abspath = os.path.abspath(cache_path) if cache_path else None
+    for path in find_model_cards(root):
+        if os.path.abspath(path) == cache_abspath:
+            continue
+        stat = os.stat(path)
+        cached = cache.get(path)
+        if cached and cached["mtime_ns"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+            entries[path] = cached
+        else:
+            stale.append((path, cached.get("sha256") if cached else None, stat))
+
+    parsed = 0
+    if stale:
+        args = ([path for path, _, _ in stale], [sha for _, sha, _ in stale])
+        if len(stale) >= PARALLEL_THRESHOLD:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                outputs = list(executor.map(_parse_and_audit, *args, chunksize=16))
+        else:
+            outputs = list(map(_parse_and_audit, *args))
+
+        for (path, sha256, metadata, issues), (_, _, stat) in zip(outputs, stale):
+            if metadata is None:
+                entry = dict(cache[path])
+            else:
+                parsed += 1
+                entry = {"sha256": sha256, "metadata": metadata, "issues": issues, "audited_on": today}
+            entry.update({"mtime_ns": stat.st_mtime_ns, "size": stat.st_size})
+            entries[path] = entry
+
+    for entry in entries.values():
+        if entry.get("audited_on") != today and entry["metadata"]:
+            entry["issues"] = audit_model(entry["metadata"])
+            entry["audited_on"] = today
+
+    if cache_path:
+        save_cache(entries, cache_path)
+
+    models = [
+        {
+            "model_name": entry["metadata"].get("name") or os.path.splitext(os.path.basename(path))[0],
+            "path": path,
+            "issues": entry["issues"],
+        }
+        for path, entry in sorted(entries.items())
+    ]
+    return {
+        "models": models,
+        "stats": {"total": len(models), "parsed": parsed, "cached": len(models) - parsed},
+    }
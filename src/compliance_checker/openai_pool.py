@@ -0,0 +1,146 @@
+"""
+openai_pool.py
+
+Shared, rate-limited OpenAI client for generating many summaries at once (e.g. one per
+subscription or business unit). One OpenAI client, and so one pool of keep-alive HTTP
+connections, is reused per API key and base URL. Requests are paced by token buckets for
+requests and tokens per minute, concurrency is capped, and rate-limit, timeout, connection and
+server errors are retried with jittered exponential backoff that honours Retry-After.
+
+Classes/Functions:
+    - PooledOpenAIClient: Rate-limited, retrying wrapper around one shared OpenAI client.
+    - get_openai_client: Returns the process-wide client for an API key and base URL.
+"""
+
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+
+import openai
+from openai import OpenAI
+
+from compliance_checker.prompt_builder import estimate_tokens
+from compliance_checker.rate_limit import (
+    TokenBucket, backoff_delay, parse_retry_after, RETRYABLE_STATUS_CODES,
+)
+
+DEFAULT_REQUESTS_PER_MINUTE = float(os.getenv("OPENAI_REQUESTS_PER_MINUTE", "500"))
+DEFAULT_TOKENS_PER_MINUTE = float(os.getenv("OPENAI_TOKENS_PER_MINUTE", "60000"))
+# Seconds of allowance the buckets may spend at once.
+BURST_SECONDS = 10
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_MAX_RETRIES = 5
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    return parse_retry_after(response.headers.get("retry-after") if response is not None else None)
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, openai.APIConnectionError):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code in RETRYABLE_STATUS_CODES
+
+
+class PooledOpenAIClient:
+    """
+    Wraps one OpenAI client with rate limiting, a concurrency cap and retries.
+
+    api_key / base_url:  Passed to OpenAI (None: the OPENAI_API_KEY / OPENAI_BASE_URL environment).
+    requests_per_minute: Request rate limit.
+    tokens_per_minute:   Token rate limit; a request costs its estimated prompt tokens plus max_tokens.
+    max_concurrency:     Maximum requests in flight.
+    max_retries:         Retries of a retryable failure before it is raised.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = DEFAULT_TOKENS_PER_MINUTE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        timeout: float = 60.0
+    ):
+        # Retries are done here, where they can be paced by the rate limiter.
+        self.client = OpenAI(api_key=api_key, base_url=base_url, max_retries=0, timeout=timeout)
+        self.request_bucket = TokenBucket(requests_per_minute / 60, max(1.0, requests_per_minute / 60 * BURST_SECONDS))
+        self.token_bucket = TokenBucket(tokens_per_minute / 60, tokens_per_minute / 60 * BURST_SECONDS)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self._slots = threading.Semaphore(max_concurrency)
+        self._stats_lock = threading.Lock()
+        self._stats = {"requests": 0, "retries": 0, "failures": 0, "throttled_seconds": 0.0}
+
+    def _count(self, key: str, amount: float = 1) -> None:
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def create_chat_completion(self, **kwargs: Any) -> Any:
+        """
+        Calls chat.completions.create(**kwargs) and returns its response (a stream if
+        stream=True; only establishing the stream is retried).
+        """
+        prompt = "".join(str(message.get("content", "")) for message in kwargs.get("messages", []))
+        cost = estimate_tokens(prompt) + kwargs.get("max_tokens", 0)
+        for attempt in range(self.max_retries + 1):
+            throttled = self.request_bucket.acquire() + self.token_bucket.acquire(cost)
+            self._count("throttled_seconds", throttled)
+            try:
+                with self._slots:
+                    self._count("requests")
+                    return self.client.chat.completions.create(**kwargs)
+            except Exception as e:
+                if attempt == self.max_retries or not _is_retryable(e):
+                    self._count("failures")
+                    raise
+                self._count("retries")
+                time.sleep(backoff_delay(attempt, _retry_after(e)))
+
+    def complete(self, prompt: str, model: str, system: Optional[str] = None, **kwargs: Any) -> str:
+        """
+        Returns the stripped text of one non-streamed chat completion of prompt.
+        """
+        messages = ([{"role": "system", "content": system}] if system else []) + [{"role": "user", "content": prompt}]
+        response = self.create_chat_completion(model=model, messages=messages, **kwargs)
+        return response.choices[0].message.content.strip()
+
+    def submit_batch(self, requests: Iterable[Dict[str, Any]], max_workers: Optional[int] = None) -> List[Any]:
+        """
+        Runs create_chat_completion(**request) for every request concurrently (within the rate
+        limits) and returns the responses in request order. A request that fails after its
+        retries yields its exception in place of a response, so one failure does not lose the batch.
+        """
+        def run(request):
+            try:
+                return self.create_chat_completion(**request)
+            except Exception as e:
+                return e
+
+        requests = list(requests)
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers or self.max_concurrency, len(requests)))) as executor:
+            return list(executor.map(run, requests))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns counts of requests sent, retries and failures, and total seconds spent throttled.
+        """
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def close(self) -> None:
+        self.client.close()
+
+
+@lru_cache(maxsize=None)
+def get_openai_client(api_key: Optional[str] = None, base_url: Optional[str] = None) -> PooledOpenAIClient:
+    """
+    Returns the PooledOpenAIClient for api_key and base_url, created once and reused so its
+    connections and rate limits are shared by every caller in the process.
+    """
+    return PooledOpenAIClient(api_key=api_key, base_url=base_url)
@@ -0,0 +1,288 @@
+"""
+orchestrator.py
+
+Runs compliance checks concurrently as a small dependency graph with per-check timeouts.
+Checks declare the shared inputs they need (e.g. the resource inventory or the log file set);
+each input is produced once per run, memoized, and passed to every check that requires it.
+Checks and inputs start as soon as their own requirements are ready, so independent branches run in parallel.
+I/O-bound work runs on a thread each; CPU-bound work runs in a child process each (supervised
+from such a thread), so it uses separate cores and can be terminated on timeout. Check threads
+are daemon threads: a thread check that times out cannot be stopped, but it is abandoned and
+does not keep the interpreter from exiting. Child processes are started with the "spawn"
+method, so they never inherit locks held by other threads at fork time.
+
+Classes/Functions:
+    - CheckSpec: Describes a check or input to run (name, callable, kind, timeout, arguments, requirements).
+    - run_checks: Runs checks and their inputs concurrently and collects results and errors by check name.
+"""
+
+import time
+import threading
+import multiprocessing
+from functools import partial
+from concurrent.futures import Future, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from compliance_checker.telemetry import Telemetry, instrumented_call
+from compliance_checker.result_cache import ResultCache
+
+THREAD = "thread"
+PROCESS = "process"
+
+# Forking while other check threads hold locks (logging, imports, allocators) can deadlock the child.
+_process_context = multiprocessing.get_context("spawn")
+
+
+class CheckSpec(NamedTuple):
+    """
+    A compliance check, or a shared input consumed by checks.
+
+    name:     Key of the check's result in the results dict, or the name checks use to require an input.
+    func:     Callable that runs the check. Must be importable at module level for kind="process".
+    kind:     "thread" for I/O-bound work, "process" for CPU-bound work.
+    timeout:  Seconds from its start before the check is abandoned (None for no limit).
+    args:     Positional arguments passed to func.
+    requires: Names of inputs whose values are passed to func after args, in order.
+    count_items: Optional callable (result, *inputs) -> {unit: count} reporting items processed,
+              used for telemetry throughput.
+    cache_key: Optional callable (*args, *inputs) -> JSON-serializable fingerprint of everything the
+              result depends on. Only checks with a cache_key are cached when a ResultCache is used.
+    cache_config: Optional callable () -> JSON-serializable fingerprint of the check's configuration
+              (detection patterns, policies, a version constant), evaluated when the cache key is built,
+              so changing the configuration invalidates cached results.
+    """
+    name: str
+    func: Callable[..., Any]
+    kind: str = THREAD
+    timeout: Optional[float] = None
+    args: tuple = ()
+    requires: Tuple[str, ...] = ()
+    count_items: Optional[Callable[..., Dict[str, int]]] = None
+    cache_key: Optional[Callable[..., Any]] = None
+    cache_config: Optional[Callable[[], Any]] = None
+
+
+def _process_entry(conn, func: Callable[..., Any], args: tuple) -> None:
+    """
+    Child process entry point: runs the check and sends ("ok", result) or ("error", message) back.
+    """
+    try:
+        conn.send(("ok", func(*args)))
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def _run_in_process(func: Callable[..., Any], args: tuple, timeout: Optional[float]) -> Any:
+    """
+    Runs a check in a child process and waits for its result, terminating the child on timeout.
+    """
+    parent_conn, child_conn = _process_context.Pipe(duplex=False)
+    process = _process_context.Process(target=_process_entry, args=(child_conn, func, args), daemon=True)
+    process.start()
+    child_conn.close()
+    try:
+        if not parent_conn.poll(timeout):
+            raise TimeoutError(f"timed out after {timeout}s")
+        try:
+            status, payload = parent_conn.recv()
+        except EOFError:
+            raise RuntimeError(f"check process exited with code {process.exitcode}")
+    finally:
+        if process.is_alive():
+            process.terminate()
+        process.join()
+        parent_conn.close()
+
+    if status == "error":
+        raise RuntimeError(payload)
+    return payload
+
+
+def _run_spec(spec: CheckSpec, inputs: tuple, telemetry: Optional[Telemetry] = None) -> Any:
+    """
+    Runs a check in the calling thread or a child process. With telemetry, the check is measured
+    where it runs and (result, metrics) is returned instead of the bare result.
+    """
+    func, args = spec.func, spec.args + inputs
+    if telemetry is not None:
+        func = partial(instrumented_call, spec.name, spec.func, args,
+                       trace_memory=telemetry.trace_memory, profile_dir=telemetry.profile_dir)
+        args = ()
+    if spec.kind == PROCESS:
+        return _run_in_process(func, args, spec.timeout)
+    return func(*args)
+
+
+def _execute(spec: CheckSpec, inputs: tuple, telemetry: Optional[Telemetry], cache: Optional[ResultCache]) -> Tuple[Any, Optional[Dict[str, Any]], bool]:
+    """
+    Returns (result, metrics, cached). Checks with a cache_key are served from the cache when their
+    inputs and configuration are unchanged, and stored in it after a successful run.
+    """
+    key = None
+    if cache is not None and spec.cache_key is not None:
+        config = [f"{spec.func.__module__}.{getattr(spec.func, '__qualname__', repr(spec.func))}", spec.args,
+                  spec.cache_config() if spec.cache_config is not None else None]
+        key = cache.make_key(spec.name, config, spec.cache_key(*(spec.args + inputs)))
+        hit, value = cache.get(key)
+        if hit:
+            return value, None, True
+
+    output = _run_spec(spec, inputs, telemetry)
+    result, metrics = output if telemetry is not None else (output, None)
+    if key is not None:
+        cache.put(key, result)
+    return result, metrics, False
+
+
+def _submit(name: str, func: Callable[..., Any], *args: Any) -> Future:
+    """
+    Runs func(*args) on a new daemon thread and returns a Future of its result. Unlike pool
+    threads, daemon threads are not joined at interpreter exit, so an abandoned check that never
+    returns cannot hang the process.
+    """
+    future = Future()
+
+    def run() -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            result = func(*args)
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+
+    threading.Thread(target=run, name=f"check-{name}", daemon=True).start()
+    return future
+
+
+def _resolve_graph(checks: List[CheckSpec], inputs: List[CheckSpec]) -> Dict[str, CheckSpec]:
+    """
+    Returns the checks plus every input they transitively require, keyed by name.
+    Raises ValueError for duplicate names, unknown inputs or dependency cycles.
+    """
+    available = {}
+    for spec in list(inputs) + list(checks):
+        if spec.name in available:
+            raise ValueError(f"Duplicate check or input name: '{spec.name}'")
+        available[spec.name] = spec
+
+    nodes = {}
+    visiting = set()
+
+    def visit(name: str, required_by: Optional[str]) -> None:
+        if name in nodes:
+            return
+        if name in visiting:
+            raise ValueError(f"Dependency cycle involving '{name}'")
+        if name not in available:
+            raise ValueError(f"Unknown input '{name}' required by '{required_by}'")
+        visiting.add(name)
+        for dependency in available[name].requires:
+            visit(dependency, name)
+        visiting.discard(name)
+        nodes[name] = available[name]
+
+    for check in checks:
+        visit(check.name, None)
+    return nodes
+
+
+def _role(spec: CheckSpec, check_names: set) -> str:
+    return "check" if spec.name in check_names else "input"
+
+
+def _record_unmeasured(telemetry: Optional[Telemetry], spec: CheckSpec, started: float, status: str,
+                       check_names: set, items: Optional[Dict[str, int]] = None) -> None:
+    # Failed, timed-out and cached checks only have a wall time seen from the scheduler.
+    if telemetry is not None:
+        metrics = {"wall_seconds": time.monotonic() - started, "cpu_seconds": None,
+                   "peak_memory_bytes": None, "peak_memory_scope": None, "stages": {}, "executor": spec.kind}
+        telemetry.record(spec.name, _role(spec, check_names), metrics, status=status, items=items)
+
+
+def run_checks(
+    checks: List[CheckSpec],
+    inputs: Optional[List[CheckSpec]] = None,
+    telemetry: Optional[Telemetry] = None,
+    cache: Optional[ResultCache] = None
+) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    Runs all checks, and the inputs they require, concurrently and waits for each to finish or time out.
+
+    Each input is produced at most once per run and only if some check requires it. A check starts
+    as soon as all of its inputs are available; if an input fails, the checks that need it fail too.
+    Timeouts are measured from the start of each check. Timed-out process checks are terminated.
+    Thread checks cannot be interrupted, so a timed-out thread check is abandoned and its result
+    discarded; it keeps running in the background but does not delay interpreter exit.
+    If a Telemetry instance is given, metrics for every check and input are recorded into it.
+    If a ResultCache is given, checks with a cache_key return cached results when their inputs are unchanged.
+
+    Returns:
+        (results, errors): results maps check name to its return value for checks that succeeded;
+        errors maps check name to an error message for checks that failed, timed out or lacked an input.
+    """
+    nodes = _resolve_graph(checks, inputs or [])
+    values = {}
+    failures = {}
+    if not nodes:
+        return {}, {}
+
+    check_names = {check.name for check in checks}
+    waiting = dict(nodes)
+    running = {}
+
+    def schedule_ready() -> None:
+        progress = True
+        while progress:
+            progress = False
+            for name, spec in list(waiting.items()):
+                failed = [dep for dep in spec.requires if dep in failures]
+                if failed:
+                    failures[name] = f"input '{failed[0]}' unavailable: {failures[failed[0]]}"
+                elif all(dep in values for dep in spec.requires):
+                    spec_inputs = tuple(values[dep] for dep in spec.requires)
+                    future = _submit(name, _execute, spec, spec_inputs, telemetry, cache)
+                    running[future] = (spec, time.monotonic(), spec_inputs)
+                else:
+                    continue
+                del waiting[name]
+                progress = True
+
+    schedule_ready()
+    while running:
+        deadlines = [started + spec.timeout for spec, started, _ in running.values() if spec.timeout is not None]
+        wait_for = max(min(deadlines) - time.monotonic(), 0) if deadlines else None
+        done, _ = wait(running, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+        for future in done:
+            spec, started, spec_inputs = running.pop(future)
+            try:
+                result, metrics, cached = future.result()
+            except Exception as e:
+                failures[spec.name] = str(e)
+                _record_unmeasured(telemetry, spec, started, "failed", check_names)
+                continue
+            if telemetry is not None:
+                items = spec.count_items(result, *spec_inputs) if spec.count_items else None
+                if cached:
+                    _record_unmeasured(telemetry, spec, started, "cached", check_names, items=items)
+                else:
+                    telemetry.record(spec.name, _role(spec, check_names), dict(metrics, executor=spec.kind), items=items)
+            values[spec.name] = result
+
+        now = time.monotonic()
+        for future, (spec, started, _) in list(running.items()):
+            if spec.timeout is not None and now >= started + spec.timeout:
+                future.cancel()
+                failures[spec.name] = f"timed out after {spec.timeout}s"
+                _record_unmeasured(telemetry, spec, started, "timed_out", check_names)
+                del running[future]
+
+        schedule_ready()
+
+    results = {check.name: values[check.name] for check in checks if check.name in values}
+    errors = {check.name: failures[check.name] for check in checks if check.name in failures}
+    return results, errors
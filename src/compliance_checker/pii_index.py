@@ -0,0 +1,377 @@
+"""
+pii_index.py
+
+Persistent index of where PII values occur across log files, for answering "which files and
+offsets contain this leaked email / SSN" without re-scanning every log.
+
+Values are never stored: each match found by pii_scan.find_pii_spans is normalized (emails
+lowercased, numbers reduced to their digits, so "555-123-4567" and "(555) 123 4567" are the same
+value) and hashed with keyed BLAKE2b under a secret key, so the index cannot be brute-forced
+for low-entropy values such as SSNs without the key. Postings (value hash, file, byte offset,
+label) live in SQLite, keyed by value hash. A Bloom filter over all value hashes is kept next to
+the database and checked first, so looking up a value that was never seen costs no database query.
+
+Updates are incremental: for each file the index records how much of it was indexed, the start
+of its last incomplete line and a hash of its first bytes. A file that only grew is indexed from
+its last incomplete line on; a file that shrank or whose first bytes changed (rotated, rewritten)
+is re-indexed from the start; an unchanged file is skipped.
+
+Classes/Functions:
+    - normalize_value: Returns the canonical form of a PII value that is hashed.
+    - BloomFilter: Fixed-size Bloom filter over value hashes.
+    - PiiIndex: Builds, updates and queries the index.
+"""
+
+import os
+import sys
+import math
+import struct
+import sqlite3
+import hashlib
+import argparse
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from compliance_checker.pii_scan import find_pii_spans, iter_line_chunks, list_log_files, DEFAULT_CHUNK_SIZE
+
+DEFAULT_INDEX_PATH = os.path.join("data", "index", "pii_index.db")
+INDEX_KEY_ENV = "PII_INDEX_KEY"
+HASH_BYTES = 16
+# Bytes at the start of a file whose hash tells an appended file from a replaced one.
+HEAD_BYTES = 4096
+DEFAULT_BLOOM_CAPACITY = 1 << 20
+DEFAULT_BLOOM_ERROR_RATE = 0.001
+# Value hashes memoized per update; logs repeat the same values a lot.
+HASH_CACHE_SIZE = 100_000
+
+_BLOOM_HEADER = struct.Struct("<4sIQQQQ")
+_BLOOM_MAGIC = b"PIIB"
+_NON_DIGITS = bytes(byte for byte in range(256) if byte not in b"0123456789")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    file_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    resume_offset INTEGER NOT NULL,
+    head_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    value_hash BLOB NOT NULL,
+    file_id INTEGER NOT NULL REFERENCES files(file_id) ON DELETE CASCADE,
+    byte_offset INTEGER NOT NULL,
+    label TEXT NOT NULL,
+    PRIMARY KEY (value_hash, file_id, byte_offset)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_by_file ON postings (file_id, byte_offset);
+"""
+
+
+def normalize_value(value: bytes) -> bytes:
+    """
+    Returns the form of a PII value that is hashed: emails lowercased, anything else reduced to its digits.
+    """
+    if b"@" in value:
+        return value.lower()
+    return value.translate(None, _NON_DIGITS)
+
+
+class BloomFilter:
+    """
+    Bloom filter over value hashes (uniformly distributed bytes, so the bit positions are derived
+    from the hash itself by double hashing rather than by hashing again).
+
+    capacity:   Number of values the filter is sized for.
+    error_rate: False positive rate at capacity.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_BLOOM_CAPACITY, error_rate: float = DEFAULT_BLOOM_ERROR_RATE):
+        self.capacity = max(capacity, 1)
+        self.bit_count = max(int(-self.capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hash_count = max(round(self.bit_count / self.capacity * math.log(2)), 1)
+        self.bits = bytearray((self.bit_count + 7) // 8)
+        self.count = 0
+
+    def _positions(self, digest: bytes):
+        first = int.from_bytes(digest[:8], "little")
+        step = int.from_bytes(digest[8:16], "little") | 1
+        return [(first + i * step) % self.bit_count for i in range(self.hash_count)]
+
+    def add(self, digest: bytes) -> None:
+        bits = self.bits
+        new = False
+        for position in self._positions(digest):
+            mask = 1 << (position & 7)
+            if not bits[position >> 3] & mask:
+                bits[position >> 3] |= mask
+                new = True
+        if new:
+            self.count += 1
+
+    def __contains__(self, digest: bytes) -> bool:
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(digest))
+
+    def to_bytes(self, generation: int) -> bytes:
+        header = _BLOOM_HEADER.pack(_BLOOM_MAGIC, self.hash_count, self.bit_count, self.capacity, self.count, generation)
+        return header + bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Tuple["BloomFilter", int]:
+        """
+        Returns the filter saved by to_bytes and its generation.
+        """
+        magic, hash_count, bit_count, capacity, count, generation = _BLOOM_HEADER.unpack_from(data)
+        bits = data[_BLOOM_HEADER.size:]
+        if magic != _BLOOM_MAGIC or len(bits) != (bit_count + 7) // 8:
+            raise ValueError("Not a PII index Bloom filter.")
+        bloom = cls.__new__(cls)
+        bloom.capacity, bloom.bit_count, bloom.hash_count, bloom.count = capacity, bit_count, hash_count, count
+        bloom.bits = bytearray(bits)
+        return bloom, generation
+
+
+def _head_hash(path: str, length: int) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read(length)).hexdigest()
+
+
+class PiiIndex:
+    """
+    SQLite-backed index of PII value hashes to (file, offset) postings, with a Bloom filter in
+    front (saved as <db_path>.bloom; rebuilt from the database if missing or stale).
+
+    db_path: Path of the SQLite database; created with its schema if missing.
+    key:     Secret key of the value hashes (bytes or str); defaults to the PII_INDEX_KEY
+             environment variable. An existing index can only be opened with the key it was built with.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_INDEX_PATH, key: Optional[bytes] = None):
+        key = key if key is not None else os.getenv(INDEX_KEY_ENV)
+        if not key:
+            raise ValueError(f"The PII index requires a key (set {INDEX_KEY_ENV}).")
+        key = key.encode() if isinstance(key, str) else key
+        # BLAKE2b keys are at most 64 bytes.
+        self._key = hashlib.sha256(key).digest()
+        self._hashes = {}
+        self.db_path = db_path
+        self.bloom_path = db_path + ".bloom"
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._connection = sqlite3.connect(db_path)
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        self._connection.executescript(SCHEMA)
+        self._check_key()
+        self.bloom = self._load_bloom()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self) -> "PiiIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def value_hash(self, value: bytes) -> bytes:
+        """
+        Returns the keyed hash of a PII value (normalized first).
+        """
+        digest = self._hashes.get(value)
+        if digest is None:
+            digest = hashlib.blake2b(normalize_value(value), key=self._key, digest_size=HASH_BYTES).digest()
+            if len(self._hashes) >= HASH_CACHE_SIZE:
+                self._hashes.clear()
+            self._hashes[value] = digest
+        return digest
+
+    def _meta(self, name: str) -> Optional[str]:
+        row = self._connection.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, name: str, value: Any) -> None:
+        self._connection.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, str(value)))
+
+    def _check_key(self) -> None:
+        check = hashlib.blake2b(b"pii-index-key-check", key=self._key, digest_size=HASH_BYTES).hexdigest()
+        stored = self._meta("key_check")
+        if stored is None:
+            with self._connection:
+                self._set_meta("key_check", check)
+                self._set_meta("generation", 0)
+        elif stored != check:
+            raise ValueError(f"The key does not match the one {self.db_path} was built with.")
+
+    def _generation(self) -> int:
+        return int(self._meta("generation"))
+
+    def _load_bloom(self) -> BloomFilter:
+        try:
+            with open(self.bloom_path, "rb") as f:
+                bloom, generation = BloomFilter.from_bytes(f.read())
+            if generation == self._generation() and bloom.count <= bloom.capacity:
+                return bloom
+        except (OSError, ValueError, struct.error):
+            pass
+        return self._rebuild_bloom()
+
+    def _rebuild_bloom(self) -> BloomFilter:
+        distinct = self._connection.execute("SELECT COUNT(DISTINCT value_hash) FROM postings").fetchone()[0]
+        bloom = BloomFilter(max(DEFAULT_BLOOM_CAPACITY, 2 * distinct))
+        for (digest,) in self._connection.execute("SELECT DISTINCT value_hash FROM postings"):
+            bloom.add(digest)
+        self.bloom = bloom
+        self._save_bloom()
+        return bloom
+
+    def _save_bloom(self) -> None:
+        partial_path = self.bloom_path + ".partial"
+        with open(partial_path, "wb") as f:
+            f.write(self.bloom.to_bytes(self._generation()))
+        os.replace(partial_path, self.bloom_path)
+
+    def _index_range(self, file_id: int, path: str, start: int, chunk_size: int) -> Tuple[int, int, int]:
+        """
+        Adds the postings of path from byte start on. Returns (bytes read, postings added, start of the last incomplete line).
+        """
+        added = 0
+        end = resume_offset = start
+        with open(path, "rb") as f:
+            f.seek(start)
+            for offset, chunk in iter_line_chunks(f, chunk_size, start):
+                rows = []
+                for span_start, span_end, label in find_pii_spans(chunk):
+                    digest = self.value_hash(chunk[span_start:span_end])
+                    self.bloom.add(digest)
+                    rows.append((digest, file_id, offset + span_start, label))
+                added += self._connection.executemany(
+                    "INSERT OR IGNORE INTO postings (value_hash, file_id, byte_offset, label) VALUES (?, ?, ?, ?)", rows
+                ).rowcount
+                end = offset + len(chunk)
+                resume_offset = end if chunk.endswith(b"\n") else offset
+        return end - start, added, resume_offset
+
+    def update(self, paths: Iterable[str], prune_missing: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, int]:
+        """
+        Brings the index up to date with the given files: new files are indexed, grown files
+        from where their indexing stopped, replaced files again from the start; unchanged files
+        are skipped. With prune_missing, indexed files that no longer exist are removed.
+        Returns {"files_indexed", "files_appended", "files_reindexed", "files_unchanged",
+        "files_removed", "bytes_indexed", "postings_added"}.
+        """
+        stats = dict.fromkeys(("files_indexed", "files_appended", "files_reindexed", "files_unchanged",
+                               "files_removed", "bytes_indexed", "postings_added"), 0)
+        connection = self._connection
+        with connection:
+            for path in (os.path.abspath(path) for path in paths):
+                stat = os.stat(path)
+                row = connection.execute(
+                    "SELECT file_id, size, mtime_ns, resume_offset, head_hash FROM files WHERE path = ?", (path,)
+                ).fetchone()
+                if row is None:
+                    file_id = connection.execute(
+                        "INSERT INTO files (path, size, mtime_ns, resume_offset, head_hash) VALUES (?, 0, 0, 0, '')", (path,)
+                    ).lastrowid
+                    start, status = 0, "files_indexed"
+                else:
+                    file_id, size, mtime_ns, resume_offset, head_hash = row
+                    if size == stat.st_size and mtime_ns == stat.st_mtime_ns:
+                        stats["files_unchanged"] += 1
+                        continue
+                    if stat.st_size >= size and _head_hash(path, min(size, HEAD_BYTES)) == head_hash:
+                        # Appended to: re-read from the start of the line that was incomplete.
+                        start, status = resume_offset, "files_appended"
+                    else:
+                        start, status = 0, "files_reindexed"
+                    connection.execute("DELETE FROM postings WHERE file_id = ? AND byte_offset >= ?", (file_id, start))
+                read, added, resume_offset = self._index_range(file_id, path, start, chunk_size)
+                connection.execute(
+                    "UPDATE files SET size = ?, mtime_ns = ?, resume_offset = ?, head_hash = ? WHERE file_id = ?",
+                    (start + read, stat.st_mtime_ns, resume_offset, _head_hash(path, min(start + read, HEAD_BYTES)), file_id),
+                )
+                stats[status] += 1
+                stats["bytes_indexed"] += read
+                stats["postings_added"] += added
+            if prune_missing:
+                missing = [(file_id,) for file_id, path in connection.execute("SELECT file_id, path FROM files")
+                           if not os.path.exists(path)]
+                connection.executemany("DELETE FROM files WHERE file_id = ?", missing)
+                stats["files_removed"] = len(missing)
+            self._set_meta("generation", self._generation() + 1)
+        if self.bloom.count > self.bloom.capacity:
+            self._rebuild_bloom()
+        else:
+            self._save_bloom()
+        return stats
+
+    def might_contain(self, value: str) -> bool:
+        """
+        Returns False if value is certainly not indexed (Bloom filter only; no database query).
+        """
+        return self.value_hash(value.encode()) in self.bloom
+
+    def lookup(self, value: str) -> List[Dict[str, Any]]:
+        """
+        Returns every indexed occurrence of value as {"path", "offset", "label"}, ordered by path and offset.
+        """
+        digest = self.value_hash(value.encode())
+        if digest not in self.bloom:
+            return []
+        rows = self._connection.execute(
+            "SELECT f.path, p.byte_offset, p.label FROM postings p JOIN files f ON f.file_id = p.file_id "
+            "WHERE p.value_hash = ? ORDER BY f.path, p.byte_offset",
+            (digest,),
+        ).fetchall()
+        return [{"path": path, "offset": offset, "label": label} for path, offset, label in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the number of files, postings and distinct values indexed, and the Bloom filter's size and fill.
+        """
+        connection = self._connection
+        files, indexed_bytes = connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM files").fetchone()
+        postings = connection.execute("SELECT COUNT(*) FROM postings").fetchone()[0]
+        distinct = connection.execute("SELECT COUNT(DISTINCT value_hash) FROM postings").fetchone()[0]
+        return {
+            "files": files, "bytes": indexed_bytes, "postings": postings, "distinct_values": distinct,
+            "bloom_bits": self.bloom.bit_count, "bloom_hashes": self.bloom.hash_count,
+            "bloom_fill": self.bloom.count / self.bloom.capacity,
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=f"Index where PII values occur in log files (key from {INDEX_KEY_ENV}).")
+    parser.add_argument("--db", default=DEFAULT_INDEX_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+    update = commands.add_parser("update", help="index new and changed log files")
+    update.add_argument("paths", nargs="*", default=["data/sample_log.txt"], help="log files or directories")
+    update.add_argument("--prune", action="store_true", help="remove indexed files that no longer exist")
+    lookup = commands.add_parser("lookup", help="list the files and offsets where values occur")
+    lookup.add_argument("values", nargs="*", help="values to look up (default: one per line on stdin, "
+                                                  "which keeps them out of the shell history)")
+    commands.add_parser("stats", help="show the size of the index")
+    args = parser.parse_args()
+
+    with PiiIndex(args.db) as index:
+        if args.command == "update":
+            print(index.update(list_log_files(args.paths), prune_missing=args.prune))
+        elif args.command == "lookup":
+            values = args.values or [line.strip() for line in sys.stdin if line.strip()]
+            for number, value in enumerate(values, 1):
+                occurrences = index.lookup(value)
+                if not occurrences:
+                    print(f"value {number}: not found")
+                for occurrence in occurrences:
+                    print(f"value {number}: {occurrence['path']}:{occurrence['offset']} ({occurrence['label']})")
+        else:
+            print(index.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+pii_redact.py
+
+Writes sanitized copies of log files with every PII match replaced, for sending logs to
+analytics systems. Files are streamed chunk by chunk (chunks end at line boundaries, so memory
+use does not depend on file size) through pii_scan.find_pii_spans, and several files are
+redacted in parallel worker processes.
+
+Two modes:
+    mask   Each value is replaced by its label, e.g. [EMAIL].
+    token  Each value is replaced by a stable token, e.g. [EMAIL:3f2a9c0e51b7d846], derived with
+           HMAC-SHA256 under a secret key: the same value gets the same token in every file and
+           run, so redacted logs can still be joined and counted by value, but tokens cannot be
+           reversed or recomputed without the key.
+
+Classes/Functions:
+    - Redactor: Replaces the PII in bytes by masks or tokens.
+    - redact_stream: Redacts a binary stream into another, chunk by chunk.
+    - redact_file: Redacts one file into an output path.
+    - redact_files: Redacts several files in parallel into an output directory.
+"""
+
+import os
+import sys
+import hmac
+import hashlib
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Dict, List, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from compliance_checker.pii_scan import find_pii_spans, iter_line_chunks, list_log_files, PII_PATTERNS, DEFAULT_CHUNK_SIZE
+
+MODES = ("mask", "token")
+DEFAULT_OUTPUT_DIR = os.path.join("data", "redacted")
+TOKEN_KEY_ENV = "PII_TOKEN_KEY"
+TOKEN_HEX_CHARS = 16
+# Distinct values whose tokens are memoized per process; logs repeat the same values a lot.
+TOKEN_CACHE_SIZE = 100_000
+
+
+class Redactor:
+    """
+    mode: "mask" or "token".
+    key:  HMAC key for token mode (bytes or str); defaults to the PII_TOKEN_KEY environment variable.
+    """
+
+    def __init__(self, mode: str = "mask", key: Optional[bytes] = None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown redaction mode: {mode}")
+        if mode == "token":
+            key = key if key is not None else os.getenv(TOKEN_KEY_ENV)
+            if not key:
+                raise ValueError(f"Token mode requires a key (set {TOKEN_KEY_ENV}).")
+        self.mode = mode
+        self.key = key.encode() if isinstance(key, str) else key
+        self._masks = {label: f"[{label.upper()}]".encode() for label in PII_PATTERNS}
+        self._tokens = {}
+
+    def replacement(self, label: str, value: bytes) -> bytes:
+        if self.mode == "mask":
+            return self._masks[label]
+        token = self._tokens.get((label, value))
+        if token is None:
+            digest = hmac.new(self.key, label.encode() + b"\0" + value, hashlib.sha256).hexdigest()
+            token = f"[{label.upper()}:{digest[:TOKEN_HEX_CHARS]}]".encode()
+            if len(self._tokens) >= TOKEN_CACHE_SIZE:
+                self._tokens.clear()
+            self._tokens[(label, value)] = token
+        return token
+
+    def redact(self, data: bytes, counts: Optional[Counter] = None) -> bytes:
+        """
+        Returns data with every PII match replaced. Where matches of different labels overlap,
+        the one starting first (or, at the same start, the longest) is replaced.
+        counts, if given, is incremented per label replaced.
+        """
+        parts = []
+        position = 0
+        spans = sorted(find_pii_spans(data), key=lambda span: (span[0], -span[1]))
+        for start, end, label in spans:
+            if start < position:
+                continue
+            parts.append(data[position:start])
+            parts.append(self.replacement(label, data[start:end]))
+            position = end
+            if counts is not None:
+                counts[label] += 1
+        if not parts:
+            return data
+        parts.append(data[position:])
+        return b"".join(parts)
+
+
+def redact_stream(source: BinaryIO, target: BinaryIO, redactor: Redactor, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, int]:
+    """
+    Reads source in chunks of about chunk_size bytes, cut after the last complete line (a line
+    longer than a chunk is read whole), and writes each redacted chunk to target.
+    Returns {"bytes": bytes read, "redactions": {label: count}}.
+    """
+    counts = Counter()
+    total = 0
+    for _, chunk in iter_line_chunks(source, chunk_size):
+        total += len(chunk)
+        target.write(redactor.redact(chunk, counts))
+    return {"bytes": total, "redactions": dict(counts)}
+
+
+def redact_file(input_path: str, output_path: str, mode: str = "mask", key: Optional[bytes] = None,
+                chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, object]:
+    """
+    Writes a redacted copy of input_path to output_path (replaced atomically, so a partial
+    copy is never left behind). Returns {"input", "output", "bytes", "redactions"}.
+    """
+    if not os.path.isfile(input_path):
+        raise FileNotFoundError(f"File not found: {input_path}")
+    redactor = Redactor(mode, key)
+    if os.path.dirname(output_path):
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    partial_path = output_path + ".partial"
+    try:
+        with open(input_path, "rb") as source, open(partial_path, "wb") as target:
+            stats = redact_stream(source, target, redactor, chunk_size)
+        os.replace(partial_path, output_path)
+    finally:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+    return {"input": input_path, "output": output_path, **stats}
+
+
+def _output_paths(input_paths: List[str], output_dir: str) -> List[str]:
+    """
+    Maps input files to output_dir, keeping their paths relative to their common directory.
+    """
+    absolute = [os.path.abspath(path) for path in input_paths]
+    root = os.path.commonpath([os.path.dirname(path) for path in absolute])
+    return [os.path.join(output_dir, os.path.relpath(path, root)) for path in absolute]
+
+
+def redact_files(input_paths: List[str], output_dir: str = DEFAULT_OUTPUT_DIR, mode: str = "mask",
+                 key: Optional[bytes] = None, workers: Optional[int] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[Dict[str, object]]:
+    """
+    Redacts input_paths into output_dir (keeping their relative layout) using up to workers
+    processes (default: one per CPU). Returns the redact_file result of each file, in input order.
+    """
+    if not input_paths:
+        return []
+    Redactor(mode, key)  # Validates mode and key before starting workers.
+    output_paths = _output_paths(input_paths, output_dir)
+    workers = min(workers or os.cpu_count() or 1, len(input_paths))
+    if workers == 1:
+        return [redact_file(source, target, mode, key, chunk_size) for source, target in zip(input_paths, output_paths)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(redact_file, source, target, mode, key, chunk_size)
+                   for source, target in zip(input_paths, output_paths)]
+        return [future.result() for future in futures]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write PII-redacted copies of log files.")
+    parser.add_argument("paths", nargs="+", help="log files or directories")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument("--mode", choices=MODES, default="mask",
+                        help=f"mask values by label, or replace them by stable HMAC tokens (key from {TOKEN_KEY_ENV})")
+    parser.add_argument("--workers", type=int, help="parallel processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    results = redact_files(list_log_files(args.paths), args.output_dir, args.mode, workers=args.workers)
+    for result in results:
+        redactions = ", ".join(f"{label}={count}" for label, count in sorted(result["redactions"].items())) or "none"
+        print(f"{result['input']} -> {result['output']} ({result['bytes']} bytes; {redactions})")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,15 +4,57 @@ pii_scan.py
 Scans text files for Personally Identifiable Information (PII) such as emails, phone numbers,
 credit card numbers, and social security numbers using regular expressions.
 
+find_pii_spans matches the same patterns over raw bytes, line by line, with their positions, for
+callers that process large volumes (redaction, indexing). Instead of running every pattern over all of the
+input, it locates the few regions that can contain a match: lines with an "@" for emails, and
+runs of at least nine digits and separators for phone, credit card and SSN numbers (found with
+a byte translation and a literal search). Only those regions are matched with the full patterns.
+
+sample_files triages large log estates without reading them in full: it reads randomly chosen
+blocks of whole lines from each file up to a byte budget, estimates per label the fraction of
+lines containing PII with Wilson score confidence bounds, and lists the files whose sample found
+PII or was too small to rule out more than a tolerated fraction of PII lines.
+
+scan_json_lines scans structured logs (one JSON object per line) field by field instead of as flat
+text: each line is parsed (with orjson when installed, else json), and only string values whose
+field path matches the configured patterns are matched, so keys, timestamps in unselected fields
+and numeric fields (IDs, counters) cost nothing and cause no false positives. Each finding carries
+its line number and JSON path. scan_files uses it for .jsonl and .ndjson files.
+
 Functions:
     - scan_text_for_pii: Scans a string for PII patterns.
+    - find_pii_spans: Returns the positions of all PII pattern matches in bytes.
+    - iter_line_chunks: Reads a binary stream in chunks that end at line boundaries.
     - scan_file: Scans a file for PII by reading its contents.
+    - scan_json_lines: Scans selected fields of JSON-lines records for PII, with their JSON paths.
+    - scan_json_file: Scans a JSON-lines log file field by field.
+    - list_log_files: Expands log files and directories into the list of files to scan.
+    - scan_files: Scans several files for PII and merges the findings.
     - perform_pii_scan: Wrapper to scan a default file for PII.
+    - scan_config: Returns the detection configuration results depend on, for cache keys.
+    - wilson_interval: Wilson score confidence interval of a proportion.
+    - sample_file: Counts PII lines in random blocks of one file.
+    - sample_files: Estimates PII prevalence across files from samples within a byte budget.
 """
 
 import re
 import os
-from typing import List, Dict
+import sys
+import json
+import random
+import argparse
+from fnmatch import fnmatchcase
+from statistics import NormalDist
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, List, Dict, Optional, Sequence, Tuple, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from compliance_checker.telemetry import stage
 
 PII_PATTERNS = {
     'email': r'[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+',
@@ -21,17 +63,114 @@ PII_PATTERNS = {
     'ssn': r'\b\d{3}-\d{2}-\d{4}\b',
 }
 
+# Compiled once at import time and reused for every scan.
+COMPILED_PII_PATTERNS = {label: re.compile(pattern) for label, pattern in PII_PATTERNS.items()}
+
+# Bytes versions for find_pii_spans (ASCII semantics for \d, \s and \b).
+COMPILED_PII_BYTES_PATTERNS = {label: re.compile(pattern.encode()) for label, pattern in PII_PATTERNS.items()}
+# Phone, credit card and SSN matches consist only of digits and these separators, and contain at least nine digits.
+NUMBER_LABELS = ("phone", "credit_card", "ssn")
+NUMBER_SEPARATORS = b"()+.- \t\n\r\f\v"
+MIN_NUMBER_DIGITS = 9
+# Newlines end a run, so a number at the end of one line and a date starting the next are not joined.
+_NUMBER_MASK = bytes(
+    ord("0") if byte in b"0123456789" + NUMBER_SEPARATORS and byte != ord("\n") else ord("x") for byte in range(256)
+)
+_NUMBER_RUN_KEY = b"0" * MIN_NUMBER_DIGITS
+
+# Bump when a change to the scanning code changes its findings for the same inputs and patterns.
+CACHE_VERSION = 1
+
+LOG_FILE_EXTENSIONS = (".log", ".txt", ".jsonl", ".ndjson")
+JSON_LINES_EXTENSIONS = (".jsonl", ".ndjson")
+# Field patterns scanned in JSON-lines logs, comma-separated; "*" scans every string value.
+JSON_FIELDS_ENV = "PII_JSON_FIELDS"
+DEFAULT_JSON_FIELDS = tuple(field.strip() for field in os.getenv(JSON_FIELDS_ENV, "*").split(",") if field.strip())
+# Field path decisions memoized per scan; cleared if a log uses unbounded keys (e.g. IDs as keys).
+FIELD_CACHE_SIZE = 10_000
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+DEFAULT_SAMPLE_BUDGET = 64 * 1024 * 1024
+DEFAULT_SAMPLE_BLOCK_SIZE = 64 * 1024
+DEFAULT_CONFIDENCE = 0.95
+# A file needs a full scan unless its sample rules out more than this fraction of lines holding PII.
+DEFAULT_MAX_PREVALENCE = 0.001
+
 def scan_text_for_pii(text: str) -> Dict[str, List[str]]:
     """
     Scans the provided text for PII patterns.
     Returns a dictionary with PII types as keys and lists of matches as values.
     """
     findings = {}
-    for label, pattern in PII_PATTERNS.items():
-        matches = re.findall(pattern, text)
+    for label, pattern in COMPILED_PII_PATTERNS.items():
+        matches = pattern.findall(text)
         findings[label] = matches  # Always include the label, even if no matches
     return findings
 
+def find_pii_spans(data: bytes) -> List[Tuple[int, int, str]]:
+    """
+    Returns (start, end, label) of every match of every PII pattern in data, sorted by start.
+    Each label's matches are those its pattern finds scanning each line of data on its own
+    (unlike scan_text_for_pii, a match never spans a line break); matches of different labels
+    may overlap.
+    """
+    spans = []
+    # Number patterns: only inside maximal runs of digits and separators holding enough digits.
+    mask = data.translate(_NUMBER_MASK)
+    find = mask.find
+    position = 0
+    while True:
+        # The search resumes after a non-run byte, so the first hit is the start of a run.
+        start = find(_NUMBER_RUN_KEY, position)
+        if start == -1:
+            break
+        end = find(b"x", start)
+        if end == -1:
+            end = len(data)
+        if len(data[start:end].translate(None, NUMBER_SEPARATORS)) >= MIN_NUMBER_DIGITS:
+            for label in NUMBER_LABELS:
+                # endpos one past the run, so \b sees the character that ends it.
+                for match in COMPILED_PII_BYTES_PATTERNS[label].finditer(data, start, end + 1):
+                    spans.append((match.start(), match.end(), label))
+        position = end + 1
+    # Emails: only on lines containing "@" (an email match cannot span lines).
+    email = COMPILED_PII_BYTES_PATTERNS["email"]
+    at = data.find(b"@")
+    while at != -1:
+        line_end = data.find(b"\n", at)
+        if line_end == -1:
+            line_end = len(data)
+        for match in email.finditer(data, data.rfind(b"\n", 0, at) + 1, line_end):
+            spans.append((match.start(), match.end(), "email"))
+        at = data.find(b"@", line_end)
+    spans.sort()
+    return spans
+
+def iter_line_chunks(source: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE, offset: int = 0) -> Iterator[Tuple[int, bytes]]:
+    """
+    Reads source from its current position in blocks of chunk_size bytes and yields
+    (offset of the chunk, chunk), each chunk cut after its last complete line. A line longer
+    than a chunk is yielded whole; a final line without a newline is yielded last.
+    offset is the stream position the reading starts at.
+    """
+    pending = b""
+    while True:
+        block = source.read(chunk_size)
+        if not block:
+            break
+        data = pending + block
+        cut = data.rfind(b"\n") + 1
+        if cut == 0:
+            pending = data
+            continue
+        yield offset, data[:cut]
+        offset += cut
+        pending = data[cut:]
+    if pending:
+        yield offset, pending
+
 def scan_file(file_path: str) -> Dict[str, List[str]]:
     """
     Reads the contents of a file and scans it for PII.
@@ -39,9 +178,127 @@ def scan_file(file_path: str) -> Dict[str, List[str]]:
     """
     if not os.path.isfile(file_path):
         raise FileNotFoundError(f"File not found: {file_path}")
-    with open(file_path, 'r', encoding='utf-8') as f:
-        text = f.read()
-    return scan_text_for_pii(text)
+    with stage("read"):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            text = f.read()
+    with stage("match"):
+        return scan_text_for_pii(text)
+
+def _field_selector(fields: Sequence[str]) -> Callable[[str], bool]:
+    """
+    Returns a function telling whether a field path (keys joined by dots, list indices left
+    out, e.g. "user.email") is selected: a pattern selects it if it matches the whole path or
+    its last key, so "*email*" selects email fields at any depth.
+    """
+    cache = {}
+
+    def selected(path: str) -> bool:
+        hit = cache.get(path)
+        if hit is None:
+            if len(cache) >= FIELD_CACHE_SIZE:
+                cache.clear()
+            last = path.rpartition(".")[2]
+            hit = cache[path] = any(fnmatchcase(path, field) or fnmatchcase(last, field) for field in fields)
+        return hit
+
+    return selected
+
+def _json_path(location: Tuple[Union[str, int], ...]) -> str:
+    parts = ["$"]
+    for step in location:
+        if isinstance(step, int):
+            parts.append(f"[{step}]")
+        elif step.isidentifier():
+            parts.append(f".{step}")
+        else:
+            parts.append("['" + step.replace("\\", "\\\\").replace("'", "\\'") + "']")
+    return "".join(parts)
+
+def _scan_json_value(value: Any, field_path: str, location: Tuple[Union[str, int], ...],
+                     selected: Callable[[str], bool], line_number: int, findings: Dict[str, List[Dict[str, Any]]]) -> None:
+    if isinstance(value, str):
+        # Emails contain "@" and number patterns need at least nine digits; most values have neither.
+        if ("@" in value or len(value) >= MIN_NUMBER_DIGITS) and selected(field_path):
+            data = value.encode()
+            for start, end, label in find_pii_spans(data):
+                findings[label].append({"value": data[start:end].decode(), "line": line_number, "path": _json_path(location)})
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            _scan_json_value(item, f"{field_path}.{key}" if field_path else key, location + (key,),
+                             selected, line_number, findings)
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            _scan_json_value(item, field_path, location + (index,), selected, line_number, findings)
+
+def scan_json_lines(lines: Iterable[Union[bytes, str]], fields: Sequence[str] = DEFAULT_JSON_FIELDS) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Scans JSON-lines records for PII, matching only string values whose field path is selected
+    by one of the fnmatch patterns in fields (see _field_selector). Keys and non-string values
+    are never matched. Values are matched like lines by find_pii_spans, so a match never spans
+    a newline inside a value. Lines that are not valid JSON are scanned as flat text.
+    Returns {label: [{"value", "line", "path"}]} with 1-based line numbers and JSON paths such
+    as "$.user.email" ("path" is None for lines scanned as text); every label is included.
+    """
+    findings = {label: [] for label in PII_PATTERNS}
+    selected = _field_selector(fields)
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = _json_loads(line)
+        except ValueError:
+            data = line.encode() if isinstance(line, str) else line
+            for start, end, label in find_pii_spans(data.rstrip(b"\r\n")):
+                findings[label].append({"value": data[start:end].decode(errors="replace"), "line": line_number, "path": None})
+            continue
+        _scan_json_value(record, "", (), selected, line_number, findings)
+    return findings
+
+def scan_json_file(file_path: str, fields: Sequence[str] = DEFAULT_JSON_FIELDS) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Scans a JSON-lines file for PII field by field, reading it line by line (see scan_json_lines).
+    Raises FileNotFoundError if the file does not exist.
+    """
+    if not os.path.isfile(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+    with stage("match"):
+        with open(file_path, "rb") as f:
+            return scan_json_lines(f, fields)
+
+def list_log_files(paths: List[str]) -> List[str]:
+    """
+    Expands a list of log files and directories into the sorted list of log files to scan.
+    Directories are searched recursively for files with a log extension.
+    Raises FileNotFoundError if a path does not exist.
+    """
+    log_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for dir_path, _, file_names in os.walk(path):
+                log_files.extend(
+                    os.path.join(dir_path, name) for name in file_names if name.lower().endswith(LOG_FILE_EXTENSIONS)
+                )
+        elif os.path.isfile(path):
+            log_files.append(path)
+        else:
+            raise FileNotFoundError(f"File not found: {path}")
+    return sorted(set(log_files))
+
+def scan_files(file_paths: List[str]) -> Dict[str, List[str]]:
+    """
+    Scans several files for PII and merges the matches per PII type, in file order.
+    JSON-lines files (.jsonl, .ndjson) are scanned field by field with scan_json_file.
+    Raises FileNotFoundError if any file does not exist.
+    """
+    findings = {label: [] for label in PII_PATTERNS}
+    for file_path in file_paths:
+        if file_path.lower().endswith(JSON_LINES_EXTENSIONS):
+            for label, matches in scan_json_file(file_path).items():
+                findings[label].extend(match["value"] for match in matches)
+            continue
+        for label, matches in scan_file(file_path).items():
+            findings[label].extend(matches)
+    return findings
 
 def perform_pii_scan(file_path: str = "data/sample_log.txt") -> Dict[str, List[str]]:
     """
@@ -50,9 +307,180 @@ def perform_pii_scan(file_path: str = "data/sample_log.txt") -> Dict[str, List[s
     """
     return scan_file(file_path)
 
+def scan_config() -> Dict[str, Any]:
+    """
+    Returns everything besides the log contents that scan_files findings depend on: the
+    patterns, which files are scanned as JSON lines and which fields, and CACHE_VERSION.
+    """
+    return {
+        "version": CACHE_VERSION,
+        "patterns": PII_PATTERNS,
+        "json_lines_extensions": JSON_LINES_EXTENSIONS,
+        "json_fields": DEFAULT_JSON_FIELDS,
+    }
+
+def wilson_interval(successes: int, trials: int, confidence: float = DEFAULT_CONFIDENCE) -> Tuple[float, float]:
+    """
+    Returns the Wilson score interval (low, high) of a proportion observed as successes out of
+    trials. Unlike the normal approximation it stays within [0, 1] and is informative when no
+    successes were seen. Returns (0.0, 1.0) for zero trials.
+    """
+    if trials == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denominator
+    margin = z * ((p * (1 - p) / trials + z * z / (4 * trials * trials)) ** 0.5) / denominator
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+def _count_pii_lines(data: bytes) -> Tuple[int, int, Dict[str, int]]:
+    """
+    Returns (lines, lines with any PII, {label: lines with that label}) of whole lines in data.
+    """
+    lines = data.count(b"\n") + (1 if data and not data.endswith(b"\n") else 0)
+    hit_lines = {label: set() for label in PII_PATTERNS}
+    for start, _, label in find_pii_spans(data):
+        hit_lines[label].add(data.rfind(b"\n", 0, start))
+    any_lines = set().union(*hit_lines.values())
+    return lines, len(any_lines), {label: len(starts) for label, starts in hit_lines.items()}
+
+def sample_file(
+    file_path: str,
+    budget_bytes: int = DEFAULT_SAMPLE_BUDGET,
+    block_size: int = DEFAULT_SAMPLE_BLOCK_SIZE,
+    rng: Optional[random.Random] = None
+) -> Dict[str, Any]:
+    """
+    Reads up to budget_bytes of file_path as randomly chosen, non-overlapping blocks (seeking to
+    each), trims every block to whole lines and counts the lines holding PII. Files no larger
+    than the budget are read in full and marked exact.
+    Returns {"path", "size", "bytes_sampled", "lines_sampled", "pii_lines", "label_lines", "exact"}.
+    """
+    rng = rng or random.Random()
+    size = os.path.getsize(file_path)
+    sample = {"path": file_path, "size": size, "bytes_sampled": 0, "lines_sampled": 0, "pii_lines": 0,
+              "label_lines": {label: 0 for label in PII_PATTERNS}, "exact": size <= budget_bytes}
+    with open(file_path, "rb") as f:
+        if sample["exact"]:
+            blocks = [f.read()]
+        else:
+            # The last block may be short, so the tail of the file can be sampled too.
+            block_count = -(-size // block_size)
+            chosen = rng.sample(range(block_count), min(block_count, max(1, budget_bytes // block_size)))
+            blocks = []
+            for index in sorted(chosen):
+                offset = index * block_size
+                f.seek(offset)
+                block = f.read(block_size)
+                # Drop the partial lines at either end; the first line is whole only at offset 0.
+                start = block.find(b"\n") + 1 if offset else 0
+                end = len(block) if offset + len(block) >= size else block.rfind(b"\n") + 1
+                blocks.append(block[start:end] if end > start else b"")
+    for block in blocks:
+        sample["bytes_sampled"] += len(block)
+        lines, pii_lines, label_lines = _count_pii_lines(block)
+        sample["lines_sampled"] += lines
+        sample["pii_lines"] += pii_lines
+        for label, count in label_lines.items():
+            sample["label_lines"][label] += count
+    return sample
+
+def sample_files(
+    file_paths: List[str],
+    budget_bytes: int = DEFAULT_SAMPLE_BUDGET,
+    block_size: int = DEFAULT_SAMPLE_BLOCK_SIZE,
+    confidence: float = DEFAULT_CONFIDENCE,
+    max_prevalence: float = DEFAULT_MAX_PREVALENCE,
+    seed: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Samples every file, splitting budget_bytes across files in proportion to their size (at least
+    one block each), and returns:
+        {"files", "total_bytes", "bytes_sampled", "lines_sampled", "confidence",
+         "prevalence": {label: {"lines", "rate", "low", "high"}} (fraction of sampled lines),
+         "samples": per-file sample_file results, each with "low" and "high" (bounds of its PII
+                    line fraction; both the exact fraction for files read in full) and "needs_full_scan",
+         "needs_full_scan": paths of sampled files whose sample found PII, or whose upper bound
+                            exceeds max_prevalence,
+         "files_with_pii": paths of files read in full that contain PII}.
+    Lines are sampled in blocks, so the bounds assume PII lines are not strongly clustered.
+    """
+    rng = random.Random(seed)
+    sizes = {path: os.path.getsize(path) for path in file_paths}
+    total_bytes = sum(sizes.values())
+    samples = []
+    for path in file_paths:
+        share = budget_bytes * sizes[path] // total_bytes if total_bytes else 0
+        sample = sample_file(path, max(block_size, share), block_size, rng)
+        if sample["exact"]:
+            rate = sample["pii_lines"] / sample["lines_sampled"] if sample["lines_sampled"] else 0.0
+            sample["low"] = sample["high"] = rate
+        else:
+            sample["low"], sample["high"] = wilson_interval(sample["pii_lines"], sample["lines_sampled"], confidence)
+        sample["needs_full_scan"] = not sample["exact"] and (sample["pii_lines"] > 0 or sample["high"] > max_prevalence)
+        samples.append(sample)
+
+    lines_sampled = sum(sample["lines_sampled"] for sample in samples)
+    prevalence = {}
+    for label in PII_PATTERNS:
+        lines = sum(sample["label_lines"][label] for sample in samples)
+        low, high = wilson_interval(lines, lines_sampled, confidence)
+        prevalence[label] = {"lines": lines, "rate": lines / lines_sampled if lines_sampled else 0.0, "low": low, "high": high}
+    return {
+        "files": len(samples),
+        "total_bytes": total_bytes,
+        "bytes_sampled": sum(sample["bytes_sampled"] for sample in samples),
+        "lines_sampled": lines_sampled,
+        "confidence": confidence,
+        "prevalence": prevalence,
+        "samples": samples,
+        "needs_full_scan": [sample["path"] for sample in samples if sample["needs_full_scan"]],
+        "files_with_pii": [sample["path"] for sample in samples if sample["exact"] and sample["pii_lines"]],
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Scan log files for PII, or estimate PII prevalence from samples.")
+    parser.add_argument("paths", nargs="*", default=["data/sample_log.txt"], help="log files or directories")
+    parser.add_argument("--sample", action="store_true", help="read random blocks instead of every byte")
+    parser.add_argument("--budget-mib", type=float, default=DEFAULT_SAMPLE_BUDGET / 2**20,
+                        help="total bytes to read when sampling, in MiB")
+    parser.add_argument("--max-prevalence", type=float, default=DEFAULT_MAX_PREVALENCE,
+                        help="fraction of PII lines a sample must rule out for a file to skip a full scan")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--json", action="store_true", help="scan files as JSON lines, field by field")
+    parser.add_argument("--fields", default=",".join(DEFAULT_JSON_FIELDS),
+                        help=f"comma-separated field patterns scanned with --json (default from {JSON_FIELDS_ENV}, else all)")
+    args = parser.parse_args()
+
+    file_paths = list_log_files(args.paths)
+    if args.json:
+        fields = [field.strip() for field in args.fields.split(",") if field.strip()]
+        for file_path in file_paths:
+            for label, matches in scan_json_file(file_path, fields).items():
+                for match in matches:
+                    print(f"{file_path}:{match['line']} {match['path'] or '(text)'} {label}: {match['value']}")
+        return
+    if not args.sample:
+        results = scan_files(file_paths)
+        print("PII Scan Results:")
+        for k, v in results.items():
+            print(f"{k}: {v}")
+        return
+
+    estimate = sample_files(file_paths, int(args.budget_mib * 2**20), max_prevalence=args.max_prevalence, seed=args.seed)
+    print(f"Sampled {estimate['bytes_sampled'] / 2**20:.1f} of {estimate['total_bytes'] / 2**20:.1f} MiB "
+          f"({estimate['lines_sampled']} lines) in {estimate['files']} file(s).")
+    print(f"Fraction of lines with PII ({estimate['confidence']:.0%} confidence):")
+    for label, stats in estimate["prevalence"].items():
+        print(f"  {label}: {stats['rate']:.4%} ({stats['low']:.4%} - {stats['high']:.4%})")
+    print(f"{len(estimate['needs_full_scan'])} file(s) need a full scan:")
+    for path in estimate["needs_full_scan"]:
+        print(f"  {path}")
+    if estimate["files_with_pii"]:
+        print(f"{len(estimate['files_with_pii'])} file(s) read in full contain PII:")
+        for path in estimate["files_with_pii"]:
+            print(f"  {path}")
+
 if __name__ == "__main__":
-    # Example usage: Run a PII scan on the default file and print results.
-    results = perform_pii_scan()
-    print("PII Scan Results:")
-    for k, v in results.items():
-        print(f"{k}: {v}")
+    main()
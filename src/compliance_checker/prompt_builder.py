@@ -0,0 +1,264 @@
+"""
+prompt_builder.py
+
+Builds executive summary prompts that fit a token budget, so prompt size (and inference latency)
+stays bounded however many findings a scan produces.
+
+Results that fit the budget are sent as they are. Larger results are compressed into per-check
+statistics: finding counts per section, the most common values of fields such as resource type
+or missing tag, and a few example findings; the number and length of examples shrink until the
+prompt fits. If even that does not fit, the compressed sections are packed into chunks that are
+summarized in parallel (map) and the partial summaries are combined into one paragraph (reduce).
+Partial summaries too long to combine within the budget are truncated, and a map prompt that
+still does not fit at the highest compression is cut at the budget.
+
+Functions:
+    - estimate_tokens: Approximate token count of a text.
+    - compress_results: Aggregated statistics and top-N examples of scan results.
+    - build_prompt: Returns a single prompt within the budget, or None if one cannot fit.
+    - summarize_results: Summarizes results with one prompt or map-reduce, using a completion callable.
+"""
+
+import json
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from compliance_checker.render import normalize_results, format_finding, CheckFindings
+
+# Rough average for English and JSON text with LLaMA/GPT tokenizers.
+CHARS_PER_TOKEN = 4
+# Prompt budget leaving room for the answer in a 4k context window.
+DEFAULT_PROMPT_TOKENS = 2500
+DEFAULT_MAP_WORKERS = 4
+# Shortest partial summary (in characters) worth combining; smaller budgets are rejected.
+MIN_REDUCE_CHARS = 80
+# (examples per section, max characters per example), tried in order until the prompt fits.
+COMPRESSION_LEVELS = ((5, 300), (3, 160), (1, 100), (0, 0))
+
+SUMMARY_INSTRUCTIONS = (
+    "You are a compliance and governance expert. "
+    "Write a one-paragraph executive summary of the Azure compliance scan results provided below. "
+    "Use formal plain English with no formatting — do not use markdown, bullet points, headings, or tables. "
+    "Just a professional paragraph summarizing the results."
+)
+COMPRESSED_NOTE = (
+    "The results are aggregated: 'count' is the number of findings, 'common' lists the most frequent "
+    "values with their counts, and 'examples' shows a few individual findings."
+)
+MAP_INSTRUCTIONS = (
+    "You are a compliance and governance expert. "
+    "In two or three plain sentences, summarize the key risks in this part of an Azure compliance scan. "
+    + COMPRESSED_NOTE
+)
+REDUCE_INSTRUCTIONS = (
+    "You are a compliance and governance expert. "
+    "Combine the partial summaries of one Azure compliance scan below into a one-paragraph executive summary "
+    "in formal plain English with no formatting — no markdown, bullet points, headings, or tables."
+)
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    return text if len(text) <= max_chars else text[:max_chars - 3] + "..."
+
+
+def _fit(prompt: str, budget_tokens: int) -> str:
+    """
+    Returns prompt cut to at most budget_tokens (estimated).
+    """
+    return _truncate(prompt, max(0, (budget_tokens - 1) * CHARS_PER_TOKEN))
+
+
+def _common_values(items: List[Any], top_n: int) -> Dict[str, Dict[str, int]]:
+    """
+    Counts the values of string and list-of-string fields of dict findings (or the findings
+    themselves, if strings) and keeps the top_n values of fields where some value repeats.
+    """
+    counters = {}
+    for item in items:
+        fields = item.items() if isinstance(item, dict) else [("finding", item)]
+        for field, value in fields:
+            values = value if isinstance(value, list) else [value]
+            counter = counters.setdefault(field, Counter())
+            counter.update(v for v in values if isinstance(v, str))
+    common = {}
+    for field, counter in counters.items():
+        top = counter.most_common(max(top_n, 3))
+        # Fields unique per finding (names, addresses) carry no aggregate information.
+        if top and top[0][1] > 1:
+            common[field] = dict(top)
+    return common
+
+
+def _compress_section(items: List[Any], top_n: int, max_chars: int) -> Dict[str, Any]:
+    section = {"count": len(items)}
+    common = _common_values(items, top_n)
+    if common:
+        section["common"] = common
+    if top_n:
+        section["examples"] = [_truncate(format_finding(item), max_chars) for item in items[:top_n]]
+    return section
+
+
+def _compress_check(check: CheckFindings, top_n: int, max_chars: int) -> Dict[str, Dict[str, Any]]:
+    """
+    Returns {section label: compressed section} for one check.
+    """
+    compressed = {}
+    for section in check.sections:
+        label = section.key or "findings"
+        if section.is_list:
+            compressed[label] = _compress_section(section.items, top_n, max_chars)
+        else:
+            compressed[label] = {"value": _truncate(json.dumps(section.items[0], default=str), max(max_chars, 200))}
+    return compressed
+
+
+def compress_results(results: Dict[str, Any], top_n: int = 5, max_example_chars: int = 300) -> Dict[str, Any]:
+    """
+    Returns {check: {section: {"count", "common", "examples"} or {"value"}}}, with at most top_n
+    examples of at most max_example_chars characters per section.
+    """
+    return {
+        check.name: _compress_check(check, top_n, max_example_chars) if not check.empty else {"count": 0}
+        for check in normalize_results(results)
+    }
+
+
+def _prompt(instructions: str, payload: Any) -> str:
+    return f"{instructions}\n\n{json.dumps(payload, indent=1, default=str)}"
+
+
+def _bounded_prompt(instructions: str, payload: Any, budget_tokens: int) -> Optional[str]:
+    """
+    Returns _prompt(instructions, payload) if it fits budget_tokens, otherwise None, without
+    encoding more of a large payload than the budget allows.
+    """
+    limit = budget_tokens * CHARS_PER_TOKEN
+    parts, size = [], len(instructions) + 2
+    for part in json.JSONEncoder(indent=1, default=str).iterencode(payload):
+        size += len(part)
+        if size >= limit:
+            return None
+        parts.append(part)
+    return f"{instructions}\n\n{''.join(parts)}"
+
+
+def build_prompt(results: Dict[str, Any], budget_tokens: int = DEFAULT_PROMPT_TOKENS) -> Optional[str]:
+    """
+    Returns a single summary prompt of at most budget_tokens (estimated): the full results if
+    they fit, otherwise the least compressed form that fits. Returns None if none fits.
+    """
+    prompt = _bounded_prompt(SUMMARY_INSTRUCTIONS, results, budget_tokens)
+    if prompt is not None:
+        return prompt
+    for top_n, max_chars in COMPRESSION_LEVELS:
+        prompt = _prompt(f"{SUMMARY_INSTRUCTIONS} {COMPRESSED_NOTE}", compress_results(results, top_n, max_chars))
+        if estimate_tokens(prompt) <= budget_tokens:
+            return prompt
+    return None
+
+
+def _chunk_prompts(results: Dict[str, Any], budget_tokens: int) -> List[str]:
+    """
+    Packs compressed sections ({check: {section: ...}}) greedily into map prompts within the budget.
+    """
+    units = []
+    for check in normalize_results(results):
+        if check.empty:
+            continue
+        for top_n, max_chars in COMPRESSION_LEVELS:
+            sections = _compress_check(check, top_n, max_chars)
+            if estimate_tokens(_prompt(MAP_INSTRUCTIONS, {check.name: sections})) <= budget_tokens:
+                break
+        units.extend((check.name, label, section) for label, section in sections.items())
+
+    prompts, chunk = [], {}
+    for check_name, label, section in units:
+        candidate = {**chunk, check_name: {**chunk.get(check_name, {}), label: section}}
+        if chunk and estimate_tokens(_prompt(MAP_INSTRUCTIONS, candidate)) > budget_tokens:
+            prompts.append(_fit(_prompt(MAP_INSTRUCTIONS, chunk), budget_tokens))
+            candidate = {check_name: {label: section}}
+        chunk = candidate
+    if chunk:
+        prompts.append(_fit(_prompt(MAP_INSTRUCTIONS, chunk), budget_tokens))
+    return prompts
+
+
+def _group_summaries(summaries: List[str], budget_tokens: int) -> List[List[str]]:
+    groups, group = [], []
+    for summary in summaries:
+        if group and estimate_tokens(_prompt(REDUCE_INSTRUCTIONS, group + [summary])) > budget_tokens:
+            groups.append(group)
+            group = []
+        group.append(summary)
+    groups.append(group)
+    return groups
+
+
+def _truncate_encoded(text: str, max_chars: int) -> str:
+    """
+    Returns text truncated so that its JSON encoding (escapes included, quotes excluded) has at
+    most max_chars characters.
+    """
+    cut = max_chars
+    while True:
+        truncated = _truncate(text, cut)
+        excess = len(json.dumps(truncated)) - 2 - max_chars
+        if excess <= 0:
+            return truncated
+        cut -= excess
+
+
+def _reduce(summaries: List[str], complete: Callable[[str], str], budget_tokens: int) -> str:
+    """
+    Combines partial summaries, in groups that fit the budget, until one summary is left. When
+    no two summaries fit one prompt (or one does not fit alone), every summary is truncated to
+    half of the room the budget leaves after the instructions, so each round makes progress.
+    Raises ValueError if the budget leaves no useful room for the summaries.
+    """
+    while True:
+        groups = _group_summaries(summaries, budget_tokens)
+        stuck = len(summaries) > 1 and len(groups) == len(summaries)
+        if stuck or any(estimate_tokens(_prompt(REDUCE_INSTRUCTIONS, group)) > budget_tokens for group in groups):
+            room = (budget_tokens - 1) * CHARS_PER_TOKEN - len(_prompt(REDUCE_INSTRUCTIONS, ["", ""]))
+            if room // 2 < MIN_REDUCE_CHARS:
+                raise ValueError(f"budget_tokens={budget_tokens} is too small to combine partial summaries")
+            summaries = [_truncate_encoded(summary, room // 2) for summary in summaries]
+            groups = _group_summaries(summaries, budget_tokens)
+        summaries = [complete(_prompt(REDUCE_INSTRUCTIONS, group)) for group in groups]
+        if len(summaries) == 1:
+            return summaries[0]
+
+
+def summarize_results(
+    results: Dict[str, Any],
+    complete: Callable[[str], str],
+    budget_tokens: int = DEFAULT_PROMPT_TOKENS,
+    max_workers: int = DEFAULT_MAP_WORKERS
+) -> Tuple[str, int]:
+    """
+    Summarizes results with complete(prompt) -> text, never sending a prompt over budget_tokens.
+    Uses one prompt when build_prompt fits, otherwise map-reduce with the map calls run on
+    max_workers threads; partial summaries and oversized map chunks are truncated to fit.
+    Returns (summary, number of completion calls). Raises ValueError if budget_tokens is too
+    small to combine the partial summaries.
+    """
+    prompt = build_prompt(results, budget_tokens)
+    if prompt is not None:
+        return complete(prompt), 1
+
+    map_prompts = _chunk_prompts(results, budget_tokens)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(map_prompts)))) as executor:
+        partials = list(executor.map(complete, map_prompts))
+    calls = [len(map_prompts)]
+
+    def counted_complete(reduce_prompt):
+        calls[0] += 1
+        return complete(reduce_prompt)
+
+    return _reduce(partials, counted_complete, budget_tokens), calls[0]
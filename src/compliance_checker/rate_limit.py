@@ -0,0 +1,79 @@
+"""
+rate_limit.py
+
+Client-side rate limiting and retry pacing shared by the clients of rate-limited services
+(the OpenAI pool, Azure Resource Manager tag updates).
+
+Classes/Functions:
+    - TokenBucket: Thread-safe token bucket rate limiter.
+    - backoff_delay: Returns the jittered delay before a retry.
+    - parse_retry_after: Parses a Retry-After header given in seconds.
+"""
+
+import time
+import random
+import threading
+from typing import Callable, Optional
+
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 30.0
+# Request timeout, 408; conflict, 409; rate limit, 429; and server errors are worth retrying.
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+
+class TokenBucket:
+    """
+    Refills at rate tokens per second up to capacity. acquire() blocks until enough tokens
+    are available, so callers are paced instead of rejected.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1) -> float:
+        """
+        Takes tokens (at most capacity, so an oversized request cannot wait forever) and
+        returns the seconds spent waiting.
+        """
+        tokens = min(tokens, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            self._sleep(delay)
+            waited += delay
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """
+    Returns the delay before retry number attempt (0-based): the server's Retry-After if given,
+    otherwise a uniformly random delay up to an exponentially growing cap ("full jitter"), so
+    concurrent clients that failed together do not retry together.
+    """
+    if retry_after is not None:
+        return min(retry_after, BACKOFF_MAX_SECONDS)
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Returns the seconds of a Retry-After header value, or None if it is missing or not a number
+    of seconds.
+    """
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
@@ -0,0 +1,556 @@
+"""
+render.py
+
+Single-pass report rendering. Compliance results are normalized once into a findings model
+(one CheckFindings per check) and each check is handed to every output sink in turn, so JSON,
+Markdown, HTML and JSON Lines reports are produced in one traversal of the results and always
+agree with each other. Sinks stream their output to disk as checks arrive.
+
+Classes/Functions:
+    - Section: One group of findings within a check (e.g. the "email" findings of the PII scan).
+    - CheckFindings: The normalized findings of one check.
+    - normalize_results: Converts a results dict into CheckFindings records.
+    - format_finding: Display text of one finding.
+    - markdown_header / markdown_check_lines: Markdown rendering of the findings model.
+    - html_header / html_check_lines: HTML rendering of the findings model.
+    - markdown_diff_lines / html_diff_lines: "Changes Since Previous Run" section from a run diff.
+    - finding_records: Flat {"check", "section", "finding"} records of a check.
+    - ReportSink: Base class of output sinks.
+    - LineSink, MarkdownSink, HtmlSink, JsonSink, JsonLinesSink: Streaming single-file sinks.
+    - ShardedHtmlSink: Summary page plus paged JSON shards loaded on demand, for very large reports.
+    - render_report: Renders results into every given sink in one pass.
+"""
+
+import os
+import re
+import json
+import shutil
+from datetime import datetime, timezone
+from html import escape
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Union
+
+WRITE_BUFFER_SIZE = 1 << 16
+JSON_CHUNK_SIZE = 1000
+
+DICT, LIST, SCALAR = "dict", "list", "scalar"
+
+HTML_STYLE = [
+    "    body { font-family: Arial, sans-serif; margin: 20px; padding: 0; background: #f9f9f9; }",
+    "    h1, h2, h3 { color: #2c3e50; }",
+    "    pre { background: #ecf0f1; padding: 10px; border-radius: 5px; }",
+    "    ul { list-style-type: disc; margin-left: 20px; }",
+    "    hr { border: none; border-top: 1px solid #bdc3c7; margin: 20px 0; }",
+]
+HTML_FOOTER = "</body></html>"
+# Findings listed per category in the changes section; the rest are only counted.
+DIFF_LIST_LIMIT = 100
+
+
+class Section(NamedTuple):
+    """
+    A group of findings. key is None for list- and scalar-shaped checks.
+    is_list records whether the original value was a list; otherwise items holds the single value.
+    """
+    key: Optional[str]
+    items: List[Any]
+    is_list: bool
+
+
+class CheckFindings(NamedTuple):
+    """
+    The normalized findings of one check. shape is the shape of the original result
+    (DICT, LIST or SCALAR); empty is True when the check reported nothing.
+    """
+    name: str
+    shape: str
+    sections: List[Section]
+    empty: bool
+
+
+def normalize_results(results: Dict[str, Any]) -> Iterator[CheckFindings]:
+    """
+    Yields one CheckFindings per check. Finding lists are referenced, not copied.
+    """
+    for name, findings in results.items():
+        if isinstance(findings, dict):
+            sections = [
+                Section(key, value, True) if isinstance(value, list) else Section(key, [value], False)
+                for key, value in findings.items()
+            ]
+            yield CheckFindings(name, DICT, sections, not findings)
+        elif isinstance(findings, list):
+            yield CheckFindings(name, LIST, [Section(None, findings, True)], not findings)
+        else:
+            yield CheckFindings(name, SCALAR, [Section(None, [findings], False)], not findings)
+
+
+def format_finding(item: Any, escape_text=str) -> str:
+    """
+    Returns the display text of a finding; dict findings are shown as "key: value, ...".
+    """
+    if isinstance(item, dict):
+        if escape_text is str:
+            return ", ".join(f"{k}: {v}" for k, v in item.items())
+        return ", ".join(f"{escape_text(str(k))}: {escape_text(str(v))}" for k, v in item.items())
+    return escape_text(str(item))
+
+
+def _section_value(section: Section) -> Any:
+    return section.items if section.is_list else section.items[0]
+
+
+def markdown_header(timestamp: str) -> List[str]:
+    return ["# Compliance Report", f"Generated: {timestamp}", "---"]
+
+
+def markdown_check_lines(check: CheckFindings) -> List[str]:
+    """
+    Returns the Markdown lines for one check.
+    """
+    lines = [f"## {check.name.capitalize()} Scan Results"]
+
+    if check.empty:
+        lines.append("No issues detected.\n")
+        return lines
+
+    if check.shape == DICT:
+        for section in check.sections:
+            lines.append(f"### {section.key}")
+            if section.is_list and section.items:
+                lines.extend([f"- {item}" for item in section.items])
+            else:
+                lines.append(f"- {_section_value(section)}")
+            lines.append("")
+    elif check.shape == LIST:
+        lines.extend([f"- {format_finding(item)}" for item in check.sections[0].items])
+        lines.append("")
+    else:
+        lines.append(f"- {check.sections[0].items[0]}\n")
+    return lines
+
+
+def html_header(summary: str, timestamp: str, head_extra: Iterable[str] = ()) -> List[str]:
+    return [
+        "<!DOCTYPE html>",
+        "<html lang='en'>",
+        "<head>",
+        "  <meta charset='UTF-8'>",
+        "  <meta name='viewport' content='width=device-width, initial-scale=1.0'>",
+        "  <title>Compliance Report</title>",
+        "  <style>",
+        *HTML_STYLE,
+        "  </style>",
+        *head_extra,
+        "</head>",
+        "<body>",
+        "<h1>Compliance Report</h1>",
+        f"<p><em>Generated: {timestamp}</em></p>",
+        "<hr>",
+        "<h2>Executive Summary</h2>",
+        f"<p>{escape(summary)}</p>",
+        "<hr>",
+    ]
+
+
+def html_check_lines(check: CheckFindings) -> List[str]:
+    """
+    Returns the HTML lines for one check.
+    """
+    lines = [f"<h2>{escape(check.name.capitalize())} Scan Results</h2>"]
+
+    if check.empty:
+        lines.append("<p>No issues detected.</p>")
+        return lines
+
+    if check.shape == DICT:
+        for section in check.sections:
+            lines.append(f"<h3>{escape(section.key)}</h3>")
+            if section.is_list and section.items:
+                lines.append("<ul>")
+                lines.extend([f"<li>{escape(str(item))}</li>" for item in section.items])
+                lines.append("</ul>")
+            else:
+                lines.append(f"<p>{escape(str(_section_value(section)))}</p>")
+    elif check.shape == LIST:
+        lines.append("<ul>")
+        lines.extend([f"<li>{format_finding(item, escape)}</li>" for item in check.sections[0].items])
+        lines.append("</ul>")
+    else:
+        lines.append(f"<p>{escape(str(check.sections[0].items[0]))}</p>")
+    return lines
+
+
+def _diff_summary(diff: Dict[str, Any]) -> str:
+    return (f"Run {diff['old_run']} to run {diff['new_run']}: {len(diff['new'])} new, "
+            f"{len(diff['resolved'])} resolved, {diff['persisting']} persisting.")
+
+
+def _diff_entries(records: List[Dict[str, Any]], limit: int) -> Iterator[str]:
+    for record in records[:limit]:
+        section = f"/{record['section']}" if record["section"] else ""
+        yield f"[{record['check']}{section}] {format_finding(record['finding'])}"
+
+
+def markdown_diff_lines(diff: Dict[str, Any], limit: int = DIFF_LIST_LIMIT) -> Iterator[str]:
+    """
+    Yields the Markdown lines of the changes section for a run_history diff.
+    """
+    yield "## Changes Since Previous Run"
+    yield _diff_summary(diff)
+    for key, title in (("new", "New Findings"), ("resolved", "Resolved Findings")):
+        if diff[key]:
+            yield f"### {title}"
+            for entry in _diff_entries(diff[key], limit):
+                yield f"- {entry}"
+            if len(diff[key]) > limit:
+                yield f"- ... and {len(diff[key]) - limit} more"
+    yield "---"
+
+
+def html_diff_lines(diff: Dict[str, Any], limit: int = DIFF_LIST_LIMIT) -> Iterator[str]:
+    """
+    Yields the HTML lines of the changes section for a run_history diff.
+    """
+    yield "<h2>Changes Since Previous Run</h2>"
+    yield f"<p>{escape(_diff_summary(diff))}</p>"
+    for key, title in (("new", "New Findings"), ("resolved", "Resolved Findings")):
+        if diff[key]:
+            yield f"<h3>{title}</h3>"
+            yield "<ul>"
+            for entry in _diff_entries(diff[key], limit):
+                yield f"<li>{escape(entry)}</li>"
+            if len(diff[key]) > limit:
+                yield f"<li>... and {len(diff[key]) - limit} more</li>"
+            yield "</ul>"
+    yield "<hr>"
+
+
+def finding_records(check: CheckFindings) -> Iterator[Dict[str, Any]]:
+    """
+    Yields one {"check", "section", "finding"} record per finding of a check. Sections of a dict
+    result that hold a single value rather than a list (e.g. the infrastructure scan's summary
+    counts) describe the result instead of listing findings, and are skipped.
+    """
+    if check.shape == SCALAR and check.empty:
+        return
+    for section in check.sections:
+        if check.shape == DICT and not section.is_list:
+            continue
+        for item in section.items:
+            yield {"check": check.name, "section": section.key, "finding": item}
+
+
+class ReportSink:
+    """
+    Receives start(timestamp), then write_check(check) for every check in order, then close().
+    """
+
+    def start(self, timestamp: str) -> None:
+        pass
+
+    def write_check(self, check: CheckFindings) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class LineSink(ReportSink):
+    """
+    Streams lines to a file, separated by newlines (no trailing newline). Each write_lines call
+    (one check, for the report sinks) is joined and written at once.
+    """
+
+    def __init__(self, output_path: str):
+        self.output_path = output_path
+        self._file = open(output_path, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE)
+        self._separator = ""
+
+    def write_lines(self, lines: Iterable[str]) -> None:
+        lines = lines if isinstance(lines, list) else list(lines)
+        if lines:
+            self._file.write(self._separator + "\n".join(lines))
+            self._separator = "\n"
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class MarkdownSink(LineSink):
+    """
+    diff: Optional run_history diff rendered as a changes section above the findings.
+    """
+
+    def __init__(self, output_path: str, diff: Optional[Dict[str, Any]] = None):
+        super().__init__(output_path)
+        self.diff = diff
+
+    def start(self, timestamp: str) -> None:
+        self.write_lines(markdown_header(timestamp))
+        if self.diff:
+            self.write_lines(markdown_diff_lines(self.diff))
+
+    def write_check(self, check: CheckFindings) -> None:
+        self.write_lines(markdown_check_lines(check))
+
+
+def _resolve_summary(summary: Union[str, Callable[[], str]]) -> str:
+    return summary() if callable(summary) else summary
+
+
+class HtmlSink(LineSink):
+    """
+    summary: Executive summary paragraph placed above the findings, or a callable returning it.
+             A callable is called only in close(): the findings are first streamed to a
+             temporary body file, so they are rendered while the summary is being generated.
+    diff:    Optional run_history diff rendered as a changes section above the findings.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        summary: Union[str, Callable[[], str]] = "",
+        diff: Optional[Dict[str, Any]] = None
+    ):
+        self.deferred = callable(summary)
+        self.body_path = output_path + ".body" if self.deferred else None
+        super().__init__(self.body_path or output_path)
+        self.output_path = output_path
+        self.summary = summary
+        self.diff = diff
+        self.timestamp = ""
+
+    def start(self, timestamp: str) -> None:
+        self.timestamp = timestamp
+        if not self.deferred:
+            self.write_lines(html_header(self.summary, timestamp))
+        if self.diff:
+            self.write_lines(html_diff_lines(self.diff))
+
+    def write_check(self, check: CheckFindings) -> None:
+        self.write_lines(html_check_lines(check))
+
+    def close(self) -> None:
+        if not self.deferred:
+            self.write_lines([HTML_FOOTER])
+            super().close()
+            return
+        has_body = bool(self._separator)
+        super().close()
+        try:
+            summary = _resolve_summary(self.summary)
+            with open(self.output_path, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE) as f:
+                f.write("\n".join(html_header(summary, self.timestamp)))
+                if has_body:
+                    f.write("\n")
+                    with open(self.body_path, "r", encoding="utf-8") as body:
+                        shutil.copyfileobj(body, f, WRITE_BUFFER_SIZE)
+                f.write("\n" + HTML_FOOTER)
+        finally:
+            os.remove(self.body_path)
+
+
+class JsonSink(LineSink):
+    """
+    Writes the results as one JSON object keyed by check name, equal in value to the original results.
+    """
+
+    def start(self, timestamp: str) -> None:
+        self._file.write("{")
+
+    def _write_value(self, section: Section) -> None:
+        # Lists are serialized in chunks so no check is held in memory as one JSON string.
+        if not section.is_list:
+            self._file.write(json.dumps(section.items[0], default=str))
+            return
+        self._file.write("[")
+        for start in range(0, len(section.items), JSON_CHUNK_SIZE):
+            if start:
+                self._file.write(", ")
+            self._file.write(json.dumps(section.items[start:start + JSON_CHUNK_SIZE], default=str)[1:-1])
+        self._file.write("]")
+
+    def write_check(self, check: CheckFindings) -> None:
+        self._file.write(self._separator)
+        self._file.write(f"\n    {json.dumps(check.name)}: ")
+        if check.shape == DICT:
+            self._file.write("{")
+            for index, section in enumerate(check.sections):
+                self._file.write(f"{', ' if index else ''}{json.dumps(section.key)}: ")
+                self._write_value(section)
+            self._file.write("}")
+        else:
+            self._write_value(check.sections[0])
+        self._separator = ","
+
+    def close(self) -> None:
+        self._file.write("\n}\n")
+        super().close()
+
+
+class JsonLinesSink(LineSink):
+    """
+    Writes one JSON object per finding. count holds the number of findings written.
+    """
+
+    def __init__(self, output_path: str):
+        super().__init__(output_path)
+        self.count = 0
+
+    def write_check(self, check: CheckFindings) -> None:
+        for record in finding_records(check):
+            self._file.write(json.dumps(record, default=str))
+            self._file.write("\n")
+            self.count += 1
+
+
+SHARD_STYLE = "  <style>table { border-collapse: collapse; } td, th { padding: 4px 12px; text-align: left; } .shard-error { color: #b00020; }</style>"
+SHARD_SCRIPT = """  <script>
+    function loadNextShard(button) {
+      var container = button.parentElement;
+      var pages = parseInt(container.dataset.pages, 10);
+      var next = parseInt(container.dataset.loaded || "0", 10);
+      button.disabled = true;
+      fetch(container.dataset.prefix + String(next).padStart(4, "0") + ".json").then(function (response) {
+        if (!response.ok) {
+          throw new Error("HTTP " + response.status);
+        }
+        return response.json();
+      }).then(function (shard) {
+        var list = container.querySelector("ul");
+        shard.findings.forEach(function (text) {
+          var item = document.createElement("li");
+          item.textContent = text;
+          list.appendChild(item);
+        });
+        container.dataset.loaded = next + 1;
+        button.disabled = false;
+        if (next + 1 >= pages) {
+          button.remove();
+        } else {
+          button.textContent = "Show more (page " + (next + 2) + " of " + pages + ")";
+        }
+      }).catch(function (error) {
+        var item = document.createElement("li");
+        item.className = "shard-error";
+        item.textContent = "Could not load page " + (next + 1) + " of " + pages + ": " + error.message;
+        container.querySelector("ul").appendChild(item);
+        button.disabled = false;
+        button.textContent = "Retry page " + (next + 1) + " of " + pages;
+      });
+    }
+  </script>"""
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", name) or "_"
+
+
+class ShardedHtmlSink(ReportSink):
+    """
+    Writes a sharded report into output_dir:
+        index.html     Summary page with per-section finding counts; findings load on demand.
+        manifest.json  The counts and shard file names of every section.
+        shards/*.json  Findings of one section, page_size per file, rendered to display text.
+    Shards are written as checks arrive; only counts and shard names are kept until close().
+    Shard names start with the section's position in the report, so checks or sections whose
+    names slugify alike (e.g. "pii scan" and "pii_scan") do not overwrite each other's shards.
+    summary may be a callable, which is called only in close() after all shards are written.
+    The page fetches shards, so it must be served over HTTP (e.g. the Azure static website).
+    """
+
+    def __init__(self, output_dir: str, summary: Union[str, Callable[[], str]] = "", page_size: int = 1000):
+        self.output_dir = output_dir
+        self.summary = summary
+        self.page_size = page_size
+        self.index_path = os.path.join(output_dir, "index.html")
+        self.manifest_path = os.path.join(output_dir, "manifest.json")
+        self.timestamp = ""
+        self.checks = []
+        self._sections = 0
+        shard_dir = os.path.join(output_dir, "shards")
+        os.makedirs(shard_dir, exist_ok=True)
+        # Shards of a previous, larger report would otherwise be left behind.
+        for name in os.listdir(shard_dir):
+            if name.endswith(".json"):
+                os.remove(os.path.join(shard_dir, name))
+
+    def start(self, timestamp: str) -> None:
+        self.timestamp = timestamp
+
+    def _write_shards(self, check: CheckFindings, section: Section, prefix: str) -> List[str]:
+        shard_names = []
+        format_item = str if check.shape == DICT else format_finding
+        for page, start in enumerate(range(0, len(section.items), self.page_size)):
+            name = f"{prefix}{page:04d}.json"
+            findings = [format_item(item) for item in section.items[start:start + self.page_size]]
+            with open(os.path.join(self.output_dir, name), "w", encoding="utf-8") as f:
+                json.dump({"check": check.name, "section": section.key, "page": page, "findings": findings}, f)
+            shard_names.append(name)
+        return shard_names
+
+    def write_check(self, check: CheckFindings) -> None:
+        sections = []
+        if not check.empty:
+            for section in check.sections:
+                if section.is_list:
+                    prefix = f"shards/{self._sections:04d}-{_slug(check.name)}.{_slug(section.key or 'findings')}."
+                    self._sections += 1
+                    sections.append({"key": section.key, "count": len(section.items), "shard_prefix": prefix,
+                                     "shards": self._write_shards(check, section, prefix)})
+                else:
+                    # Non-list values (e.g. a scan summary) are shown inline and not counted as findings.
+                    sections.append({"key": section.key, "count": 0, "value": str(section.items[0])})
+        self.checks.append({"name": check.name, "count": sum(s["count"] for s in sections), "sections": sections})
+
+    def _index_lines(self) -> Iterator[str]:
+        yield from html_header(_resolve_summary(self.summary), self.timestamp, head_extra=[SHARD_STYLE, SHARD_SCRIPT])
+        yield "<h2>Findings by Check</h2>"
+        yield "<table>"
+        yield "<tr><th>Check</th><th>Findings</th></tr>"
+        for check in self.checks:
+            yield f"<tr><td>{escape(check['name'])}</td><td>{check['count']}</td></tr>"
+        yield "</table>"
+        yield "<hr>"
+        for check in self.checks:
+            yield f"<h2>{escape(check['name'].capitalize())} Scan Results</h2>"
+            if not check["sections"]:
+                yield "<p>No issues detected.</p>"
+                continue
+            for section in check["sections"]:
+                if "value" in section:
+                    yield f"<h3>{escape(section['key'])}</h3>"
+                    yield f"<p>{escape(section['value'])}</p>"
+                    continue
+                if section["key"] is not None:
+                    yield f"<h3>{escape(section['key'])} ({section['count']})</h3>"
+                if not section["shards"]:
+                    yield "<p>No issues detected.</p>"
+                else:
+                    prefix = escape(section["shard_prefix"], quote=True)
+                    yield f"<div data-prefix=\"{prefix}\" data-pages=\"{len(section['shards'])}\"><ul></ul>"
+                    yield f"<button onclick='loadNextShard(this)'>Show findings ({section['count']})</button></div>"
+        yield HTML_FOOTER
+
+    def close(self) -> None:
+        with open(self.manifest_path, "w", encoding="utf-8") as f:
+            json.dump({"generated": self.timestamp, "page_size": self.page_size, "checks": self.checks}, f, indent=2)
+        with open(self.index_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(self._index_lines()))
+
+
+def render_report(results: Dict[str, Any], sinks: List[ReportSink], timestamp: Optional[str] = None) -> None:
+    """
+    Normalizes the results once and writes each check to every sink, then closes the sinks.
+    All sinks share the same timestamp.
+    """
+    timestamp = timestamp or datetime.now(timezone.utc).isoformat() + "Z"
+    try:
+        for sink in sinks:
+            sink.start(timestamp)
+        for check in normalize_results(results):
+            for sink in sinks:
+                sink.write_check(check)
+    finally:
+        for sink in sinks:
+            sink.close()
@@ -4,71 +4,95 @@ report.py
 Generates compliance reports in Markdown and HTML formats from scan results.
 Optionally uploads the HTML report to Azure Blob Storage for web access.
 
+Reports are rendered by compliance_checker.render, which streams them to disk as the results are
+walked; generate_reports writes several formats in a single pass over the results.
+The executive summary of HTML reports is generated in the background (async_summary) while the
+findings are rendered, and falls back to a template summary after LLM_SUMMARY_DEADLINE seconds.
+
 Functions:
+    - iter_markdown_lines: Yields the lines of the Markdown report.
     - generate_markdown_report: Creates a Markdown report from compliance results.
+    - iter_findings: Yields one flat record per finding.
+    - export_findings_jsonl: Writes all findings to a JSON Lines file.
+    - iter_html_lines: Yields the lines of the HTML report.
     - generate_html_report: Creates an HTML report from compliance results and uploads to Azure Blob Storage if configured.
+    - upload_report_artifacts: Uploads report files to Azure Blob Storage, skipping unchanged blobs.
+    - upload_sharded_report: Uploads a sharded report and deletes the shards it no longer uses.
+    - generate_sharded_html_report: Creates a summary page with findings split into paged JSON shards.
+    - generate_reports: Writes JSON, Markdown, HTML and/or JSON Lines reports in one pass over the results.
 """
 
 import os
 import re
-from datetime import datetime, timezone
-from typing import Dict, Any
-from html import escape
-from azure.storage.blob import BlobServiceClient, ContentSettings
+import itertools
+from functools import partial
+from typing import Callable, Dict, Any, Iterable, Iterator, Optional
 from compliance_checker.llm_assist import generate_summary_with_openai
 from compliance_checker.llm_assist import generate_summary_with_local_llama
+from compliance_checker.async_summary import BackgroundSummary, DEFAULT_SUMMARY_DEADLINE
+from compliance_checker.blob_upload import (
+    get_container_client, upload_artifacts, delete_stale_blobs, UPLOADED, SKIPPED, DELETED,
+)
+from compliance_checker.render import (
+    render_report, normalize_results, markdown_header, markdown_check_lines, html_header, html_check_lines,
+    finding_records, MarkdownSink, HtmlSink, JsonSink, JsonLinesSink, ShardedHtmlSink, HTML_FOOTER,
+)
 
 AZURE_STORAGE_CONNECTION_STRING = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
 AZURE_STORAGE_CONTAINER = "$web"
 AZURE_STORAGE_ACCOUNT_NAME = "aicompliancedemost"
 AZURE_BLOB_NAME = "index.html"
+AZURE_SHARDED_REPORT_PREFIX = "report/"
+REPORT_EXTENSIONS = {"json": ".json", "markdown": ".md", "html": ".html", "jsonl": ".jsonl"}
+REPORT_LABELS = {"json": "JSON", "markdown": "Markdown", "html": "HTML", "jsonl": "JSON Lines"}
 
 
-def generate_markdown_report(results: Dict[str, Any], output_path: str = "data/results/compliance_report.md") -> None:
+def iter_markdown_lines(results: Dict[str, Any], timestamp: str) -> Iterator[str]:
+    """
+    Yields the lines of the Markdown report one at a time.
     """
-    Generates a Markdown report from compliance scan results and saves it to the specified path.
+    yield from markdown_header(timestamp)
+    for check in normalize_results(results):
+        yield from markdown_check_lines(check)
+
+
+def generate_markdown_report(
+    results: Dict[str, Any],
+    output_path: str = "data/results/compliance_report.md",
+    diff: Optional[Dict[str, Any]] = None
+) -> None:
+    """
+    Generates a Markdown report from compliance scan results and streams it to the specified path.
+    If a run_history diff is given, a "Changes Since Previous Run" section precedes the findings.
     """
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
-    timestamp = datetime.now(timezone.utc).isoformat() + "Z"
-    lines = [
-        "# Compliance Report",
-        f"Generated: {timestamp}",
-        "---",
-    ]
-
-    for module_name, findings in results.items():
-        lines.append(f"## {module_name.capitalize()} Scan Results")
-
-        if not findings:
-            lines.append("No issues detected.\n")
-            continue
-
-        if isinstance(findings, dict):
-            for key, value in findings.items():
-                lines.append(f"### {key}")
-                if isinstance(value, list) and value:
-                    for item in value:
-                        lines.append(f"- {item}")
-                else:
-                    lines.append(f"- {value}")
-                lines.append("")
-        elif isinstance(findings, list):
-            for item in findings:
-                if isinstance(item, dict):
-                    item_str = ", ".join(f"{k}: {v}" for k, v in item.items())
-                    lines.append(f"- {item_str}")
-                else:
-                    lines.append(f"- {item}")
-            lines.append("")
-        else:
-            lines.append(f"- {findings}\n")
-
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write("\n".join(lines))
+    render_report(results, [MarkdownSink(output_path, diff=diff)])
 
     print(f"Report saved to {output_path}")
 
+
+def iter_findings(results: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Yields one record per finding: {"check", "section", "finding"}. Section is the key within
+    dict-shaped results (e.g. "email" for the PII scan) and None for list-shaped results.
+    """
+    return itertools.chain.from_iterable(finding_records(check) for check in normalize_results(results))
+
+
+def export_findings_jsonl(results: Dict[str, Any], output_path: str = "data/results/findings.jsonl") -> int:
+    """
+    Streams every finding to a JSON Lines file, one JSON object per line.
+    Returns the number of findings written.
+    """
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+    sink = JsonLinesSink(output_path)
+    render_report(results, [sink])
+
+    print(f"Findings exported to {output_path}")
+    return sink.count
+
 def clean_markdown(summary: str) -> str:
     """
     Converts markdown-formatted LLM output to a clean, readable plain English paragraph.
@@ -91,96 +115,167 @@ def clean_markdown(summary: str) -> str:
 
     return summary.strip()
 
-def generate_html_report(results: Dict[str, Any], output_path: str = "data/results/index.html") -> None:
+def iter_html_lines(results: Dict[str, Any], summary: str, timestamp: str) -> Iterator[str]:
+    """
+    Yields the lines of the HTML report one at a time.
+    """
+    yield from html_header(summary, timestamp)
+    for check in normalize_results(results):
+        yield from html_check_lines(check)
+    yield HTML_FOOTER
+
+
+def _html_summary(results: Dict[str, Any], deadline: float = DEFAULT_SUMMARY_DEADLINE) -> Callable[[], str]:
+    """
+    Starts generating the executive summary in the background and returns a callable that
+    waits for it (at most until the deadline) and returns it cleaned of markdown.
+    """
+    # Generate GPT summary
+    # task = BackgroundSummary(partial(generate_summary_with_openai, raise_errors=True), results, deadline)
+    task = BackgroundSummary(partial(generate_summary_with_local_llama, raise_errors=True), results, deadline)
+    return lambda: clean_markdown(task.result())
+
+
+def upload_report_artifacts(artifacts: Dict[str, str]) -> Dict[str, str]:
+    """
+    Uploads report artifacts ({blob_name: local_path}) to the static website container if the
+    connection string is set, skipping blobs whose stored content is unchanged.
+    Returns {blob_name: status} (empty if nothing was attempted).
+    """
+    if not AZURE_STORAGE_CONNECTION_STRING:
+        print("Azure Storage connection string not found in environment variable 'AZURE_STORAGE_CONNECTION_STRING'.")
+        return {}
+    try:
+        container_client = get_container_client(AZURE_STORAGE_CONNECTION_STRING, AZURE_STORAGE_CONTAINER)
+    except Exception as e:
+        print(f"Failed to upload to Azure Blob Storage: {e}")
+        return {}
+
+    print(f"Uploading {len(artifacts)} report artifact(s) to Azure Blob Storage...")
+    statuses = upload_artifacts(container_client, artifacts)
+    for blob_name, status in statuses.items():
+        if status not in (UPLOADED, SKIPPED):
+            print(f"Failed to upload {blob_name} to Azure Blob Storage: {status}")
+    skipped = sum(status == SKIPPED for status in statuses.values())
+    if skipped:
+        print(f"Skipped {skipped} unchanged blob(s).")
+    return statuses
+
+
+def upload_html_report(output_path: str) -> None:
+    """
+    Uploads the HTML report to Azure Blob Storage if the connection string is set.
+    """
+    statuses = upload_report_artifacts({AZURE_BLOB_NAME: output_path})
+    if statuses.get(AZURE_BLOB_NAME) in (UPLOADED, SKIPPED):
+        print("Upload successful. You can view the report at:")
+        print(f"https://{AZURE_STORAGE_ACCOUNT_NAME}.z8.web.core.windows.net/{AZURE_BLOB_NAME}")
+
+
+def upload_sharded_report(output_dir: str, prefix: str = AZURE_SHARDED_REPORT_PREFIX) -> Dict[str, str]:
+    """
+    Uploads a sharded report under prefix. Shards and the manifest are uploaded before
+    index.html, so the published page never references a shard that is not there yet.
+    Once index.html is published, shards left under the prefix by earlier reports (shard names
+    change as checks are added or removed) are deleted.
+    Returns {blob_name: status} for the uploaded and deleted blobs.
+    """
+    shard_dir = os.path.join(output_dir, "shards")
+    data_files = {f"{prefix}shards/{name}": os.path.join(shard_dir, name) for name in sorted(os.listdir(shard_dir))}
+    data_files[f"{prefix}manifest.json"] = os.path.join(output_dir, "manifest.json")
+    statuses = upload_report_artifacts(data_files)
+    if not statuses or any(status not in (UPLOADED, SKIPPED) for status in statuses.values()):
+        return statuses
+    index_blob = f"{prefix}index.html"
+    statuses.update(upload_report_artifacts({index_blob: os.path.join(output_dir, "index.html")}))
+    if statuses.get(index_blob) not in (UPLOADED, SKIPPED):
+        return statuses
+    try:
+        container_client = get_container_client(AZURE_STORAGE_CONNECTION_STRING, AZURE_STORAGE_CONTAINER)
+        deleted = delete_stale_blobs(container_client, f"{prefix}shards/", data_files)
+    except Exception as e:
+        print(f"Failed to delete stale report shards from Azure Blob Storage: {e}")
+        return statuses
+    for blob_name, status in deleted.items():
+        if status != DELETED:
+            print(f"Failed to delete {blob_name} from Azure Blob Storage: {status}")
+    if deleted:
+        print(f"Deleted {sum(status == DELETED for status in deleted.values())} stale shard(s).")
+    statuses.update(deleted)
+    return statuses
+
+
+def generate_html_report(
+    results: Dict[str, Any],
+    output_path: str = "data/results/index.html",
+    diff: Optional[Dict[str, Any]] = None
+) -> None:
     """
     Generates an HTML report from compliance scan results, saves it to the specified path,
     and uploads it to Azure Blob Storage if the connection string is set.
+    The document is streamed to disk as the results are walked. If a run_history diff is given,
+    a "Changes Since Previous Run" section precedes the findings.
     """
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
-    # Generate GPT summary
-    # summary = generate_summary_with_openai(results)
-    summary = generate_summary_with_local_llama(results)
-    summary = clean_markdown(summary)
-    timestamp = datetime.now(timezone.utc).isoformat() + "Z"
-
-    html_parts = [
-        "<!DOCTYPE html>",
-        "<html lang='en'>",
-        "<head>",
-        "  <meta charset='UTF-8'>",
-        "  <meta name='viewport' content='width=device-width, initial-scale=1.0'>",
-        "  <title>Compliance Report</title>",
-        "  <style>",
-        "    body { font-family: Arial, sans-serif; margin: 20px; padding: 0; background: #f9f9f9; }",
-        "    h1, h2, h3 { color: #2c3e50; }",
-        "    pre { background: #ecf0f1; padding: 10px; border-radius: 5px; }",
-        "    ul { list-style-type: disc; margin-left: 20px; }",
-        "    hr { border: none; border-top: 1px solid #bdc3c7; margin: 20px 0; }",
-        "  </style>",
-        "</head>",
-        "<body>",
-        f"<h1>Compliance Report</h1>",
-        f"<p><em>Generated: {timestamp}</em></p>",
-        "<hr>",
-        "<h2>Executive Summary</h2>",
-        f"<p>{escape(summary)}</p>",
-        "<hr>"
-    ]
-
-    for module_name, findings in results.items():
-        html_parts.append(f"<h2>{escape(module_name.capitalize())} Scan Results</h2>")
-
-        if not findings:
-            html_parts.append("<p>No issues detected.</p>")
-            continue
-
-        if isinstance(findings, dict):
-            for key, value in findings.items():
-                html_parts.append(f"<h3>{escape(key)}</h3>")
-                if isinstance(value, list) and value:
-                    html_parts.append("<ul>")
-                    for item in value:
-                        html_parts.append(f"<li>{escape(str(item))}</li>")
-                    html_parts.append("</ul>")
-                else:
-                    html_parts.append(f"<p>{escape(str(value))}</p>")
-        elif isinstance(findings, list):
-            html_parts.append("<ul>")
-            for item in findings:
-                if isinstance(item, dict):
-                    item_str = ", ".join(f"{escape(str(k))}: {escape(str(v))}" for k, v in item.items())
-                    html_parts.append(f"<li>{item_str}</li>")
-                else:
-                    html_parts.append(f"<li>{escape(str(item))}</li>")
-            html_parts.append("</ul>")
-        else:
-            html_parts.append(f"<p>{escape(str(findings))}</p>")
-
-    html_parts.append("</body></html>")
-
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(html_parts))
+    render_report(results, [HtmlSink(output_path, summary=_html_summary(results), diff=diff)])
 
     print(f"HTML report saved to {output_path}")
 
-    # Upload the HTML report to Azure Blob Storage if connection string is set
-    if AZURE_STORAGE_CONNECTION_STRING:
-        try:
-            print("Uploading index.html to Azure Blob Storage using SDK...")
-            blob_service_client = BlobServiceClient.from_connection_string(AZURE_STORAGE_CONNECTION_STRING)
-            blob_client = blob_service_client.get_blob_client(container=AZURE_STORAGE_CONTAINER, blob=AZURE_BLOB_NAME)
-
-            with open(output_path, "rb") as data:
-                blob_client.upload_blob(
-                    data,
-                    overwrite=True,
-                    content_settings=ContentSettings(content_type='text/html')
-                )
-
-            print("Upload successful. You can view the report at:")
-            print(f"https://{AZURE_STORAGE_ACCOUNT_NAME}.z8.web.core.windows.net/{AZURE_BLOB_NAME}")
-        except Exception as e:
-            print(f"Failed to upload to Azure Blob Storage: {e}")
-    else:
-        print("Azure Storage connection string not found in environment variable 'AZURE_STORAGE_CONNECTION_STRING'.")
+    upload_html_report(output_path)
+
+
+def generate_sharded_html_report(
+    results: Dict[str, Any],
+    output_dir: str = "data/results/report",
+    page_size: int = 1000
+) -> Dict[str, Any]:
+    """
+    Generates a sharded HTML report for very large finding sets: a small index.html summary page
+    with per-section counts, and the findings split into JSON shards of page_size findings that
+    the page loads only when a section is opened. The report is uploaded under
+    AZURE_SHARDED_REPORT_PREFIX if the connection string is set. Returns the manifest (counts and shard names).
+    """
+    sink = ShardedHtmlSink(output_dir, summary=_html_summary(results), page_size=page_size)
+    render_report(results, [sink])
+
+    print(f"Sharded HTML report saved to {sink.index_path}")
+
+    upload_sharded_report(output_dir)
+    return {"generated": sink.timestamp, "page_size": page_size, "checks": sink.checks}
+
+
+def generate_reports(
+    results: Dict[str, Any],
+    output_dir: str = "data/results",
+    basename: str = "compliance_report",
+    formats: Iterable[str] = ("json", "markdown", "html"),
+    diff: Optional[Dict[str, Any]] = None
+) -> Dict[str, str]:
+    """
+    Writes the requested report formats ("json", "markdown", "html", "jsonl") to
+    output_dir/basename.<ext> in a single pass over the results, so all formats share one
+    timestamp and the same findings. The HTML report is uploaded like generate_html_report's.
+    A run_history diff, if given, is included in the Markdown and HTML reports.
+    Returns the path written for each format.
+    """
+    formats = list(formats)
+    unknown = [fmt for fmt in formats if fmt not in REPORT_EXTENSIONS]
+    if unknown:
+        raise ValueError(f"Unknown report formats: {', '.join(unknown)}")
+    os.makedirs(output_dir, exist_ok=True)
+
+    paths = {fmt: os.path.join(output_dir, basename + REPORT_EXTENSIONS[fmt]) for fmt in formats}
+    sink_factories = {
+        "json": JsonSink,
+        "markdown": lambda path: MarkdownSink(path, diff=diff),
+        "html": lambda path: HtmlSink(path, summary=_html_summary(results), diff=diff),
+        "jsonl": JsonLinesSink,
+    }
+    render_report(results, [sink_factories[fmt](path) for fmt, path in paths.items()])
+
+    for fmt, path in paths.items():
+        print(f"Compliance {REPORT_LABELS[fmt]} report saved to {path}")
+    if "html" in paths:
+        upload_html_report(paths["html"])
+    return paths
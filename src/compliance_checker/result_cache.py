@@ -0,0 +1,157 @@
+"""
+result_cache.py
+
+On-disk cache of check results keyed by a content hash of each check's inputs and configuration,
+so scheduled runs can skip checks whose inputs have not changed (same log files, same model
+metadata, same inventory snapshot). Entries are evicted least-recently-used first once the cache
+exceeds its entry count or size limit.
+
+Classes/Functions:
+    - fingerprint_value: Hashes any JSON-serializable value canonically (key order does not matter).
+    - fingerprint_files: Hashes the contents of a set of files.
+    - ResultCache: Disk-backed LRU cache of JSON-serializable check results.
+"""
+
+import os
+import json
+import hashlib
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+CACHE_FORMAT_VERSION = 1
+DEFAULT_CACHE_DIR = os.path.join("data", "cache", "results")
+
+# File content hashes memoized by (path, mtime, size), so long-running processes rehash only changed files.
+_file_hash_memo = {}
+_file_hash_lock = threading.Lock()
+
+
+def fingerprint_value(value: Any) -> str:
+    """
+    Returns a SHA-256 hex digest of the canonical JSON form of value (sorted keys, compact separators).
+    Values that are not JSON-serializable are converted with str().
+    """
+    canonical = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _hash_file(path: str, chunk_size: int = 1 << 20) -> str:
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    with _file_hash_lock:
+        if memo_key in _file_hash_memo:
+            return _file_hash_memo[memo_key]
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    with _file_hash_lock:
+        _file_hash_memo[memo_key] = digest.hexdigest()
+    return _file_hash_memo[memo_key]
+
+
+def fingerprint_files(paths: Iterable[str]) -> str:
+    """
+    Returns a SHA-256 hex digest over the paths and contents of the given files.
+    """
+    return fingerprint_value([[path, _hash_file(path)] for path in sorted(paths)])
+
+
+class ResultCache:
+    """
+    Disk-backed LRU cache of check results, one JSON file per entry.
+    Reads refresh an entry's mtime, which is used as its last-use time for eviction.
+
+    cache_dir:   Directory holding the cache entries.
+    max_entries: Maximum number of entries kept.
+    max_bytes:   Maximum total size of entries kept.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_entries: int = 512, max_bytes: int = 256 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(check_name: str, config: Any, inputs_fingerprint: Any) -> str:
+        """
+        Returns the cache key for a check given its configuration and a fingerprint of its inputs.
+        """
+        return fingerprint_value([CACHE_FORMAT_VERSION, check_name, config, inputs_fingerprint])
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Tuple[bool, Optional[Any]]:
+        """
+        Returns (True, value) on a hit and (False, None) on a miss.
+        """
+        path = self._path(key)
+        with self._lock:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    value = json.load(f)["value"]
+                os.utime(path)
+            except (OSError, ValueError, KeyError):
+                return False, None
+        return True, value
+
+    def put(self, key: str, value: Any) -> bool:
+        """
+        Stores a JSON-serializable value and evicts old entries if over the limits.
+        Returns False (and stores nothing) if the value cannot be serialized.
+        """
+        try:
+            payload = json.dumps({"value": value})
+        except (TypeError, ValueError):
+            return False
+        path = self._path(key)
+        with self._lock:
+            tmp_path = f"{path}.tmp"
+            # Results can hold sensitive findings (e.g. PII matches): readable by the owner only.
+            with open(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+            self._evict()
+        return True
+
+    def clear(self) -> None:
+        """
+        Removes all cache entries.
+        """
+        with self._lock:
+            for entry in self._entries():
+                os.remove(entry[0])
+
+    def _entries(self) -> list:
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json"):
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((path, stat.st_mtime_ns, stat.st_size))
+        return entries
+
+    def _evict(self) -> None:
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        total_bytes = sum(size for _, _, size in entries)
+        while entries and (len(entries) > self.max_entries or total_bytes > self.max_bytes):
+            path, _, size = entries.pop(0)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total_bytes -= size
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the number of entries and their total size in bytes.
+        """
+        with self._lock:
+            entries = self._entries()
+        return {"entries": len(entries), "bytes": sum(size for _, _, size in entries)}
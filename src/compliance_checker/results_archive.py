@@ -0,0 +1,255 @@
+"""
+results_archive.py
+
+Columnar archive of historical compliance results, for trend questions such as
+"non-compliant VMs per week" over months of runs.
+
+Every run is appended as one Parquet file of flat finding rows (run, check, section, resource
+name and type, finding text) under a date-partitioned directory (run_date=YYYY-MM-DD). Queries
+prune partitions by date, push check/resource type/time filters down to the Parquet reader and
+stream record batches, so history is never loaded into memory as a whole.
+Requires the optional pyarrow package.
+
+Functions:
+    - findings_to_rows: Flattens a results dict into archive rows.
+    - append_run: Appends one run's results to the archive.
+    - import_json_reports: Appends exported compliance_report_<timestamp>.json files.
+    - iter_findings: Streams archived findings matching filters as record batches.
+    - query_findings: Returns archived findings matching filters as a table.
+    - count_per_period: Counts findings (or distinct resources) per day, week or month.
+"""
+
+import os
+import re
+import sys
+import json
+import uuid
+import argparse
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = ds = pq = None
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from compliance_checker.render import normalize_results, finding_records, format_finding
+
+DEFAULT_ARCHIVE_DIR = os.path.join("data", "archive")
+REPORT_FILENAME_PATTERN = re.compile(r"compliance_report_(\d{8}_\d{6})\.json$")
+PERIODS = ("day", "week", "month")
+
+if pa is not None:
+    ARCHIVE_SCHEMA = pa.schema([
+        ("run_id", pa.string()),
+        ("run_time", pa.timestamp("us", tz="UTC")),
+        ("check", pa.string()),
+        ("section", pa.string()),
+        ("resource_name", pa.string()),
+        ("resource_type", pa.string()),
+        ("finding", pa.string()),
+    ])
+    # Archived columns plus the run_date partition column, which can also be selected.
+    DATASET_SCHEMA = ARCHIVE_SCHEMA.append(pa.field("run_date", pa.string()))
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("The results archive requires pyarrow: pip install pyarrow")
+
+
+def findings_to_rows(results: Dict[str, Any]) -> Dict[str, List[Optional[str]]]:
+    """
+    Flattens results into column lists (check, section, resource_name, resource_type, finding).
+    Resource name and type are taken from dict findings that carry them.
+    """
+    columns = {"check": [], "section": [], "resource_name": [], "resource_type": [], "finding": []}
+    for check in normalize_results(results):
+        for record in finding_records(check):
+            finding = record["finding"]
+            is_resource = isinstance(finding, dict)
+            columns["check"].append(record["check"])
+            columns["section"].append(record["section"])
+            columns["resource_name"].append(finding.get("resource_name") if is_resource else None)
+            columns["resource_type"].append(finding.get("resource_type") if is_resource else None)
+            columns["finding"].append(format_finding(finding))
+    return columns
+
+
+def append_run(
+    results: Dict[str, Any],
+    archive_dir: str = DEFAULT_ARCHIVE_DIR,
+    run_time: Optional[datetime] = None,
+    run_id: Optional[str] = None
+) -> str:
+    """
+    Appends one run's results to the archive as a new Parquet file and returns its path.
+    run_time defaults to now (UTC); run_id defaults to a random id.
+    """
+    _require_pyarrow()
+    run_time = (run_time or datetime.now(timezone.utc)).astimezone(timezone.utc)
+    run_id = run_id or uuid.uuid4().hex
+
+    columns = findings_to_rows(results)
+    count = len(columns["check"])
+    table = pa.table({"run_id": [run_id] * count, "run_time": [run_time] * count, **columns}, schema=ARCHIVE_SCHEMA)
+
+    partition_dir = os.path.join(archive_dir, f"run_date={run_time.date().isoformat()}")
+    os.makedirs(partition_dir, exist_ok=True)
+    path = os.path.join(partition_dir, f"run-{run_time.strftime('%H%M%S')}-{run_id}.parquet")
+    pq.write_table(table, path, compression="zstd")
+    return path
+
+
+def import_json_reports(paths: Iterable[str], archive_dir: str = DEFAULT_ARCHIVE_DIR) -> int:
+    """
+    Appends exported compliance_report_<YYYYmmdd_HHMMSS>.json files to the archive, using the
+    timestamp in the filename as the run time. Returns the number of reports imported.
+    """
+    imported = 0
+    for path in paths:
+        match = REPORT_FILENAME_PATTERN.search(os.path.basename(path))
+        if not match:
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            results = json.load(f)
+        run_time = datetime.strptime(match.group(1), "%Y%m%d_%H%M%S").replace(tzinfo=timezone.utc)
+        append_run(results, archive_dir, run_time=run_time, run_id=f"import-{match.group(1)}")
+        imported += 1
+    return imported
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _filter_expression(
+    checks: Optional[Iterable[str]],
+    resource_types: Optional[Iterable[str]],
+    start: Optional[datetime],
+    end: Optional[datetime]
+) -> Any:
+    conditions = []
+    if checks:
+        conditions.append(ds.field("check").isin(list(checks)))
+    if resource_types:
+        conditions.append(ds.field("resource_type").isin(list(resource_types)))
+    if start:
+        start = _as_utc(start)
+        conditions.append(ds.field("run_date") >= start.date().isoformat())
+        conditions.append(ds.field("run_time") >= pa.scalar(start, ARCHIVE_SCHEMA.field("run_time").type))
+    if end:
+        end = _as_utc(end)
+        conditions.append(ds.field("run_date") <= end.date().isoformat())
+        conditions.append(ds.field("run_time") < pa.scalar(end, ARCHIVE_SCHEMA.field("run_time").type))
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def _columns(columns: Optional[List[str]]) -> List[str]:
+    unknown = [column for column in columns or () if column not in DATASET_SCHEMA.names]
+    if unknown:
+        raise ValueError(f"Unknown archive columns: {', '.join(unknown)} (available: {', '.join(DATASET_SCHEMA.names)})")
+    return columns or ARCHIVE_SCHEMA.names
+
+
+def iter_findings(
+    archive_dir: str = DEFAULT_ARCHIVE_DIR,
+    checks: Optional[Iterable[str]] = None,
+    resource_types: Optional[Iterable[str]] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    columns: Optional[List[str]] = None
+) -> Iterator[Any]:
+    """
+    Yields pyarrow RecordBatches of archived findings matching all given filters, reading only
+    the requested columns (any of the archive columns or run_date). start is inclusive and end
+    exclusive; naive datetimes are UTC. Raises ValueError for unknown columns.
+    """
+    _require_pyarrow()
+    columns = _columns(columns)
+    if not os.path.isdir(archive_dir):
+        return
+    dataset = ds.dataset(archive_dir, format="parquet", schema=DATASET_SCHEMA, partitioning="hive")
+    filter_expression = _filter_expression(checks, resource_types, start, end)
+    yield from dataset.to_batches(columns=columns, filter=filter_expression)
+
+
+def query_findings(archive_dir: str = DEFAULT_ARCHIVE_DIR, **filters: Any) -> Any:
+    """
+    Returns a pyarrow Table of archived findings matching the filters of iter_findings.
+    """
+    batches = list(iter_findings(archive_dir, **filters))
+    columns = filters.get("columns") or ARCHIVE_SCHEMA.names
+    return pa.Table.from_batches(batches, schema=pa.schema([DATASET_SCHEMA.field(c) for c in columns]))
+
+
+def _period_start(run_time: datetime, period: str) -> str:
+    if period == "day":
+        return run_time.date().isoformat()
+    if period == "week":
+        return (run_time.date() - timedelta(days=run_time.weekday())).isoformat()
+    return run_time.strftime("%Y-%m")
+
+
+def count_per_period(
+    archive_dir: str = DEFAULT_ARCHIVE_DIR,
+    period: str = "week",
+    distinct_resources: bool = False,
+    **filters: Any
+) -> Dict[str, int]:
+    """
+    Counts archived findings matching the filters per period ("day", "week" starting Monday,
+    or "month"). With distinct_resources, counts distinct resource names instead, so a resource
+    reported by every daily run counts once per week.
+    """
+    if period not in PERIODS:
+        raise ValueError(f"Unknown period: {period}")
+    columns = ["run_time", "resource_name"] if distinct_resources else ["run_time"]
+    counts = defaultdict(int)
+    resources = defaultdict(set)
+    for batch in iter_findings(archive_dir, columns=columns, **filters):
+        run_times = batch.column("run_time").to_pylist()
+        if distinct_resources:
+            for run_time, name in zip(run_times, batch.column("resource_name").to_pylist()):
+                if name is not None:
+                    resources[_period_start(run_time, period)].add(name)
+        else:
+            for run_time in run_times:
+                counts[_period_start(run_time, period)] += 1
+    if distinct_resources:
+        return {key: len(names) for key, names in sorted(resources.items())}
+    return dict(sorted(counts.items()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Query the archive of historical compliance results.")
+    parser.add_argument("--archive-dir", default=DEFAULT_ARCHIVE_DIR)
+    parser.add_argument("--import", dest="import_paths", nargs="+", metavar="REPORT_JSON",
+                        help="append exported compliance_report_<timestamp>.json files to the archive")
+    parser.add_argument("--check", action="append", help="only this check (repeatable)")
+    parser.add_argument("--resource-type", action="append", help="only this resource type (repeatable)")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="start time (inclusive), e.g. 2025-01-01")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="end time (exclusive)")
+    parser.add_argument("--per", choices=PERIODS, default="week")
+    parser.add_argument("--distinct-resources", action="store_true", help="count distinct resources, not findings")
+    args = parser.parse_args()
+
+    if args.import_paths:
+        print(f"Imported {import_json_reports(args.import_paths, args.archive_dir)} report(s).")
+        return
+    counts = count_per_period(args.archive_dir, period=args.per, distinct_resources=args.distinct_resources,
+                              checks=args.check, resource_types=args.resource_type, start=args.since, end=args.until)
+    for period_start, count in counts.items():
+        print(f"{period_start}\t{count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""
+run_history.py
+
+Local SQLite history of compliance runs, for seeing only what changed since a previous run.
+Each run's findings are normalized and stored with a stable fingerprint (a hash of the check,
+section and canonical finding content), keyed by (run, check, fingerprint). Stored findings have
+every PII match masked (see pii_redact), so the history never holds PII values. Findings that
+contain PII are fingerprinted with HMAC-SHA256 under a secret key instead of a plain hash, so
+different values are still told apart but small value spaces (SSNs, phone numbers) cannot be
+brute-forced from the database. The key is taken from PII_TOKEN_KEY, or generated once into an
+owner-only file next to the database. Diffs between two runs are indexed anti-joins on that key
+rather than comparisons of exported JSON files.
+
+Classes/Functions:
+    - finding_fingerprint: Returns the stable fingerprint of one finding.
+    - redact_finding: Returns a finding with the PII in its strings masked.
+    - RunHistory: Records runs and diffs any two of them into new, resolved and persisting findings.
+"""
+
+import os
+import sys
+import hmac
+import json
+import secrets
+import hashlib
+import sqlite3
+import argparse
+from contextlib import closing
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Union
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from compliance_checker.render import normalize_results, finding_records
+from compliance_checker.result_cache import fingerprint_value
+from compliance_checker.pii_redact import Redactor, TOKEN_KEY_ENV
+
+DEFAULT_HISTORY_PATH = os.path.join("data", "history", "runs.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_time TEXT NOT NULL,
+    finding_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS findings (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    check_name TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    section TEXT,
+    finding TEXT NOT NULL,
+    PRIMARY KEY (run_id, check_name, fingerprint)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS findings_by_fingerprint ON findings (check_name, fingerprint);
+"""
+
+# Finding rows of the newer run with no matching (check, fingerprint) in the other run.
+_ONLY_IN_QUERY = """
+SELECT f.check_name, f.section, f.finding FROM findings f
+WHERE f.run_id = ? AND NOT EXISTS (
+    SELECT 1 FROM findings o WHERE o.run_id = ? AND o.check_name = f.check_name AND o.fingerprint = f.fingerprint
+)
+ORDER BY f.check_name, f.section, f.finding
+"""
+_PERSISTING_QUERY = """
+SELECT COUNT(*) FROM findings f JOIN findings o
+    ON o.run_id = ? AND o.check_name = f.check_name AND o.fingerprint = f.fingerprint
+WHERE f.run_id = ?
+"""
+
+
+# Fields added to findings of a check after runs were recorded without them. A finding that
+# has them still matches an older finding that lacks them and is otherwise equal (see diff_runs).
+LEGACY_OPTIONAL_FIELDS = {"tag_policy": ("resource_id",)}
+
+_masker = Redactor("mask")
+
+
+def redact_finding(finding: Any) -> Any:
+    """
+    Returns a copy of finding with every PII match in its strings (including dict keys and nested
+    values) replaced by its label, e.g. "user jane@x.com" -> "user [EMAIL]". Other values are kept.
+    """
+    if isinstance(finding, str):
+        data = finding.encode()
+        redacted = _masker.redact(data)
+        return finding if redacted is data else redacted.decode()
+    if isinstance(finding, dict):
+        return {redact_finding(key) if isinstance(key, str) else key: redact_finding(value)
+                for key, value in finding.items()}
+    if isinstance(finding, (list, tuple)):
+        return [redact_finding(item) for item in finding]
+    return finding
+
+
+def finding_fingerprint(check: str, section: Optional[str], finding: Any, key: Optional[bytes] = None) -> str:
+    """
+    Returns a fingerprint that is the same for the same finding in any run: dict key order
+    does not matter, and nothing run-specific (time, position in the results) is included.
+    Findings containing PII are fingerprinted with HMAC-SHA256 under key, and raise ValueError
+    if no key is given.
+    """
+    if redact_finding(finding) == finding:
+        return fingerprint_value([check, section, finding])[:32]
+    if not key:
+        raise ValueError("Fingerprinting a finding that contains PII requires a key")
+    canonical = json.dumps([check, section, finding], sort_keys=True, separators=(",", ":"), default=str)
+    return hmac.new(key, canonical.encode(), hashlib.sha256).hexdigest()[:32]
+
+
+def _load_key(db_path: str) -> bytes:
+    """
+    Returns the key in PII_TOKEN_KEY, or the one in <db_path>.key, creating that file (readable
+    by the owner only) with a random key on first use.
+    """
+    key = os.getenv(TOKEN_KEY_ENV)
+    if key:
+        return key.encode()
+    key_path = db_path + ".key"
+    try:
+        descriptor = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        with open(key_path, "rb") as f:
+            return f.read()
+    with os.fdopen(descriptor, "wb") as f:
+        key = secrets.token_hex(32).encode()
+        f.write(key)
+    return key
+
+
+def _match_legacy_findings(new: List[Dict[str, Any]], resolved: List[Dict[str, Any]]) -> int:
+    """
+    Pairs findings only in the new run that carry a field of LEGACY_OPTIONAL_FIELDS with
+    resolved findings recorded without it and otherwise equal (e.g. tag violations from before
+    resource ids were added), removes the pairs from both lists and returns their number.
+    """
+    def stripped(record, fields):
+        return fingerprint_value([record["check"], record["section"],
+                                  {key: value for key, value in record["finding"].items() if key not in fields}])
+
+    legacy = {}
+    for index, record in enumerate(resolved):
+        fields = LEGACY_OPTIONAL_FIELDS.get(record["check"], ())
+        if fields and isinstance(record["finding"], dict) and not any(field in record["finding"] for field in fields):
+            legacy.setdefault(stripped(record, fields), []).append(index)
+    matched_new, matched_resolved = set(), set()
+    for index, record in enumerate(new):
+        fields = LEGACY_OPTIONAL_FIELDS.get(record["check"], ())
+        if fields and isinstance(record["finding"], dict) and any(field in record["finding"] for field in fields):
+            candidates = legacy.get(stripped(record, fields))
+            if candidates:
+                matched_resolved.add(candidates.pop())
+                matched_new.add(index)
+    new[:] = [record for index, record in enumerate(new) if index not in matched_new]
+    resolved[:] = [record for index, record in enumerate(resolved) if index not in matched_resolved]
+    return len(matched_new)
+
+
+class RunHistory:
+    """
+    SQLite-backed history of runs.
+
+    db_path: Path of the SQLite database; created with its schema if missing.
+    key:     HMAC key for fingerprints of findings containing PII; defaults to PII_TOKEN_KEY,
+             else a random key kept in <db_path>.key. Runs recorded under another key do not
+             match, so PII findings would show as resolved and new once.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_HISTORY_PATH, key: Optional[Union[bytes, str]] = None):
+        self.db_path = db_path
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        key = key if key is not None else _load_key(db_path)
+        self.key = key.encode() if isinstance(key, str) else key
+        with closing(self._connect()) as connection:
+            connection.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.db_path)
+        connection.execute("PRAGMA foreign_keys = ON")
+        return connection
+
+    def record_run(self, results: Dict[str, Any], run_time: Optional[datetime] = None) -> int:
+        """
+        Stores the findings of one run, with PII masked, and returns its run id. Identical
+        findings within a run are stored once.
+        """
+        run_time = (run_time or datetime.now(timezone.utc)).isoformat()
+        rows = (
+            (record["check"], finding_fingerprint(record["check"], record["section"], record["finding"], self.key),
+             record["section"], json.dumps(redact_finding(record["finding"]), default=str))
+            for check in normalize_results(results)
+            for record in finding_records(check)
+        )
+        with closing(self._connect()) as connection, connection:
+            run_id = connection.execute("INSERT INTO runs (run_time, finding_count) VALUES (?, 0)", (run_time,)).lastrowid
+            connection.executemany(
+                "INSERT OR IGNORE INTO findings (run_id, check_name, fingerprint, section, finding) VALUES (?, ?, ?, ?, ?)",
+                ((run_id, *row) for row in rows),
+            )
+            connection.execute(
+                "UPDATE runs SET finding_count = (SELECT COUNT(*) FROM findings WHERE run_id = ?) WHERE run_id = ?",
+                (run_id, run_id),
+            )
+        return run_id
+
+    def list_runs(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Returns the most recent runs, newest first.
+        """
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                "SELECT run_id, run_time, finding_count FROM runs ORDER BY run_id DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [{"run_id": run_id, "run_time": run_time, "finding_count": count} for run_id, run_time, count in rows]
+
+    def previous_run_id(self, run_id: int) -> Optional[int]:
+        """
+        Returns the id of the run recorded before run_id, or None if it is the first.
+        """
+        with closing(self._connect()) as connection:
+            row = connection.execute("SELECT MAX(run_id) FROM runs WHERE run_id < ?", (run_id,)).fetchone()
+        return row[0]
+
+    def diff_runs(self, old_run_id: int, new_run_id: int) -> Dict[str, Any]:
+        """
+        Compares two runs by finding fingerprint. Returns:
+            {"old_run", "new_run",
+             "new": findings only in the new run, "resolved": findings only in the old run,
+             "persisting": number of findings in both}
+        where each finding is {"check", "section", "finding"}. Findings of the old run recorded
+        before a field of LEGACY_OPTIONAL_FIELDS existed match new findings that differ only by it.
+        """
+        with closing(self._connect()) as connection:
+            new = connection.execute(_ONLY_IN_QUERY, (new_run_id, old_run_id)).fetchall()
+            resolved = connection.execute(_ONLY_IN_QUERY, (old_run_id, new_run_id)).fetchall()
+            persisting = connection.execute(_PERSISTING_QUERY, (old_run_id, new_run_id)).fetchone()[0]
+
+        def records(rows):
+            return [{"check": check, "section": section, "finding": json.loads(finding)} for check, section, finding in rows]
+
+        new, resolved = records(new), records(resolved)
+        persisting += _match_legacy_findings(new, resolved)
+        return {"old_run": old_run_id, "new_run": new_run_id, "new": new, "resolved": resolved, "persisting": persisting}
+
+    def record_and_diff(self, results: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Records a run and returns its diff against the previous run (None for the first run).
+        """
+        run_id = self.record_run(results)
+        previous = self.previous_run_id(run_id)
+        return self.diff_runs(previous, run_id) if previous is not None else None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect the history of compliance runs.")
+    parser.add_argument("--db", default=DEFAULT_HISTORY_PATH)
+    parser.add_argument("--diff", nargs=2, type=int, metavar=("OLD_RUN", "NEW_RUN"), help="diff two runs")
+    args = parser.parse_args()
+
+    history = RunHistory(args.db)
+    if not args.diff:
+        for run in history.list_runs():
+            print(f"{run['run_id']}\t{run['run_time']}\t{run['finding_count']} findings")
+        return
+    diff = history.diff_runs(*args.diff)
+    for status in ("new", "resolved"):
+        for record in diff[status]:
+            print(f"{status}\t{record['check']}\t{record['section'] or ''}\t{record['finding']}")
+    print(f"persisting\t{diff['persisting']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+summary_cache.py
+
+Two-level cache of LLM executive summaries, so regenerating reports for unchanged findings needs
+no inference. Summaries are keyed by a hash of the canonicalized scan results (timestamps and
+other run-specific fields dropped, lists sorted), the model and the prompt version. Lookups go
+to an in-memory LRU first and then to an on-disk ResultCache.
+
+Classes/Functions:
+    - canonicalize_results: Returns the order- and timestamp-independent form of scan results.
+    - summary_key: Returns the cache key for a summary.
+    - SummaryCache: In-memory LRU in front of an on-disk cache.
+    - get_summary_cache: Returns the process-wide summary cache.
+"""
+
+import os
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+from compliance_checker.result_cache import ResultCache, fingerprint_value
+
+DEFAULT_SUMMARY_CACHE_DIR = os.path.join("data", "cache", "summaries")
+
+# Keys whose values change between runs without the findings changing.
+VOLATILE_KEYS = frozenset({
+    "timestamp", "generated", "generated_at", "scanned_at", "scan_time", "run_time", "run_id", "duration_seconds",
+})
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def canonicalize_results(value: Any) -> Any:
+    """
+    Returns value with VOLATILE_KEYS removed from every dict and every list sorted, so results
+    that differ only in timestamps or finding order canonicalize to the same value.
+    """
+    if isinstance(value, dict):
+        return {str(key): canonicalize_results(item) for key, item in value.items() if key not in VOLATILE_KEYS}
+    if isinstance(value, (list, tuple, set)):
+        items = [canonicalize_results(item) for item in value]
+        return sorted(items, key=lambda item: json.dumps(item, sort_keys=True, default=str))
+    return value
+
+
+def summary_key(results: Any, model: str, prompt_version: Any) -> str:
+    """
+    Returns the cache key of a summary of results produced by model with the given prompt version.
+    """
+    return fingerprint_value(["summary", model, prompt_version, canonicalize_results(results)])
+
+
+class SummaryCache:
+    """
+    Summary cache with an in-memory LRU level and an on-disk level.
+
+    cache_dir:      Directory of the on-disk level (None for memory only).
+    memory_entries: Maximum number of summaries kept in memory.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = DEFAULT_SUMMARY_CACHE_DIR, memory_entries: int = 128):
+        self.memory_entries = memory_entries
+        self.disk = ResultCache(cache_dir, max_entries=4096, max_bytes=64 * 1024 * 1024) if cache_dir else None
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Returns the cached summary or None. Disk hits are promoted to memory.
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+        if self.disk is None:
+            return None
+        hit, summary = self.disk.get(key)
+        if not hit:
+            return None
+        self._remember(key, summary)
+        return summary
+
+    def put(self, key: str, summary: str) -> None:
+        """
+        Stores a summary in both levels.
+        """
+        self._remember(key, summary)
+        if self.disk is not None:
+            self.disk.put(key, summary)
+
+    def _remember(self, key: str, summary: str) -> None:
+        with self._lock:
+            self._memory[key] = summary
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+
+def get_summary_cache() -> SummaryCache:
+    """
+    Returns the process-wide summary cache, stored in DEFAULT_SUMMARY_CACHE_DIR.
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = SummaryCache()
+        return _default_cache
@@ -6,21 +6,32 @@ Identifies resources missing required tags such as 'env', 'owner', or 'cost_cent
 
 Functions:
     - check_required_tags: Checks a list of resources for missing required tags.
-    - run_tag_policy_check: Example/demo function to run the tag policy check on sample data.
+    - run_tag_policy_check: Runs the tag policy check on a resource inventory, or on sample data.
+    - policy_config: Returns the policy configuration results depend on, for cache keys.
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+DEFAULT_REQUIRED_TAGS = ["env", "owner", "cost_center"]
+# Bump when a change to the check changes its findings for the same inventory and required tags.
+CACHE_VERSION = 1
+
+def policy_config() -> Dict[str, Any]:
+    """
+    Returns everything besides the resource inventory that run_tag_policy_check depends on.
+    """
+    return {"version": CACHE_VERSION, "required_tags": DEFAULT_REQUIRED_TAGS}
 
 def check_required_tags(
     resources: List[Dict[str, Any]],
-    required_tags: List[str] = ["env", "owner", "cost_center"]
+    required_tags: Optional[List[str]] = None
 ) -> List[Dict[str, Any]]:
     """
     Checks Azure resources for missing required tags.
 
     Args:
-        resources: List of Azure resource dicts with `tags` key.
-        required_tags: List of tags that each resource must have.
+        resources: List of Azure resource dicts with `tags` key (and `id`, if known).
+        required_tags: List of tags that each resource must have (default: DEFAULT_REQUIRED_TAGS).
 
     Returns:
         List of dicts for resources missing one or more required tags:
@@ -28,38 +39,44 @@ def check_required_tags(
             {
                 "resource_name": str,
                 "resource_type": str,
-                "missing_tags": List[str]
+                "missing_tags": List[str],
+                "resource_id": str  # Only for resources with an `id`; needed for remediation.
             },
             ...
         ]
     """
+    if required_tags is None:
+        required_tags = DEFAULT_REQUIRED_TAGS
     violations = []
 
     for res in resources:
         tags = res.get("tags", {})
         missing = [tag for tag in required_tags if tag not in tags or not tags[tag]]
         if missing:
-            violations.append({
+            violation = {
                 "resource_name": res.get("name", "unknown"),
                 "resource_type": res.get("type", "unknown"),
                 "missing_tags": missing
-            })
+            }
+            if res.get("id"):
+                violation["resource_id"] = res["id"]
+            violations.append(violation)
     return violations
 
-def run_tag_policy_check() -> List[Dict[str, Any]]:
+def run_tag_policy_check(resources: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
     """
-    Runs the tag policy check on example resource data.
-    Replace sample_resources with real resource fetching for production use.
+    Runs the tag policy check on the given resource inventory
+    (e.g. from infra_scan.fetch_azure_resources), or on example resource data if none is provided.
 
     Returns:
         List of resources missing required tags.
     """
-    print("DEBUG: run_tag_policy_check called")
-    sample_resources = [
-        {"name": "storage-logs", "type": "Microsoft.Storage/storageAccounts", "tags": {"owner": "teamA"}},
-        {"name": "vm-unlabeled", "type": "Microsoft.Compute/virtualMachines", "tags": {}},
-        {"name": "db-prod", "type": "Microsoft.SQL/servers/databases", "tags": {"env": "prod", "owner": "teamB", "cost_center": "1234"}},
-    ]
-    violations = check_required_tags(sample_resources)
+    if resources is None:
+        resources = [
+            {"name": "storage-logs", "type": "Microsoft.Storage/storageAccounts", "tags": {"owner": "teamA"}},
+            {"name": "vm-unlabeled", "type": "Microsoft.Compute/virtualMachines", "tags": {}},
+            {"name": "db-prod", "type": "Microsoft.SQL/servers/databases", "tags": {"env": "prod", "owner": "teamB", "cost_center": "1234"}},
+        ]
+    violations = check_required_tags(resources)
     return violations
 
@@ -0,0 +1,296 @@
+"""
+tag_remediation.py
+
+Fixes tag policy violations in bulk. Violations from tag_policy.check_required_tags are turned
+into a plan of tag patches (the missing tags and the values to give them, from defaults and
+per-resource overrides), which can be shown as a dry-run diff and then applied through the Azure
+Resource Manager tags API ("Merge" updates, so existing tags are kept).
+
+Patches are sent in batches, each batch concurrently over a pool of keep-alive connections with
+bounded parallelism. Writes are paced to the subscription's write rate, and throttling (429),
+timeouts, conflicts and server errors are retried with jittered backoff; a 429's Retry-After
+pauses every worker, since ARM throttles per subscription. Progress is saved to a state file
+after each batch, so an interrupted run resumes without re-sending completed patches.
+
+Classes/Functions:
+    - build_plan: Turns tag policy violations into tag patches and unresolved violations.
+    - plan_diff: Renders a plan as a dry-run diff.
+    - TagRemediator: Applies a plan through the ARM tags API.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from azure.identity import AzureCliCredential
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from compliance_checker.rate_limit import TokenBucket, backoff_delay, parse_retry_after, RETRYABLE_STATUS_CODES
+from compliance_checker.result_cache import fingerprint_value
+
+DEFAULT_ARM_ENDPOINT = os.getenv("AZURE_ARM_ENDPOINT", "https://management.azure.com")
+ARM_SCOPE = "https://management.azure.com/.default"
+TAGS_API_VERSION = "2021-04-01"
+DEFAULT_STATE_PATH = os.path.join("data", "remediation", "tag_state.json")
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MAX_RETRIES = 5
+# ARM refills a subscription's write allowance at about 10 per second, up to a burst of 200.
+DEFAULT_WRITES_PER_SECOND = float(os.getenv("ARM_WRITES_PER_SECOND", "10"))
+WRITE_BURST = 200
+# Access tokens are refreshed this many seconds before they expire.
+TOKEN_REFRESH_MARGIN = 300
+
+
+def build_plan(
+    violations: List[Dict[str, Any]],
+    tag_values: Dict[str, str],
+    overrides: Optional[Dict[str, Dict[str, str]]] = None
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Returns {"patches": [{"resource_id", "resource_name", "tags"}], "unresolved": [{"resource_name", "resource_id", "reason"}]}.
+    Each missing tag gets its value from overrides for the resource (keyed by resource id or
+    name; the id wins) or else from tag_values. Violations without a resource id, and missing
+    tags without a value, are listed as unresolved. Violations of the same resource are merged.
+    """
+    overrides = overrides or {}
+    patches = {}
+    unresolved = []
+    for violation in violations:
+        name = violation.get("resource_name")
+        resource_id = violation.get("resource_id")
+        if not resource_id:
+            unresolved.append({"resource_name": name, "resource_id": None, "reason": "no resource id"})
+            continue
+        values = {**tag_values, **overrides.get(name, {}), **overrides.get(resource_id, {})}
+        tags = {tag: values[tag] for tag in violation["missing_tags"] if values.get(tag)}
+        without_value = [tag for tag in violation["missing_tags"] if not values.get(tag)]
+        if without_value:
+            unresolved.append({"resource_name": name, "resource_id": resource_id,
+                               "reason": f"no value for tags: {', '.join(without_value)}"})
+        if tags:
+            patch = patches.setdefault(resource_id, {"resource_id": resource_id, "resource_name": name, "tags": {}})
+            patch["tags"].update(tags)
+    return {"patches": list(patches.values()), "unresolved": unresolved}
+
+
+def plan_diff(plan: Dict[str, List[Dict[str, Any]]]) -> str:
+    """
+    Renders a plan as a diff of the tags each resource would gain, followed by the unresolved violations.
+    """
+    lines = []
+    for patch in plan["patches"]:
+        lines.append(f"~ {patch['resource_id']}")
+        lines.extend(f"    + {tag} = {json.dumps(value)}" for tag, value in sorted(patch["tags"].items()))
+    for item in plan["unresolved"]:
+        lines.append(f"! {item['resource_id'] or item['resource_name']}: {item['reason']}")
+    tag_count = sum(len(patch["tags"]) for patch in plan["patches"])
+    lines.append(f"{len(plan['patches'])} resource(s), {tag_count} tag(s) to add; {len(plan['unresolved'])} unresolved")
+    return "\n".join(lines)
+
+
+def _load_state(state_path: Optional[str]) -> Dict[str, str]:
+    if not state_path or not os.path.exists(state_path):
+        return {}
+    with open(state_path) as f:
+        return json.load(f).get("done", {})
+
+
+def _save_state(state_path: str, done: Dict[str, str]) -> None:
+    if os.path.dirname(state_path):
+        os.makedirs(os.path.dirname(state_path), exist_ok=True)
+    partial_path = state_path + ".partial"
+    with open(partial_path, "w") as f:
+        json.dump({"done": done}, f)
+    os.replace(partial_path, state_path)
+
+
+class TagRemediator:
+    """
+    Applies tag patches through the ARM tags API.
+
+    credential:        Azure credential with get_token (default: Azure CLI credentials).
+    endpoint:          ARM endpoint (default: AZURE_ARM_ENDPOINT, else the public cloud).
+    max_concurrency:   Maximum patches in flight.
+    max_retries:       Retries of a retryable failure before the patch is reported as failed.
+    writes_per_second: Pace of writes, after an initial burst.
+    """
+
+    def __init__(
+        self,
+        credential: Any = None,
+        endpoint: str = DEFAULT_ARM_ENDPOINT,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        writes_per_second: float = DEFAULT_WRITES_PER_SECOND,
+        timeout: float = 30.0
+    ):
+        self.credential = credential or AzureCliCredential()
+        self.endpoint = endpoint.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.write_bucket = TokenBucket(writes_per_second, WRITE_BURST)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._token = None
+        self._token_lock = threading.Lock()
+        self._paused_until = 0.0
+        self._pause_lock = threading.Lock()
+        self._stats = {"requests": 0, "retries": 0, "throttled": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _access_token(self) -> str:
+        with self._token_lock:
+            if self._token is None or self._token.expires_on - TOKEN_REFRESH_MARGIN < time.time():
+                self._token = self.credential.get_token(ARM_SCOPE)
+            return self._token.token
+
+    def _pause(self, seconds: float) -> None:
+        with self._pause_lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def _wait_for_pause(self) -> None:
+        while True:
+            with self._pause_lock:
+                remaining = self._paused_until - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(remaining)
+
+    def patch_tags(self, resource_id: str, tags: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Merges tags into the resource's tags and returns the resulting tags resource.
+        Raises requests.HTTPError (or the connection error) once retries are exhausted or for
+        a non-retryable status.
+        """
+        url = f"{self.endpoint}{resource_id}/providers/Microsoft.Resources/tags/default"
+        body = {"operation": "Merge", "properties": {"tags": tags}}
+        attempt = 0
+        while True:
+            self._wait_for_pause()
+            self.write_bucket.acquire()
+            self._count("requests")
+            retry_after = None
+            try:
+                response = self.session.patch(
+                    url, params={"api-version": TAGS_API_VERSION}, json=body, timeout=self.timeout,
+                    headers={"Authorization": f"Bearer {self._access_token()}"},
+                )
+                if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= self.max_retries:
+                    response.raise_for_status()
+                    return response.json()
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if response.status_code == 429:
+                    self._count("throttled")
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+            delay = backoff_delay(attempt, retry_after)
+            if retry_after is not None:
+                # Throttling applies to the whole subscription: hold back every worker.
+                self._pause(delay)
+            else:
+                time.sleep(delay)
+            attempt += 1
+            self._count("retries")
+
+    def apply(
+        self,
+        plan: Dict[str, List[Dict[str, Any]]],
+        state_path: Optional[str] = DEFAULT_STATE_PATH,
+        batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> Dict[str, Any]:
+        """
+        Applies the plan's patches in batches of batch_size, each batch concurrently. Patches
+        recorded as done in state_path with the same tags are skipped; the state is saved after
+        every batch (Merge updates are idempotent, so a batch cut short is safely re-sent).
+        Returns {"applied", "skipped", "failed": [{"resource_id", "error"}], "stats"}.
+        """
+        done = _load_state(state_path)
+        pending = [patch for patch in plan["patches"] if done.get(patch["resource_id"]) != fingerprint_value(patch["tags"])]
+        applied = 0
+        failed = []
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            for start in range(0, len(pending), batch_size):
+                batch = pending[start:start + batch_size]
+                futures = [executor.submit(self.patch_tags, patch["resource_id"], patch["tags"]) for patch in batch]
+                for patch, future in zip(batch, futures):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        failed.append({"resource_id": patch["resource_id"], "error": str(e)})
+                        continue
+                    done[patch["resource_id"]] = fingerprint_value(patch["tags"])
+                    applied += 1
+                if state_path:
+                    _save_state(state_path, done)
+        return {"applied": applied, "skipped": len(plan["patches"]) - len(pending), "failed": failed, "stats": self.stats()}
+
+
+def _load_violations(path: Optional[str], required_tags: List[str]) -> List[Dict[str, Any]]:
+    """
+    Returns the violations in a JSON file (a list of violations, or results with a "tag_policy"
+    key), or those of the current subscription's resources if no file is given.
+    """
+    if path:
+        with open(path) as f:
+            data = json.load(f)
+        return data["tag_policy"] if isinstance(data, dict) else data
+    from compliance_checker import infra_scan, tag_policy
+    return tag_policy.check_required_tags(infra_scan.fetch_azure_resources(), required_tags)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Plan and apply tags missing under the tag policy (dry run by default).")
+    parser.add_argument("--violations", help="JSON file of violations or results (default: scan the subscription)")
+    parser.add_argument("--required-tags", default="env,owner,cost_center")
+    parser.add_argument("--tag", action="append", default=[], metavar="KEY=VALUE", help="default value of a missing tag")
+    parser.add_argument("--overrides", help="JSON file of {resource id or name: {tag: value}}")
+    parser.add_argument("--apply", action="store_true", help="apply the plan instead of only showing it")
+    parser.add_argument("--state", default=DEFAULT_STATE_PATH, help="progress file for resuming an interrupted apply")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    malformed = [item for item in args.tag if not item.split("=", 1)[0].strip() or "=" not in item]
+    if malformed:
+        parser.error(f"--tag expects KEY=VALUE, got: {', '.join(malformed)}")
+    tag_values = dict(item.split("=", 1) for item in args.tag)
+    overrides = None
+    if args.overrides:
+        with open(args.overrides) as f:
+            overrides = json.load(f)
+    violations = _load_violations(args.violations, args.required_tags.split(","))
+    plan = build_plan(violations, tag_values, overrides)
+    print(plan_diff(plan))
+    if not args.apply:
+        return
+
+    result = TagRemediator(max_concurrency=args.concurrency).apply(plan, args.state, args.batch_size)
+    print(f"Applied {result['applied']}, skipped {result['skipped']} already done, {len(result['failed'])} failed "
+          f"({result['stats']['requests']} requests, {result['stats']['throttled']} throttled).")
+    for failure in result["failed"]:
+        print(f"  {failure['resource_id']}: {failure['error']}")
+
+
+if __name__ == "__main__":
+    main()
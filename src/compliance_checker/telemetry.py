@@ -0,0 +1,255 @@
+"""
+telemetry.py
+
+Per-check performance telemetry for compliance runs.
+Records wall time, CPU time, peak memory, items processed and throughput for each check and for
+named sub-stages inside checks, and exports them as a JSON metrics document and in Prometheus
+text exposition format. Optionally dumps a cProfile file per check.
+
+Peak memory is measured with tracemalloc (when enabled) and only covers Python allocations.
+tracemalloc has one process-wide peak, so each check's peak_memory_scope says what its peak covers:
+"check" when it ran alone (or in its own process), measured from its start; "process" when other
+traced checks ran in threads at the same time, in which case the value is the peak of the whole
+process over the check's window, including their allocations, and only an upper bound for it.
+Tracing is only stopped again if this module started it.
+Only one profiler can be enabled per process, so profiled checks running in threads take turns.
+
+Classes/Functions:
+    - stage: Context manager timing a named sub-stage of the current check (no-op outside a check).
+    - instrumented_call: Runs a check callable and returns its result with measured metrics.
+    - Telemetry: Collects metrics for a run and exports them as JSON and Prometheus text.
+"""
+
+import os
+import json
+import time
+import itertools
+import cProfile
+import threading
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional, Tuple
+
+_current = threading.local()
+_tracemalloc_lock = threading.Lock()
+# Token of each traced check in progress -> whether another traced check overlapped it.
+_tracemalloc_active: Dict[int, bool] = {}
+_tracemalloc_tokens = itertools.count()
+_tracemalloc_owned = False
+# A second enabled cProfile.Profile raises ValueError on Python 3.12+.
+_profile_lock = threading.Lock()
+
+
+def _reset_after_fork() -> None:
+    # A forked check process measures only its own allocations.
+    global _tracemalloc_owned
+    _tracemalloc_active.clear()
+    _tracemalloc_owned = False
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Times a named sub-stage of the check running in the current thread.
+    Repeated stages with the same name are accumulated. Does nothing outside an instrumented check.
+    """
+    stages = getattr(_current, "stages", None)
+    if stages is None:
+        yield
+        return
+    wall_start, cpu_start = time.perf_counter(), time.thread_time()
+    try:
+        yield
+    finally:
+        record = stages.setdefault(name, {"wall_seconds": 0.0, "cpu_seconds": 0.0, "calls": 0})
+        record["wall_seconds"] += time.perf_counter() - wall_start
+        record["cpu_seconds"] += time.thread_time() - cpu_start
+        record["calls"] += 1
+
+
+def _start_tracemalloc() -> int:
+    """
+    Starts (or resets the peak of) tracing for a check and returns its token.
+    """
+    global _tracemalloc_owned
+    with _tracemalloc_lock:
+        if not _tracemalloc_active:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+                _tracemalloc_owned = True
+        for token in _tracemalloc_active:
+            _tracemalloc_active[token] = True
+        token = next(_tracemalloc_tokens)
+        _tracemalloc_active[token] = bool(_tracemalloc_active)
+        return token
+
+
+def _stop_tracemalloc(token: int) -> Tuple[int, str]:
+    """
+    Returns (peak bytes, scope) of a check's window, stopping tracing after the last check if
+    this module started it.
+    """
+    global _tracemalloc_owned
+    with _tracemalloc_lock:
+        _, peak = tracemalloc.get_traced_memory()
+        overlapped = _tracemalloc_active.pop(token)
+        if not _tracemalloc_active and _tracemalloc_owned:
+            tracemalloc.stop()
+            _tracemalloc_owned = False
+        return peak, "process" if overlapped else "check"
+
+
+def instrumented_call(
+    name: str,
+    func: Callable[..., Any],
+    args: tuple = (),
+    trace_memory: bool = False,
+    profile_dir: Optional[str] = None
+) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Runs func(*args) in the current thread and returns (result, metrics).
+    Metrics include wall and CPU seconds, sub-stages, and peak traced memory and its scope
+    ("check" or "process", see above) if trace_memory is set.
+    If profile_dir is given, a cProfile dump is written to <profile_dir>/<name>.prof; profiled
+    calls in other threads wait until this one has finished (the wait is not measured).
+    Exceptions from func propagate unchanged.
+    """
+    profiler = cProfile.Profile() if profile_dir else None
+    with _profile_lock if profiler else nullcontext():
+        _current.stages = {}
+        token = _start_tracemalloc() if trace_memory else None
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        try:
+            if profiler:
+                profiler.enable()
+            result = func(*args)
+        finally:
+            if profiler:
+                profiler.disable()
+            peak, scope = _stop_tracemalloc(token) if token is not None else (None, None)
+            metrics = {
+                "wall_seconds": time.perf_counter() - wall_start,
+                "cpu_seconds": time.thread_time() - cpu_start,
+                "peak_memory_bytes": peak,
+                "peak_memory_scope": scope,
+                "stages": _current.stages,
+            }
+            _current.stages = None
+    if profiler:
+        os.makedirs(profile_dir, exist_ok=True)
+        profiler.dump_stats(os.path.join(profile_dir, f"{name}.prof"))
+    return result, metrics
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Telemetry:
+    """
+    Collects per-check metrics for a run and exports them.
+
+    trace_memory: Measure peak Python memory with tracemalloc (slows allocation-heavy checks).
+    profile_dir:  Directory for per-check cProfile dumps, or None to disable profiling.
+    """
+
+    def __init__(self, trace_memory: bool = True, profile_dir: Optional[str] = None):
+        self.trace_memory = trace_memory
+        self.profile_dir = profile_dir
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self._run_start = time.perf_counter()
+        self.checks = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, kind: str, metrics: Dict[str, Any], status: str = "succeeded",
+               items: Optional[Dict[str, int]] = None) -> None:
+        """
+        Records the metrics of a finished check or input, with the items it processed by unit
+        (e.g. {"resources": 120, "bytes": 52428800}); throughput is derived per unit.
+        """
+        record = dict(metrics)
+        record.update(kind=kind, status=status, items=items or {})
+        # status is one of "succeeded", "cached", "failed" or "timed_out"
+        wall = record.get("wall_seconds") or 0.0
+        record["throughput_per_second"] = {unit: count / wall for unit, count in record["items"].items() if wall > 0}
+        with self._lock:
+            self.checks[name] = record
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the JSON metrics document for the run.
+        """
+        with self._lock:
+            return {
+                "started_at": self.started_at,
+                "run_wall_seconds": time.perf_counter() - self._run_start,
+                "checks": {name: dict(record) for name, record in self.checks.items()},
+            }
+
+    def to_prometheus(self) -> str:
+        """
+        Returns the metrics in Prometheus text exposition format.
+        """
+        document = self.to_dict()
+        families = [
+            ("compliance_run_wall_seconds", "Wall time of the whole compliance run.",
+             [({}, document["run_wall_seconds"])]),
+        ]
+        per_check = {
+            "compliance_check_wall_seconds": ("Wall time of a check.", "wall_seconds"),
+            "compliance_check_cpu_seconds": ("CPU time of a check.", "cpu_seconds"),
+            "compliance_check_peak_memory_bytes": ("Peak traced Python memory during a check, by scope.", "peak_memory_bytes"),
+        }
+        for metric, (help_text, key) in per_check.items():
+            samples = [({"check": name, "scope": record["peak_memory_scope"]} if record.get("peak_memory_scope")
+                        and key == "peak_memory_bytes" else {"check": name}, record[key])
+                       for name, record in document["checks"].items() if record.get(key) is not None]
+            families.append((metric, help_text, samples))
+        families.append(("compliance_check_success", "1 if the check succeeded or was served from cache, else 0.",
+                         [({"check": name}, int(record["status"] in ("succeeded", "cached")))
+                          for name, record in document["checks"].items()]))
+        families.append(("compliance_check_items", "Items processed by a check, by unit.",
+                         [({"check": name, "unit": unit}, count)
+                          for name, record in document["checks"].items() for unit, count in record["items"].items()]))
+        families.append(("compliance_check_throughput_per_second", "Items processed per second, by unit.",
+                         [({"check": name, "unit": unit}, rate)
+                          for name, record in document["checks"].items()
+                          for unit, rate in record["throughput_per_second"].items()]))
+        for key, help_text in (("wall_seconds", "Wall time of a check sub-stage."), ("cpu_seconds", "CPU time of a check sub-stage.")):
+            families.append((f"compliance_stage_{key}", help_text,
+                             [({"check": name, "stage": stage_name}, stage_record[key])
+                              for name, record in document["checks"].items()
+                              for stage_name, stage_record in record.get("stages", {}).items()]))
+
+        lines = []
+        for metric, help_text, samples in families:
+            if not samples:
+                continue
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} gauge")
+            for labels, value in samples:
+                label_text = ",".join(f'{k}="{_escape_label(v)}"' for k, v in labels.items())
+                lines.append(f"{metric}{{{label_text}}} {value}" if label_text else f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, output_dir: str = "data/results", basename: str = "metrics") -> Tuple[str, str]:
+        """
+        Writes <basename>.json and <basename>.prom to output_dir and returns their paths.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        json_path = os.path.join(output_dir, f"{basename}.json")
+        prom_path = os.path.join(output_dir, f"{basename}.prom")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        with open(prom_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        return json_path, prom_path
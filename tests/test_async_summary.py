@@ -0,0 +1,134 @@
+"""
+test_async_summary.py
+
+Unit tests for the async_summary module.
+Tests background summary generation with its deadline and error fallbacks, and that HTML reports
+render their findings before the summary is requested.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from functools import partial
+from unittest.mock import MagicMock, patch
+from src.compliance_checker import llm_assist
+from src.compliance_checker.async_summary import BackgroundSummary, template_summary
+from src.compliance_checker.render import HtmlSink, render_report
+
+RESULTS = {
+    "tag_policy": [{"resource_name": "vm-1", "missing_tags": ["env"]}],
+    "pii_scan": {"email": ["a@example.com", "b@example.com"], "phone": []},
+    "model_audit": [],
+}
+
+
+class TestBackgroundSummary(unittest.TestCase):
+    """
+    Test suite for background summary generation.
+    """
+
+    def test_summary_ready_before_deadline(self):
+        """
+        Test that a generated summary is returned and its streamed tokens recorded.
+        """
+        def generate(results, on_token):
+            for token in ("All ", "good."):
+                on_token(token)
+            return "All good."
+
+        task = BackgroundSummary(generate, RESULTS, deadline=5)
+        self.assertEqual(task.result(), "All good.")
+        self.assertEqual(task.tokens, ["All ", "good."])
+        self.assertFalse(task.timed_out)
+
+    def test_deadline_falls_back_to_template_and_stops_generation(self):
+        """
+        Test that a slow model is cut off at the deadline and the template summary is used.
+        """
+        stopped = threading.Event()
+
+        def generate(results, on_token):
+            try:
+                while True:
+                    on_token("token ")
+                    time.sleep(0.01)
+            finally:
+                stopped.set()
+
+        task = BackgroundSummary(generate, RESULTS, deadline=0.1)
+        start = time.monotonic()
+        summary = task.result()
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertTrue(task.timed_out)
+        self.assertEqual(summary, template_summary(RESULTS))
+        self.assertTrue(stopped.wait(1))
+
+    def test_llm_errors_fall_back_to_template(self):
+        """
+        Test that a missing or failing local model gives the template summary, not an error message.
+        """
+        generate = partial(llm_assist.generate_summary_with_local_llama, use_cache=False, raise_errors=True)
+        with patch.object(llm_assist, "Llama", None):
+            self.assertEqual(BackgroundSummary(generate, RESULTS, deadline=5).result(), template_summary(RESULTS))
+
+        manager = MagicMock()
+        manager.stream.side_effect = OSError("model file not found")
+        with patch.object(llm_assist, "Llama", object()), \
+                patch.object(llm_assist, "get_model_manager", return_value=manager):
+            self.assertEqual(BackgroundSummary(generate, RESULTS, deadline=5).result(), template_summary(RESULTS))
+            self.assertTrue(llm_assist.generate_summary_with_local_llama(RESULTS, use_cache=False)
+                            .startswith("Local LLaMA summary failed: model file not found"))
+
+    def test_template_summary_counts_findings(self):
+        """
+        Test that the template summary states the finding count of each flagged check.
+        """
+        summary = template_summary(RESULTS)
+        self.assertIn("reported 3 finding(s): tag_policy (1), pii_scan (2)", summary)
+        self.assertIn("1 check(s) reported no findings", summary)
+        self.assertIn("no findings", template_summary({"model_audit": []}))
+
+
+class TestDeferredHtmlSummary(unittest.TestCase):
+    """
+    Test suite for HTML reports whose summary is filled in after the findings are rendered.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_deferred_summary_matches_eager_report(self):
+        """
+        Test that the summary is requested only after the findings are written and that the
+        assembled report is identical to one rendered with the summary up front.
+        """
+        eager_path = os.path.join(self.tmp_dir, "eager.html")
+        deferred_path = os.path.join(self.tmp_dir, "deferred.html")
+        body_sizes = []
+
+        def summary():
+            body_sizes.append(os.path.getsize(deferred_path + ".body"))
+            return "Summary <ready>."
+
+        diff = {"old_run": 1, "new_run": 2, "new": [], "resolved": [], "persisting": 1}
+        render_report(RESULTS, [HtmlSink(eager_path, summary="Summary <ready>.", diff=diff),
+                                HtmlSink(deferred_path, summary=summary, diff=diff)], timestamp="2025-01-01T00:00:00Z")
+
+        self.assertGreater(body_sizes[0], 0)
+        self.assertFalse(os.path.exists(deferred_path + ".body"))
+        with open(eager_path, encoding="utf-8") as eager, open(deferred_path, encoding="utf-8") as deferred:
+            self.assertEqual(deferred.read(), eager.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+"""
+test_benchmarks.py
+
+Unit tests for the benchmark suite helpers.
+Tests that synthetic generators are seeded and that regressions are detected against baselines.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import unittest
+from benchmarks import synthetic
+from benchmarks.run_benchmarks import find_regressions
+from src.compliance_checker.pii_scan import scan_text_for_pii
+
+
+class TestBenchmarks(unittest.TestCase):
+    """
+    Test suite for benchmark generators and regression detection.
+    """
+
+    def test_generators_are_seeded(self):
+        """
+        Test that the same seed yields identical data and a different seed does not.
+        """
+        self.assertEqual(synthetic.generate_resources(50, seed=3), synthetic.generate_resources(50, seed=3))
+        self.assertNotEqual(synthetic.generate_log_text(50, seed=3), synthetic.generate_log_text(50, seed=4))
+        self.assertEqual(len(synthetic.generate_model_registry(20)), 20)
+
+    def test_log_pii_density_is_controlled(self):
+        """
+        Test that no PII is generated at density zero and that PII appears at high density.
+        """
+        clean = scan_text_for_pii(synthetic.generate_log_text(200, pii_density=0.0))
+        self.assertEqual(clean["email"] + clean["ssn"], [])
+        lines = synthetic.generate_log_text(200, pii_density=1.0).splitlines()
+        self.assertTrue(all(" contact=" in line for line in lines))
+
+    def test_find_regressions(self):
+        """
+        Test that only cases slower than baseline by more than the threshold and noise margin are reported.
+        """
+        baselines = {"a[1]": 0.100, "b[1]": 0.100, "c[1]": 0.0001}
+        timings = {"a[1]": 0.110, "b[1]": 0.200, "c[1]": 0.0005, "d[1]": 5.0}
+        regressions = find_regressions(timings, baselines, threshold=0.25)
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith("b[1]"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+"""
+test_blob_upload.py
+
+Unit tests for the blob_upload module.
+Uses an in-memory stand-in for a Blob Storage container (like Azurite) to test compression,
+Content-MD5 based skipping of unchanged blobs, concurrent uploads and deleting stale blobs.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import gzip
+import shutil
+import tempfile
+import threading
+import unittest
+from types import SimpleNamespace
+from azure.core.exceptions import ResourceNotFoundError
+from src.compliance_checker import blob_upload
+
+
+class FakeBlobClient:
+    def __init__(self, container, name):
+        self.container = container
+        self.name = name
+
+    def get_blob_properties(self):
+        if self.name not in self.container.blobs:
+            raise ResourceNotFoundError("The specified blob does not exist.")
+        return SimpleNamespace(content_settings=self.container.blobs[self.name][1])
+
+    def upload_blob(self, data, overwrite=False, content_settings=None):
+        with self.container.lock:
+            self.container.blobs[self.name] = (bytes(data), content_settings)
+            self.container.uploads.append(self.name)
+
+
+class FakeContainerClient:
+    """
+    In-memory container storing (data, content_settings) per blob name.
+    """
+
+    def __init__(self):
+        self.blobs = {}
+        self.uploads = []
+        self.lock = threading.Lock()
+
+    def get_blob_client(self, name):
+        return FakeBlobClient(self, name)
+
+    def list_blobs(self, name_starts_with=None):
+        return [SimpleNamespace(name=name) for name in sorted(self.blobs) if name.startswith(name_starts_with or "")]
+
+    def delete_blob(self, name):
+        with self.lock:
+            del self.blobs[name]
+
+
+class TestBlobUpload(unittest.TestCase):
+    """
+    Test suite for change-aware report uploads.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.container = FakeContainerClient()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _write(self, name, text):
+        path = os.path.join(self.tmp_dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def test_compresses_text_and_sets_content_encoding(self):
+        """
+        Test that large HTML is stored gzip-compressed and small files are stored as-is.
+        """
+        html = "<html>" + "<p>finding</p>" * 500 + "</html>"
+        artifacts = {"index.html": self._write("index.html", html), "tiny.json": self._write("tiny.json", "{}")}
+        statuses = blob_upload.upload_artifacts(self.container, artifacts)
+
+        self.assertEqual(statuses, {"index.html": blob_upload.UPLOADED, "tiny.json": blob_upload.UPLOADED})
+        data, settings = self.container.blobs["index.html"]
+        self.assertEqual(settings.content_encoding, "gzip")
+        self.assertEqual(settings.content_type, "text/html; charset=utf-8")
+        self.assertEqual(gzip.decompress(data).decode("utf-8"), html)
+        self.assertIsNone(self.container.blobs["tiny.json"][1].content_encoding)
+
+    def test_skips_unchanged_blobs(self):
+        """
+        Test that only blobs whose content changed are uploaded again.
+        """
+        artifacts = {f"shards/{i}.json": self._write(f"{i}.json", f"[\"finding {i}\"]" * 200) for i in range(5)}
+        blob_upload.upload_artifacts(self.container, artifacts)
+        self._write("3.json", "[\"changed\"]")
+
+        statuses = blob_upload.upload_artifacts(self.container, artifacts)
+        self.assertEqual(statuses["shards/3.json"], blob_upload.UPLOADED)
+        self.assertEqual(sum(status == blob_upload.SKIPPED for status in statuses.values()), 4)
+        self.assertEqual(len(self.container.uploads), 6)
+
+    def test_reports_failures_per_blob(self):
+        """
+        Test that a failing artifact is reported without stopping the others.
+        """
+        artifacts = {"ok.html": self._write("ok.html", "<p>ok</p>"), "missing.html": os.path.join(self.tmp_dir, "nope")}
+        statuses = blob_upload.upload_artifacts(self.container, artifacts)
+        self.assertEqual(statuses["ok.html"], blob_upload.UPLOADED)
+        self.assertTrue(statuses["missing.html"].startswith("failed:"))
+
+    def test_deletes_only_stale_blobs_under_prefix(self):
+        """
+        Test that blobs under the prefix that are not kept are deleted, and others are left alone.
+        """
+        artifacts = {name: self._write(name.replace("/", "_"), "[]")
+                     for name in ("report/shards/0-a.json", "report/shards/1-b.json", "report/index.html", "other.json")}
+        blob_upload.upload_artifacts(self.container, artifacts)
+
+        statuses = blob_upload.delete_stale_blobs(self.container, "report/shards/", {"report/shards/1-b.json"})
+        self.assertEqual(statuses, {"report/shards/0-a.json": blob_upload.DELETED})
+        self.assertEqual(sorted(self.container.blobs), ["other.json", "report/index.html", "report/shards/1-b.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
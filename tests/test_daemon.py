@@ -0,0 +1,138 @@
+"""
+test_daemon.py
+
+Unit tests for the daemon module.
+Tests job submission, status polling, the bounded job queue, and the access restrictions
+(log roots, Host check, owner-only Unix socket) of the local HTTP API.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import json
+import stat
+import time
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from src.compliance_checker import daemon
+
+
+class TestDaemon(unittest.TestCase):
+    """
+    Test suite for daemon module.
+    """
+
+    def setUp(self):
+        # Serve the job API on an ephemeral port with a fake runner that waits for a release signal.
+        self.release = threading.Event()
+        self.calls = []
+
+        def fake_runner(params):
+            self.calls.append(params)
+            self.release.wait(5)
+            return {"results": {"pii_scan": {"email": []}}, "errors": {}}
+
+        self.manager = daemon.JobManager(runner=fake_runner, workers=1, queue_size=1)
+        self.manager.start()
+        self.server = daemon.create_server(self.manager, port=0)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+        self.manager.stop()
+
+    def request(self, method, path, body=None):
+        data = json.dumps(body).encode() if body is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method)
+        try:
+            with urllib.request.urlopen(req) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    def wait_for_status(self, job_id, status):
+        for _ in range(100):
+            _, job = self.request("GET", f"/jobs/{job_id}")
+            if job["status"] == status:
+                return job
+            time.sleep(0.02)
+        self.fail(f"job {job_id} never reached status {status}")
+
+    def test_submit_and_poll_job(self):
+        """
+        Test that a submitted job runs on a worker and its results can be polled.
+        """
+        status, body = self.request("POST", "/jobs", {"checks": ["pii_scan"]})
+        self.assertEqual(status, 202)
+        self.wait_for_status(body["job_id"], "running")
+        self.release.set()
+        job = self.wait_for_status(body["job_id"], "succeeded")
+        self.assertEqual(job["results"], {"pii_scan": {"email": []}})
+        self.assertEqual(self.calls, [{"checks": ["pii_scan"]}])
+
+    def test_queue_full_and_invalid_requests(self):
+        """
+        Test that the bounded queue rejects excess jobs and unknown checks are rejected up front.
+        """
+        status, first = self.request("POST", "/jobs", {})
+        self.wait_for_status(first["job_id"], "running")
+        self.assertEqual(self.request("POST", "/jobs", {})[0], 202)
+        self.assertEqual(self.request("POST", "/jobs", {})[0], 429)
+        self.assertEqual(self.request("POST", "/jobs", {"checks": ["bogus"]})[0], 400)
+        for body in ({"checks": 5}, {"checks": "pii_scan"}, {"log_paths": "x.log"}, {"log_paths": [1]},
+                     {"timeouts": "abc"}, {"timeouts": {"pii_scan": "10"}}):
+            self.assertEqual(self.request("POST", "/jobs", body)[0], 400, body)
+        self.assertEqual(self.request("GET", "/jobs/unknown")[0], 404)
+        self.assertEqual(self.request("GET", "/health")[1]["queued"], 1)
+
+    def test_log_paths_outside_roots_and_foreign_hosts_are_rejected(self):
+        """
+        Test that jobs cannot scan files outside the log roots and that requests naming a
+        non-loopback Host (as after DNS rebinding) are refused.
+        """
+        for paths in (["/etc/passwd"], ["data/../../etc/passwd"], ["data/sample_log.txt", "/root"]):
+            status, body = self.request("POST", "/jobs", {"log_paths": paths})
+            self.assertEqual(status, 400, paths)
+            self.assertIn("outside the allowed roots", body["error"])
+        self.assertEqual(self.request("POST", "/jobs", {"log_paths": ["data/sample_log.txt"]})[0], 202)
+
+        for host in ("evil.example.com", "evil.example.com:8765", ""):
+            req = urllib.request.Request(self.base_url + "/health", headers={"Host": host})
+            with self.assertRaises(urllib.error.HTTPError) as raised:
+                urllib.request.urlopen(req)
+            self.assertEqual(raised.exception.code, 403, host)
+        req = urllib.request.Request(self.base_url + "/health", headers={"Host": "localhost:8765"})
+        with urllib.request.urlopen(req) as response:
+            self.assertEqual(response.status, 200)
+
+    @unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Unix sockets are not available")
+    def test_unix_socket_is_owner_only(self):
+        """
+        Test that the Unix socket is created with mode 0600 and serves the API.
+        """
+        tmp_dir = tempfile.mkdtemp()
+        socket_path = os.path.join(tmp_dir, "run", "daemon.sock")
+        server = daemon.create_server(self.manager, socket_path=socket_path)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            self.assertEqual(stat.S_IMODE(os.stat(socket_path).st_mode), 0o600)
+            with socket.socket(socket.AF_UNIX) as client:
+                client.connect(socket_path)
+                client.sendall(b"GET /health HTTP/1.0\r\nHost: anything\r\n\r\n")
+                self.assertTrue(client.recv(1024).startswith(b"HTTP/1.0 200"))
+        finally:
+            server.shutdown()
+            server.server_close()
+            shutil.rmtree(tmp_dir)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,6 +8,7 @@ Tests infrastructure compliance scanning and report saving functionality.
 import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
 
 import json
 import unittest
@@ -46,6 +47,16 @@ class TestInfraScan(unittest.TestCase):
         self.assertEqual(report["summary"]["total"], 2)
         self.assertEqual(report["summary"]["non_compliant"], 1)
 
+    @patch("src.compliance_checker.infra_scan.fetch_azure_resources")
+    def test_scan_for_compliance_uses_given_inventory(self, mock_fetch):
+        """
+        Test that scan_for_compliance scans a provided resource inventory without fetching from Azure.
+        """
+        resources = [{"name": "vm-test", "type": "Microsoft.Compute/virtualMachines", "tags": {}}]
+        report = infra_scan.scan_for_compliance(resources)
+        mock_fetch.assert_not_called()
+        self.assertEqual(report["summary"], {"total": 1, "non_compliant": 1})
+
     def test_save_report_creates_file(self):
         """
         Test that save_report creates a file and writes the report correctly.
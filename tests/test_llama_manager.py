@@ -0,0 +1,104 @@
+"""
+test_llama_manager.py
+
+Unit tests for the llama_manager module.
+Uses a fake model loader to test lazy loading, sharing across threads, idle eviction and latency stats.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import time
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from src.compliance_checker.llama_manager import LlamaModelManager
+
+
+class FakeModel:
+    """
+    Callable like a llama_cpp.Llama; fails if two threads run inference at once.
+    """
+
+    def __init__(self):
+        self.active = 0
+        self.closed = False
+
+    def __call__(self, prompt, stream=False, **kwargs):
+        if stream:
+            return ({"choices": [{"text": word}]} for word in f"summary of {prompt}".split(" "))
+        self.active += 1
+        assert self.active == 1, "concurrent inference"
+        time.sleep(0.01)
+        self.active -= 1
+        return {"choices": [{"text": f"summary of {prompt}"}]}
+
+    def close(self):
+        self.closed = True
+
+
+class TestLlamaModelManager(unittest.TestCase):
+    """
+    Test suite for the LLaMA model manager.
+    """
+
+    def setUp(self):
+        self.loaded = []
+
+    def loader(self, model_path, **kwargs):
+        time.sleep(0.05)
+        model = FakeModel()
+        self.loaded.append(model)
+        return model
+
+    def test_loads_once_and_serializes_concurrent_requests(self):
+        """
+        Test that concurrent requests share one lazily loaded model and record cold/warm latency.
+        """
+        manager = LlamaModelManager("model.gguf", idle_timeout=0, loader=self.loader)
+        self.assertFalse(manager.loaded)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            responses = list(executor.map(lambda i: manager.generate(f"run {i}"), range(8)))
+
+        self.assertEqual(len(self.loaded), 1)
+        self.assertEqual(responses[3]["choices"][0]["text"], "summary of run 3")
+        stats = manager.stats()
+        self.assertEqual(stats["loads"], 1)
+        self.assertEqual(stats["cold"]["requests"] + stats["warm"]["requests"], 8)
+        self.assertGreaterEqual(stats["cold"]["requests"], 1)
+
+    def test_unloads_after_idle_timeout_but_not_while_in_use(self):
+        """
+        Test that an idle model is unloaded and reloaded on the next request, but never while leased.
+        """
+        manager = LlamaModelManager("model.gguf", idle_timeout=0.1, loader=self.loader)
+        with manager.acquire():
+            time.sleep(0.25)
+            self.assertTrue(manager.loaded)
+        time.sleep(0.3)
+        self.assertFalse(manager.loaded)
+        self.assertTrue(self.loaded[0].closed)
+
+        manager.generate("again")
+        self.assertEqual(manager.stats()["loads"], 2)
+        self.assertEqual(manager.stats()["evictions"], 1)
+
+    def test_closing_a_stream_releases_the_model(self):
+        """
+        Test that streamed tokens arrive one by one and that closing the stream early releases the lease.
+        """
+        manager = LlamaModelManager("model.gguf", idle_timeout=0, loader=self.loader)
+        self.assertEqual(list(manager.stream("a b")), ["summary", "of", "a", "b"])
+
+        tokens = manager.stream("c d")
+        self.assertEqual(next(tokens), "summary")
+        self.assertEqual(manager._leases, 1)
+        tokens.close()
+        self.assertEqual(manager._leases, 0)
+        self.assertTrue(manager.unload())
+
+
+if __name__ == "__main__":
+    unittest.main()
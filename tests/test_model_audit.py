@@ -11,12 +11,21 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 import unittest
 from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
 from src.compliance_checker.model_audit import (
     check_model_drift,
     check_model_bias,
     check_model_explainability,
     audit_model,
-    run_model_audit
+    run_model_audit,
+    HistogramSketch,
+    population_stability_index,
+    ks_statistic,
+    check_feature_drift,
+    encode_fairness_features
 )
 
 class TestModelAudit(unittest.TestCase):
@@ -107,5 +116,84 @@ class TestModelAudit(unittest.TestCase):
         self.assertTrue(len(issues) >= 1)
         self.assertIn("Model may be outdated (drift risk).", issues)
 
+    def test_sketch_merge_matches_single_pass(self):
+        """
+        Test that merging sketches built on shards gives the same counts as one pass over all data.
+        """
+        rng = np.random.default_rng(0)
+        reference = HistogramSketch.from_reference(rng.normal(size=1000))
+        live_values = rng.normal(size=900)
+
+        whole = reference.empty_like().update(live_values)
+        shards = [reference.empty_like().update(chunk) for chunk in np.array_split(live_values, 3)]
+        merged = shards[0].merge(shards[1]).merge(shards[2])
+        self.assertEqual(merged.counts.tolist(), whole.counts.tolist())
+
+    def test_feature_drift_psi_and_ks(self):
+        """
+        Test that PSI/KS stay low for the same distribution and flag a shifted one.
+        """
+        rng = np.random.default_rng(1)
+        reference = HistogramSketch.from_reference(rng.normal(size=5000))
+        same = reference.empty_like().update(rng.normal(size=5000))
+        shifted = reference.empty_like().update(rng.normal(loc=1.0, size=5000))
+
+        self.assertLess(population_stability_index(reference, same), 0.05)
+        self.assertLess(ks_statistic(reference, same), 0.05)
+        drifted = check_feature_drift({"age": reference}, {"age": shifted.to_dict()})
+        self.assertIn("age", drifted)
+        self.assertGreater(drifted["age"]["psi"], 0.2)
+
+    def test_audit_model_reports_data_drift(self):
+        """
+        Test that audit_model adds a data drift issue when live sketches diverge from the reference.
+        """
+        rng = np.random.default_rng(2)
+        reference = HistogramSketch.from_reference(rng.uniform(0, 1, size=2000))
+        live = reference.empty_like().update(rng.uniform(0.5, 1.5, size=2000))
+        metadata = {
+            "last_trained": (datetime.now() - timedelta(days=5)).isoformat(),
+            "explainability_tools": ["SHAP"],
+            "reference_sketches": {"income": reference.to_dict()},
+            "live_sketches": {"income": live.to_dict()}
+        }
+        issues = audit_model(metadata)
+        self.assertEqual(len(issues), 1)
+        self.assertTrue(issues[0].startswith("Data drift detected in feature 'income'"))
+
+    def test_encode_fairness_features_sparse(self):
+        """
+        Test that sparse encoding returns a CSR matrix with one column per category level plus numerics.
+        """
+        X = pd.DataFrame({
+            "age": [25, 40, 61, 33],
+            "occupation": pd.Categorical(["Sales", "Tech-support", "Sales", None]),
+            "native-country": ["Peru", "India", "India", "Canada"],
+        })
+        encoded = encode_fairness_features(X, sparse=True)
+        self.assertTrue(sparse.issparse(encoded))
+        # 3 occupation levels (incl. missing) + 3 countries + 1 numeric column
+        self.assertEqual(encoded.shape, (4, 7))
+        self.assertEqual(encoded.getnnz(axis=1).tolist(), [3, 3, 3, 3])
+
+    def test_encode_fairness_features_sparse_numeric_only(self):
+        """
+        Test that a frame without categorical columns is still returned as a scaled CSR matrix.
+        """
+        X = pd.DataFrame({"age": [25, 50, 0], "income": [1000.0, -4000.0, 2000.0]})
+        encoded = encode_fairness_features(X, sparse=True)
+        self.assertTrue(sparse.isspmatrix_csr(encoded))
+        self.assertEqual(encoded.toarray().tolist(), [[0.5, 0.25], [1.0, -1.0], [0.0, 0.5]])
+
+    def test_encode_fairness_features_scales_numerics_in_both_forms(self):
+        """
+        Test that the dense encoding scales numeric columns exactly like the sparse one.
+        """
+        X = pd.DataFrame({"age": [25, 50, 0], "income": [1000.0, -4000.0, 2000.0], "sex": ["F", "M", "F"]})
+        dense = encode_fairness_features(X, sparse=False)
+        sparse_numeric = encode_fairness_features(X, sparse=True).toarray()[:, -2:]
+        self.assertEqual(dense[["age", "income"]].values.tolist(), sparse_numeric.tolist())
+        self.assertEqual(dense["sex_M"].tolist(), [False, True, False])
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,89 @@
+"""
+test_model_registry.py
+
+Unit tests for the model_registry module.
+Tests model card discovery, parsing, auditing, and mtime/hash-based caching.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import json
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from src.compliance_checker import model_registry
+
+
+class TestModelRegistry(unittest.TestCase):
+    """
+    Test suite for model_registry module.
+    """
+
+    def setUp(self):
+        # Create a small registry with one compliant and one non-compliant model.
+        self.registry_dir = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.registry_dir, "cache", "registry_cache.json")
+        self.write_card("team_a/credit.json", {
+            "name": "credit-model",
+            "last_trained": (datetime.now() - timedelta(days=5)).isoformat(),
+            "explainability_tools": ["SHAP"]
+        })
+        self.write_card("team_b/churn.json", {
+            "name": "churn-model",
+            "last_trained": (datetime.now() - timedelta(days=90)).isoformat(),
+            "explainability_tools": []
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.registry_dir)
+
+    def write_card(self, relative_path, metadata):
+        path = os.path.join(self.registry_dir, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(metadata, f)
+        return path
+
+    def test_audit_model_registry_reports_issues(self):
+        """
+        Test that every model card is audited and issues are attributed to the right model.
+        """
+        result = model_registry.audit_model_registry(self.registry_dir, cache_path=self.cache_path)
+        issues = {m["model_name"]: m["issues"] for m in result["models"]}
+        self.assertEqual(issues["credit-model"], [])
+        self.assertEqual(len(issues["churn-model"]), 2)
+        self.assertEqual(result["stats"], {"total": 2, "parsed": 2, "cached": 0})
+
+    def test_rerun_only_reparses_changed_files(self):
+        """
+        Test that a second run reuses cached verdicts and only re-parses modified files.
+        """
+        model_registry.audit_model_registry(self.registry_dir, cache_path=self.cache_path)
+        result = model_registry.audit_model_registry(self.registry_dir, cache_path=self.cache_path)
+        self.assertEqual(result["stats"]["parsed"], 0)
+
+        path = self.write_card("team_b/churn.json", {
+            "name": "churn-model",
+            "last_trained": datetime.now().isoformat(),
+            "explainability_tools": ["LIME"]
+        })
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000_000))
+        result = model_registry.audit_model_registry(self.registry_dir, cache_path=self.cache_path)
+        self.assertEqual(result["stats"], {"total": 2, "parsed": 1, "cached": 1})
+        self.assertTrue(all(m["issues"] == [] for m in result["models"]))
+
+    def test_unparseable_card_is_reported(self):
+        """
+        Test that a malformed model card yields an issue instead of failing the whole audit.
+        """
+        with open(os.path.join(self.registry_dir, "broken.json"), "w") as f:
+            f.write("{not json")
+        result = model_registry.audit_model_registry(self.registry_dir, cache_path=None)
+        broken = [m for m in result["models"] if m["model_name"] == "broken"][0]
+        self.assertTrue(broken["issues"][0].startswith("Model card could not be parsed"))
+
+if __name__ == "__main__":
+    unittest.main()
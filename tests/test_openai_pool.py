@@ -0,0 +1,164 @@
+"""
+test_openai_pool.py
+
+Unit tests for the openai_pool module.
+Runs the client against a local stub of the chat completions endpoint to test retries on rate
+limits and server errors, connection reuse, batch submission and the token bucket.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from src.compliance_checker import llm_assist, openai_pool, rate_limit
+from src.compliance_checker.openai_pool import PooledOpenAIClient
+from src.compliance_checker.rate_limit import TokenBucket, backoff_delay
+
+
+class StubOpenAIHandler(BaseHTTPRequestHandler):
+    """
+    Answers POST /v1/chat/completions with the prompt echoed back; the server's "failures"
+    list gives status codes to return before succeeding.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            server.connections.add(self.client_address)
+            status = server.failures.pop(0) if server.failures else 200
+        if status == 200:
+            prompt = body["messages"][-1]["content"]
+            payload = {
+                "id": "chatcmpl-stub", "object": "chat.completion", "created": 0, "model": body["model"],
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": f" Summary of {prompt[-12:]} "}}],
+            }
+        else:
+            payload = {"error": {"message": "stub failure", "type": "stub", "code": str(status)}}
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if status == 429:
+            self.send_header("Retry-After", "0")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestPooledOpenAIClient(unittest.TestCase):
+    """
+    Test suite for the pooled, rate-limited OpenAI client.
+    """
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubOpenAIHandler)
+        self.server.lock = threading.Lock()
+        self.server.requests = 0
+        self.server.connections = set()
+        self.server.failures = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def client(self, **kwargs):
+        return PooledOpenAIClient(api_key="test", base_url=self.base_url, **kwargs)
+
+    def test_retries_rate_limits_and_server_errors(self):
+        """
+        Test that 429 and 5xx responses are retried and the request then succeeds.
+        """
+        self.server.failures = [429, 503]
+        client = self.client()
+        with patch.object(openai_pool, "backoff_delay", return_value=0):
+            text = client.complete("scan results", model="gpt-test")
+        self.assertEqual(text, "Summary of scan results")
+        self.assertEqual(self.server.requests, 3)
+        self.assertEqual(client.stats()["retries"], 2)
+
+    def test_non_retryable_errors_and_exhausted_retries_raise(self):
+        """
+        Test that a 400 is raised at once and a persistent 500 after max_retries.
+        """
+        client = self.client(max_retries=2)
+        self.server.failures = [400]
+        with self.assertRaises(Exception):
+            client.complete("x", model="gpt-test")
+        self.assertEqual(self.server.requests, 1)
+
+        self.server.failures = [500] * 5
+        with patch.object(openai_pool, "backoff_delay", return_value=0), self.assertRaises(Exception):
+            client.complete("x", model="gpt-test")
+        self.assertEqual(self.server.requests, 4)
+        self.assertEqual(client.stats()["failures"], 2)
+
+    def test_batch_keeps_order_and_reuses_connections(self):
+        """
+        Test that a batch returns responses in request order, isolates failures, and is sent over
+        a pool of reused connections rather than one connection per request.
+        """
+        client = self.client(max_concurrency=4, max_retries=0)
+        self.server.failures = [400]
+        requests = [{"model": "gpt-test", "messages": [{"role": "user", "content": f"unit-{i:03d}"}]} for i in range(40)]
+        responses = client.submit_batch(requests)
+
+        self.assertEqual(len(responses), 40)
+        self.assertEqual(sum(isinstance(response, Exception) for response in responses), 1)
+        for i, response in enumerate(responses):
+            if not isinstance(response, Exception):
+                self.assertIn(f"unit-{i:03d}", response.choices[0].message.content)
+        self.assertLessEqual(len(self.server.connections), 8)
+
+    def test_batch_summaries_through_llm_assist(self):
+        """
+        Test that generate_summaries_with_openai summarizes every result set through the shared client.
+        """
+        client = self.client()
+        results = {f"sub-{i}": {"tag_policy": [{"resource_name": f"vm-{i}"}]} for i in range(5)}
+        with patch.object(llm_assist, "get_openai_client", return_value=client):
+            summaries = llm_assist.generate_summaries_with_openai(results, model="gpt-test", use_cache=False)
+        self.assertEqual(list(summaries), list(results))
+        self.assertTrue(all(summary.startswith("Summary of") for summary in summaries.values()))
+        self.assertEqual(self.server.requests, 5)
+
+    def test_token_bucket_paces_requests(self):
+        """
+        Test that the bucket allows a burst up to its capacity and then waits for refills.
+        """
+        now = [0.0]
+
+        def sleep(seconds):
+            now[0] += seconds
+
+        bucket = TokenBucket(rate=2, capacity=3, clock=lambda: now[0], sleep=sleep)
+        waits = [bucket.acquire() for _ in range(5)]
+        self.assertEqual(waits[:3], [0, 0, 0])
+        self.assertAlmostEqual(now[0], 1.0)
+        self.assertAlmostEqual(bucket.acquire(10), 1.5)
+
+    def test_backoff_is_jittered_and_honours_retry_after(self):
+        """
+        Test that delays stay under the exponential cap and Retry-After takes precedence.
+        """
+        delays = [backoff_delay(3) for _ in range(50)]
+        self.assertTrue(all(0 <= delay <= rate_limit.BACKOFF_BASE_SECONDS * 8 for delay in delays))
+        self.assertGreater(len(set(delays)), 1)
+        self.assertEqual(backoff_delay(3, retry_after=2.0), 2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+"""
+test_orchestrator.py
+
+Unit tests for the orchestrator module.
+Tests concurrent check execution, per-check timeouts (including exiting past a hung thread
+check), and error collection.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import time
+import threading
+import unittest
+import subprocess
+from src.compliance_checker.orchestrator import CheckSpec, run_checks, PROCESS
+
+
+def slow_check(seconds, value):
+    time.sleep(seconds)
+    return value
+
+
+def failing_check():
+    raise ValueError("resource listing failed")
+
+
+def count_resources(resources):
+    return len(resources)
+
+
+class TestOrchestrator(unittest.TestCase):
+    """
+    Test suite for orchestrator module.
+    """
+
+    def test_checks_run_concurrently(self):
+        """
+        Test that wall time is close to the slowest check, not the sum, across thread and process checks.
+        """
+        checks = [
+            CheckSpec("a", slow_check, args=(0.4, 1)),
+            CheckSpec("b", slow_check, args=(0.4, 2)),
+            CheckSpec("c", slow_check, kind=PROCESS, args=(0.4, {"email": []})),
+        ]
+        start = time.monotonic()
+        results, errors = run_checks(checks)
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertEqual(results, {"a": 1, "b": 2, "c": {"email": []}})
+        self.assertEqual(errors, {})
+
+    def test_timeouts_do_not_block_other_checks(self):
+        """
+        Test that timed-out checks are reported and abandoned while other results are collected.
+        """
+        checks = [
+            CheckSpec("fast", slow_check, args=(0, "ok")),
+            CheckSpec("slow_thread", slow_check, timeout=0.2, args=(2, "late")),
+            CheckSpec("slow_process", slow_check, kind=PROCESS, timeout=0.2, args=(30, "late")),
+        ]
+        start = time.monotonic()
+        results, errors = run_checks(checks)
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertEqual(results, {"fast": "ok"})
+        self.assertIn("timed out", errors["slow_thread"])
+        self.assertIn("timed out", errors["slow_process"])
+
+    def test_timed_out_thread_check_does_not_delay_exit(self):
+        """
+        Test that a process whose thread check timed out exits without waiting for the check.
+        """
+        script = (
+            "import sys, time; sys.path.insert(0, sys.argv[1]);"
+            "from compliance_checker.orchestrator import CheckSpec, run_checks;"
+            "print(run_checks([CheckSpec('hung', time.sleep, timeout=0.2, args=(30,))])[1])"
+        )
+        start = time.monotonic()
+        output = subprocess.run([sys.executable, "-c", script, os.path.join(os.path.dirname(__file__), '..', 'src')],
+                                capture_output=True, text=True, timeout=20).stdout
+        self.assertLess(time.monotonic() - start, 10)
+        self.assertIn("timed out after 0.2s", output)
+
+    def test_failures_are_collected(self):
+        """
+        Test that exceptions in thread and process checks are reported as errors.
+        """
+        checks = [
+            CheckSpec("thread_fail", failing_check),
+            CheckSpec("process_fail", failing_check, kind=PROCESS),
+        ]
+        results, errors = run_checks(checks)
+        self.assertEqual(results, {})
+        self.assertIn("resource listing failed", errors["thread_fail"])
+        self.assertIn("resource listing failed", errors["process_fail"])
+
+    def test_shared_input_is_produced_once(self):
+        """
+        Test that an input required by several checks is fetched once and passed to each of them.
+        """
+        calls = []
+        lock = threading.Lock()
+
+        def fetch_inventory():
+            with lock:
+                calls.append(1)
+            time.sleep(0.2)
+            return [{"name": "vm-1"}, {"name": "vm-2"}]
+
+        inputs = [CheckSpec("resource_inventory", fetch_inventory)]
+        checks = [
+            CheckSpec("infrastructure", count_resources, requires=("resource_inventory",)),
+            CheckSpec("tag_policy", count_resources, kind=PROCESS, requires=("resource_inventory",)),
+            CheckSpec("independent", slow_check, args=(0.2, "done")),
+        ]
+        start = time.monotonic()
+        results, errors = run_checks(checks, inputs=inputs)
+        self.assertLess(time.monotonic() - start, 0.8)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, {"infrastructure": 2, "tag_policy": 2, "independent": "done"})
+        self.assertEqual(errors, {})
+
+    def test_failed_input_fails_dependents_only(self):
+        """
+        Test that checks depending on a failed input fail, while unrelated checks still succeed
+        and unused inputs are never produced.
+        """
+        unused = []
+        inputs = [
+            CheckSpec("resource_inventory", failing_check),
+            CheckSpec("model_registry", lambda: unused.append(1)),
+        ]
+        checks = [
+            CheckSpec("infrastructure", count_resources, requires=("resource_inventory",)),
+            CheckSpec("pii_scan", slow_check, args=(0, {})),
+        ]
+        results, errors = run_checks(checks, inputs=inputs)
+        self.assertEqual(results, {"pii_scan": {}})
+        self.assertIn("input 'resource_inventory' unavailable", errors["infrastructure"])
+        self.assertEqual(unused, [])
+
+    def test_unknown_input_and_cycles_are_rejected(self):
+        """
+        Test that invalid dependency graphs raise ValueError before anything runs.
+        """
+        with self.assertRaises(ValueError):
+            run_checks([CheckSpec("infrastructure", count_resources, requires=("missing",))])
+        inputs = [CheckSpec("a", count_resources, requires=("b",)), CheckSpec("b", count_resources, requires=("a",))]
+        with self.assertRaises(ValueError):
+            run_checks([CheckSpec("check", count_resources, requires=("a",))], inputs=inputs)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+"""
+test_pii_index.py
+
+Unit tests for the pii_index module.
+Tests lookups across files, value normalization, that raw values are not stored, incremental
+updates of appended and replaced files, the key check and the Bloom filter.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import shutil
+import tempfile
+import unittest
+from src.compliance_checker.pii_index import PiiIndex, BloomFilter, normalize_value
+
+LOG = (
+    b"2025-01-01T00:00:00Z INFO login user=jane.doe@company.com\n"
+    b"2025-01-01T00:00:01Z INFO ssn=111-22-3333 status=ok\n"
+    b"2025-01-01T00:00:02Z INFO request completed status=200\n"
+)
+
+
+class TestPiiIndex(unittest.TestCase):
+    """
+    Test suite for the hashed PII occurrence index.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, "index", "pii.db")
+        self.index = PiiIndex(self.db_path, key=b"secret")
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def write(self, name, data, mode="wb"):
+        path = os.path.join(self.tmp_dir, name)
+        with open(path, mode) as f:
+            f.write(data)
+        return path
+
+    def test_lookup_returns_every_file_and_offset(self):
+        """
+        Test that a value is found at its byte offsets in every file, in any formatting, and
+        that values never seen are rejected.
+        """
+        first = self.write("a.log", LOG)
+        second = self.write("b.log", b"noise\n" + LOG)
+        stats = self.index.update([first, second])
+        self.assertEqual(stats["files_indexed"], 2)
+
+        occurrences = self.index.lookup("Jane.Doe@company.com")
+        offset = LOG.index(b"jane.doe")
+        self.assertEqual([(o["path"], o["offset"], o["label"]) for o in occurrences],
+                         [(first, offset, "email"), (second, offset + 6, "email")])
+        self.assertEqual(len(self.index.lookup("111 22 3333")), 2)
+        self.assertEqual(self.index.lookup("john@company.com"), [])
+        self.assertFalse(self.index.might_contain("john@company.com"))
+        self.assertEqual(normalize_value(b"(555) 123-4567"), b"5551234567")
+
+    def test_raw_values_are_not_stored(self):
+        """
+        Test that neither the database nor the Bloom filter contain the raw values.
+        """
+        self.index.update([self.write("a.log", LOG)])
+        for path in (self.db_path, self.db_path + ".bloom"):
+            with open(path, "rb") as f:
+                content = f.read()
+            self.assertNotIn(b"jane.doe", content)
+            self.assertNotIn(b"111-22-3333", content)
+
+    def test_incremental_updates(self):
+        """
+        Test that unchanged files are skipped, appended files are indexed from their last
+        incomplete line, and replaced files are re-indexed from the start.
+        """
+        path = self.write("app.log", LOG + b"partial user=bob@exa")
+        self.index.update([path])
+        self.assertEqual(self.index.update([path])["files_unchanged"], 1)
+
+        self.write("app.log", b"mple.com\nmore user=carol@example.com\n", mode="ab")
+        stats = self.index.update([path])
+        self.assertEqual(stats["files_appended"], 1)
+        self.assertEqual(stats["bytes_indexed"], len(b"partial user=bob@example.com\nmore user=carol@example.com\n"))
+        self.assertEqual(self.index.lookup("bob@example.com")[0]["offset"], len(LOG) + len(b"partial user="))
+        self.assertEqual(len(self.index.lookup("carol@example.com")), 1)
+        self.assertEqual(self.index.lookup("bob@exa"), [])
+
+        self.write("app.log", b"rotated user=dave@example.com\n" + LOG)
+        self.assertEqual(self.index.update([path])["files_reindexed"], 1)
+        self.assertEqual(self.index.lookup("carol@example.com"), [])
+        self.assertEqual(self.index.lookup("jane.doe@company.com")[0]["offset"], 30 + LOG.index(b"jane.doe"))
+
+        os.remove(path)
+        self.assertEqual(self.index.update([], prune_missing=True)["files_removed"], 1)
+        self.assertEqual(self.index.stats()["postings"], 0)
+
+    def test_reopen_checks_key_and_rebuilds_stale_bloom_filter(self):
+        """
+        Test that the index only opens with its key and that a missing Bloom filter is rebuilt.
+        """
+        self.index.update([self.write("a.log", LOG)])
+        with self.assertRaises(ValueError):
+            PiiIndex(self.db_path, key=b"other")
+        os.remove(self.db_path + ".bloom")
+        with PiiIndex(self.db_path, key="secret") as reopened:
+            self.assertEqual(len(reopened.lookup("jane.doe@company.com")), 1)
+            self.assertTrue(os.path.exists(self.db_path + ".bloom"))
+
+    def test_bloom_filter_round_trip_and_error_rate(self):
+        """
+        Test that the filter has no false negatives, few false positives, and survives serialization.
+        """
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        added = [os.urandom(16) for _ in range(1000)]
+        for digest in added:
+            bloom.add(digest)
+        restored, generation = BloomFilter.from_bytes(bloom.to_bytes(7))
+        self.assertEqual(generation, 7)
+        self.assertTrue(all(digest in restored for digest in added))
+        false_positives = sum(os.urandom(16) in restored for _ in range(5000))
+        self.assertLess(false_positives, 150)
+
+
+if __name__ == "__main__":
+    unittest.main()
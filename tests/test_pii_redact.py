@@ -0,0 +1,99 @@
+"""
+test_pii_redact.py
+
+Unit tests for the pii_redact module.
+Tests masking, stable HMAC tokens, chunked streaming and parallel redaction of several files.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import io
+import shutil
+import tempfile
+import unittest
+from collections import Counter
+from src.compliance_checker.pii_redact import Redactor, redact_stream, redact_files
+
+LOG = (
+    b"2025-01-01T00:00:00Z INFO login user=jane.doe@company.com\n"
+    b"2025-01-01T00:00:01Z INFO ssn=111-22-3333 card=4111 1111 1111 1111\n"
+    b"2025-01-01T00:00:02Z INFO request completed status=200\n"
+    b"2025-01-01T00:00:03Z INFO again jane.doe@company.com"
+)
+
+
+class TestPiiRedact(unittest.TestCase):
+    """
+    Test suite for PII redaction.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_mask_mode_replaces_values_by_label(self):
+        """
+        Test that every PII value is masked and the rest of each line is kept.
+        """
+        counts = Counter()
+        output = Redactor("mask").redact(LOG, counts)
+        self.assertEqual(output.split(b"\n")[0], b"2025-01-01T00:00:00Z INFO login user=[EMAIL]")
+        self.assertIn(b"ssn=[SSN] card=[CREDIT_CARD]", output)
+        self.assertIn(b"status=200\n", output)
+        self.assertNotIn(b"jane.doe", output)
+        self.assertEqual(counts, {"email": 2, "ssn": 1, "credit_card": 1})
+
+    def test_tokens_are_stable_per_value_and_key(self):
+        """
+        Test that a value gets the same token wherever it appears, and a different key gives different tokens.
+        """
+        first = Redactor("token", key=b"secret").redact(LOG).split(b"\n")
+        token = first[0].split(b"user=")[1]
+        self.assertRegex(token, rb"^\[EMAIL:[0-9a-f]{16}\]$")
+        self.assertTrue(first[3].endswith(token))
+        self.assertEqual(Redactor("token", key="secret").redact(LOG).split(b"\n")[0], first[0])
+        self.assertNotEqual(Redactor("token", key=b"other").redact(LOG).split(b"\n")[0], first[0])
+        with self.assertRaises(ValueError):
+            Redactor("token", key=b"")
+
+    def test_small_chunks_give_the_same_output(self):
+        """
+        Test that streaming in chunks (cut at line ends, with lines longer than a chunk) matches redacting at once.
+        """
+        redactor = Redactor("token", key=b"secret")
+        target = io.BytesIO()
+        stats = redact_stream(io.BytesIO(LOG), target, redactor, chunk_size=16)
+        self.assertEqual(target.getvalue(), redactor.redact(LOG))
+        self.assertEqual(stats["bytes"], len(LOG))
+        self.assertEqual(stats["redactions"]["email"], 2)
+
+    def test_redact_files_in_parallel_keeps_layout(self):
+        """
+        Test that several files are redacted by worker processes into the same relative layout.
+        """
+        inputs = []
+        for name in ("a/app.log", "b/app.log", "b/other.log"):
+            path = os.path.join(self.tmp_dir, "logs", name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(LOG)
+            inputs.append(path)
+        output_dir = os.path.join(self.tmp_dir, "redacted")
+
+        results = redact_files(inputs, output_dir, mode="mask", workers=2)
+
+        self.assertEqual([result["input"] for result in results], inputs)
+        self.assertEqual(results[1]["output"], os.path.join(output_dir, "b", "app.log"))
+        for result in results:
+            with open(result["output"], "rb") as f:
+                self.assertEqual(f.read(), Redactor("mask").redact(LOG))
+        self.assertFalse(any(name.endswith(".partial") for _, _, names in os.walk(output_dir) for name in names))
+
+
+if __name__ == "__main__":
+    unittest.main()
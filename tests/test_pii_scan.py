@@ -8,9 +8,18 @@ Tests detection of PII (Personally Identifiable Information) in text files using
 import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
 
+import json
+import random
+import shutil
 import tempfile
-from src.compliance_checker.pii_scan import scan_file
+from unittest.mock import patch
+from src.compliance_checker import pii_scan
+from src.compliance_checker.pii_scan import (
+    scan_file, scan_files, scan_text_for_pii, find_pii_spans, scan_json_lines, wilson_interval, sample_file, sample_files,
+    PII_PATTERNS,
+)
 
 def test_pii_scan_detects_nothing_in_clean_file():
     """
@@ -50,3 +59,140 @@ def test_pii_scan_detects_email_and_ssn():
     assert 'ssn' in result
     assert 'jane.doe@company.com' in result['email']
     assert '111-22-3333' in result['ssn']
+
+def test_find_pii_spans_matches_line_by_line_scan():
+    """
+    Test that the bytes matcher finds the same values as scanning each line with scan_text_for_pii.
+    """
+    content = (
+        "2025-01-01T00:00:00Z user=jane.doe@company.com phone=+61-412-345-678 status=200\n"
+        "ssn 111-22-3333 card 4111 1111 1111 1111 duration_ms=2053\n"
+        "2025-01-01T00:00:01Z no pii here req=123456"
+    )
+    data = content.encode()
+    spans = find_pii_spans(data)
+    assert spans == sorted(spans)
+
+    expected = {label: [] for label in PII_PATTERNS}
+    for line in content.split("\n"):
+        for label, matches in scan_text_for_pii(line).items():
+            expected[label].extend(matches)
+    found = {label: [data[start:end].decode() for start, end, span_label in spans if span_label == label]
+             for label in PII_PATTERNS}
+    assert found == expected
+    assert found["email"] == ["jane.doe@company.com"]
+    assert "111-22-3333" in found["ssn"]
+
+def test_wilson_interval_bounds():
+    """
+    Test the Wilson interval against known values, including zero observed successes.
+    """
+    low, high = wilson_interval(0, 650)
+    assert low == 0.0 and abs(high - 0.00588) < 1e-4
+    low, high = wilson_interval(50, 1000)
+    assert abs(low - 0.0381) < 1e-3 and abs(high - 0.0653) < 1e-3
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+
+def test_sample_files_estimates_prevalence_and_flags_files():
+    """
+    Test that sampling a file where 1% of lines hold an SSN brackets that rate, flags the file,
+    does not flag a large PII-free file, and reports the exact rate of a small file read in full
+    and lists it as containing PII.
+    """
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        pii_path = os.path.join(tmp_dir, "pii.log")
+        clean_path = os.path.join(tmp_dir, "clean.log")
+        small_path = os.path.join(tmp_dir, "small.log")
+        with open(pii_path, "w") as f:
+            for i in range(200_000):
+                f.write(f"line {i:06d} ssn=123-45-6789 ok\n" if i % 100 == 0 else f"line {i:06d} nothing to see here\n")
+        with open(clean_path, "w") as f:
+            f.write("request completed without incident\n" * 200_000)
+        with open(small_path, "w") as f:
+            f.write("Email: jane.doe@company.com\n")
+
+        estimate = sample_files([pii_path, clean_path, small_path], budget_bytes=2 * 2**20, block_size=16 * 1024,
+                                max_prevalence=0.01, seed=7)
+        samples = {sample["path"]: sample for sample in estimate["samples"]}
+
+        assert estimate["bytes_sampled"] < estimate["total_bytes"] / 2
+        pii_rate = samples[pii_path]["label_lines"]["ssn"] / samples[pii_path]["lines_sampled"]
+        assert abs(pii_rate - 0.01) < 0.004
+        ssn = estimate["prevalence"]["ssn"]
+        assert ssn["low"] <= ssn["rate"] <= ssn["high"]
+        assert samples[small_path]["exact"] and samples[small_path]["label_lines"]["email"] == 1
+        assert estimate["needs_full_scan"] == [pii_path]
+        assert samples[small_path]["low"] == samples[small_path]["high"] == 1.0
+        assert samples[clean_path]["low"] == 0.0 < samples[clean_path]["high"] <= 0.01
+        assert estimate["files_with_pii"] == [small_path]
+    finally:
+        shutil.rmtree(tmp_dir)
+
+def test_sample_file_samples_files_smaller_than_a_block_and_their_tail():
+    """
+    Test that a 20 KB file larger than the budget but smaller than one block is sampled as a
+    single block, and that the short block at the end of a file can be chosen.
+    """
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp_dir, "app.log")
+        with open(path, "w") as f:
+            f.write(f"line {0:06d} nothing to see here\n" * 650)
+            f.write("Email: jane.doe@company.com\n")
+        assert 16 * 1024 < os.path.getsize(path) < 32 * 1024
+
+        sample = sample_file(path, budget_bytes=100, block_size=32 * 1024, rng=random.Random(0))
+        assert not sample["exact"] and sample["bytes_sampled"] == os.path.getsize(path)
+
+        tails = [sample_file(path, budget_bytes=100, block_size=16 * 1024, rng=random.Random(seed))
+                 for seed in range(20)]
+        assert any(tail["label_lines"]["email"] == 1 for tail in tails)
+    finally:
+        shutil.rmtree(tmp_dir)
+
+JSON_LINES = [
+    json.dumps({"ts": "2025-01-01T00:00:00Z", "account_id": 935351532923, "user": {"id": 4387541014,
+               "email": "jane.doe@company.com"}, "message": "login ok"}),
+    json.dumps({"trace_id": "1234567890123456", "message": "card 4111 1111 1111 1111 charged",
+                "events": [{"note": "ssn 111-22-3333"}], "x-forwarded-for": "call +1 555-123-4567"}),
+    "not json: contact bob@example.com",
+]
+
+def test_scan_json_lines_reports_json_paths_and_skips_numbers():
+    """
+    Test that string values are matched with their JSON paths, numeric fields are not, invalid
+    lines are scanned as text, and the standard library parser gives the same findings.
+    """
+    findings = scan_json_lines(JSON_LINES)
+    assert findings["email"] == [
+        {"value": "jane.doe@company.com", "line": 1, "path": "$.user.email"},
+        {"value": "bob@example.com", "line": 3, "path": None},
+    ]
+    assert {"value": "111-22-3333", "line": 2, "path": "$.events[0].note"} in findings["ssn"]
+    assert "$['x-forwarded-for']" in {match["path"] for match in findings["phone"]}
+    assert "$.trace_id" in {match["path"] for match in findings["credit_card"]}
+    assert not any(match["line"] == 1 for match in findings["phone"] + findings["credit_card"])
+    with patch.object(pii_scan, "_json_loads", json.loads):
+        assert scan_json_lines(line.encode() for line in JSON_LINES) == findings
+
+def test_scan_json_lines_only_scans_selected_fields():
+    """
+    Test that field patterns match whole paths or last keys, and that JSON-lines files are
+    scanned field by field by scan_files.
+    """
+    findings = scan_json_lines(JSON_LINES, fields=["message", "*email*"])
+    assert [match["path"] for match in findings["email"]] == ["$.user.email", None]
+    assert [match["path"] for match in findings["credit_card"]] == ["$.message"]
+    assert findings["ssn"] == []
+    assert {match["path"] for match in findings["phone"]} == {"$.message"}
+    assert scan_json_lines(JSON_LINES, fields=["events.note"])["ssn"][0]["path"] == "$.events[0].note"
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp_dir, "app.jsonl")
+        with open(path, "w") as f:
+            f.write("\n".join(JSON_LINES[:2]) + "\n")
+        assert scan_files([path])["email"] == ["jane.doe@company.com"]
+    finally:
+        shutil.rmtree(tmp_dir)
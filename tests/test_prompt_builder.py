@@ -0,0 +1,105 @@
+"""
+test_prompt_builder.py
+
+Unit tests for the prompt_builder module.
+Tests that prompts stay within the token budget, that large results are compressed into
+statistics and examples, and that oversized results are summarized by map-reduce.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import threading
+import unittest
+from src.compliance_checker.prompt_builder import build_prompt, compress_results, estimate_tokens, summarize_results
+
+
+def _tag_findings(count):
+    return [
+        {"resource_name": f"vm-{i}", "resource_type": "Microsoft.Compute/virtualMachines" if i % 3 else "Microsoft.Storage/storageAccounts",
+         "missing_tags": ["owner", "env"] if i % 2 else ["owner"]}
+        for i in range(count)
+    ]
+
+
+class TestPromptBuilder(unittest.TestCase):
+    """
+    Test suite for token-budgeted prompt construction.
+    """
+
+    def test_small_results_are_sent_in_full(self):
+        """
+        Test that results within the budget are included as they are.
+        """
+        prompt = build_prompt({"tag_policy": _tag_findings(2)}, budget_tokens=1000)
+        self.assertIn('"resource_name": "vm-1"', prompt)
+        self.assertNotIn('"examples"', prompt)
+
+    def test_large_results_are_compressed_within_budget(self):
+        """
+        Test that large results are reduced to counts, common values and a few examples.
+        """
+        results = {"tag_policy": _tag_findings(20000), "model_audit": ["model-1: Model may be outdated"]}
+        prompt = build_prompt(results, budget_tokens=800)
+        self.assertLessEqual(estimate_tokens(prompt), 800)
+        self.assertIn('"count": 20000', prompt)
+        self.assertIn('"owner": 20000', prompt)
+        self.assertNotIn("vm-19999", prompt)
+
+        compressed = compress_results(results, top_n=2)
+        section = compressed["tag_policy"]["findings"]
+        self.assertEqual(section["common"]["missing_tags"], {"owner": 20000, "env": 10000})
+        self.assertNotIn("resource_name", section["common"])
+        self.assertEqual(len(section["examples"]), 2)
+
+    def test_map_reduce_when_compression_does_not_fit(self):
+        """
+        Test that results too large for one prompt are summarized in parallel chunks and reduced,
+        with no prompt over the budget.
+        """
+        results = {f"check_{i}": {"issues": _tag_findings(50), "note": "x" * 100} for i in range(40)}
+        self.assertIsNone(build_prompt(results, budget_tokens=600))
+
+        prompts = []
+        lock = threading.Lock()
+
+        def complete(prompt):
+            with lock:
+                prompts.append(prompt)
+            return "Partial summary." if "partial summaries" not in prompt else "Final summary."
+
+        summary, calls = summarize_results(results, complete, budget_tokens=600, max_workers=4)
+        self.assertEqual(summary, "Final summary.")
+        self.assertEqual(calls, len(prompts))
+        self.assertGreater(calls, 2)
+        self.assertTrue(all(estimate_tokens(prompt) <= 600 for prompt in prompts))
+        map_prompts = [prompt for prompt in prompts if "partial summaries" not in prompt]
+        self.assertTrue(all(any(f'"check_{i}"' in prompt for prompt in map_prompts) for i in range(40)))
+
+    def test_reduce_truncates_partial_summaries_that_do_not_fit_together(self):
+        """
+        Test that map-reduce finishes within the budget when partial summaries are too long to
+        combine, and that a budget too small to combine them is rejected.
+        """
+        results = {f"check_{i}": {"issues": _tag_findings(50), "note": "x" * 100} for i in range(40)}
+        prompts = []
+        lock = threading.Lock()
+
+        def complete(prompt):
+            with lock:
+                prompts.append(prompt)
+            return "Long partial summary \u00e9\n" * 200
+
+        summary, calls = summarize_results(results, complete, budget_tokens=600, max_workers=4)
+        self.assertTrue(summary.startswith("Long partial summary"))
+        self.assertEqual(calls, len(prompts))
+        self.assertTrue(all(estimate_tokens(prompt) <= 600 for prompt in prompts))
+
+        with self.assertRaises(ValueError):
+            summarize_results(results, complete, budget_tokens=100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+"""
+test_render.py
+
+Unit tests for the render module.
+Tests that one rendering pass produces consistent JSON, Markdown, HTML and JSON Lines reports,
+and that the sharded HTML report pages findings into JSON shards and replaces earlier uploads.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import json
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+from src.compliance_checker import render, report
+
+SAMPLE_RESULTS = {
+    "infrastructure": {
+        "summary": {"total": 2, "non_compliant": 1},
+        "non_compliant_resources": [
+            {"resource_name": "test-storage", "resource_type": "Microsoft.Storage/storageAccounts", "issues": ["Missing tag"]}
+        ],
+    },
+    "model_audit": ["Possible model bias detected."],
+    "tag_policy": [{"resource_name": "<vm-1>", "missing_tags": ["env"]}],
+    "pii_scan": {"email": ["test@example.com"], "phone": []},
+    "empty_check": [],
+}
+
+
+class TestRender(unittest.TestCase):
+    """
+    Test suite for single-pass multi-format rendering.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_json_sink_round_trips_results(self):
+        """
+        Test that the streamed JSON report loads back to the original results.
+        """
+        path = os.path.join(self.tmp_dir, "report.json")
+        render.render_report(SAMPLE_RESULTS, [render.JsonSink(path)])
+        with open(path, "r") as f:
+            self.assertEqual(json.load(f), SAMPLE_RESULTS)
+
+    def test_generate_reports_writes_consistent_formats(self):
+        """
+        Test that generate_reports writes every format with the same timestamp and findings.
+        """
+        with patch.object(report, "generate_summary_with_local_llama", return_value="All good."), \
+                patch.object(report, "AZURE_STORAGE_CONNECTION_STRING", None):
+            paths = report.generate_reports(SAMPLE_RESULTS, output_dir=self.tmp_dir,
+                                            formats=("json", "markdown", "html", "jsonl"))
+
+        contents = {}
+        for fmt, path in paths.items():
+            with open(path, "r") as f:
+                contents[fmt] = f.read()
+        timestamp = contents["markdown"].splitlines()[1][len("Generated: "):]
+        self.assertEqual(contents["markdown"], "\n".join(report.iter_markdown_lines(SAMPLE_RESULTS, timestamp)))
+        self.assertEqual(contents["html"], "\n".join(report.iter_html_lines(SAMPLE_RESULTS, "All good.", timestamp)))
+        self.assertIn("&lt;vm-1&gt;", contents["html"])
+        self.assertEqual(len(contents["jsonl"].splitlines()), len(list(report.iter_findings(SAMPLE_RESULTS))))
+        self.assertEqual(json.loads(contents["json"]), SAMPLE_RESULTS)
+
+    def test_generate_reports_rejects_unknown_format(self):
+        """
+        Test that an unknown format raises ValueError before anything is written.
+        """
+        with self.assertRaises(ValueError):
+            report.generate_reports(SAMPLE_RESULTS, output_dir=self.tmp_dir, formats=("pdf",))
+        self.assertEqual(os.listdir(self.tmp_dir), [])
+
+    def test_sharded_html_report_pages_findings(self):
+        """
+        Test that findings are split into shards of page_size with precomputed counts.
+        """
+        results = {"pii_scan": {"email": [f"user{i}@example.com" for i in range(25)], "ssn": []},
+                   "model_audit": []}
+        with patch.object(report, "generate_summary_with_local_llama", return_value="Summary."):
+            manifest = report.generate_sharded_html_report(results, output_dir=self.tmp_dir, page_size=10)
+
+        email = manifest["checks"][0]["sections"][0]
+        self.assertEqual((email["key"], email["count"], len(email["shards"])), ("email", 25, 3))
+        self.assertEqual(manifest["checks"][1]["count"], 0)
+        with open(os.path.join(self.tmp_dir, email["shards"][2]), "r") as f:
+            self.assertEqual(json.load(f)["findings"], [f"user{i}@example.com" for i in range(20, 25)])
+        with open(os.path.join(self.tmp_dir, "index.html"), "r") as f:
+            index = f.read()
+        self.assertIn("data-pages=\"3\"", index)
+        self.assertNotIn("user0@example.com", index)
+
+    def test_sharded_html_report_keeps_sections_with_alike_names_apart(self):
+        """
+        Test that checks whose names slugify to the same string get separate shards.
+        """
+        results = {"pii scan": ["a@example.com"], "pii_scan": ["b@example.com"]}
+        with patch.object(report, "generate_summary_with_local_llama", return_value="Summary."):
+            manifest = report.generate_sharded_html_report(results, output_dir=self.tmp_dir)
+
+        findings = []
+        for check in manifest["checks"]:
+            with open(os.path.join(self.tmp_dir, check["sections"][0]["shards"][0]), "r") as f:
+                findings.append(json.load(f)["findings"])
+        self.assertEqual(findings, [["a@example.com"], ["b@example.com"]])
+
+    def test_sharded_upload_deletes_shards_of_earlier_reports(self):
+        """
+        Test that uploading a sharded report publishes index.html last and then deletes the
+        stored shards the new manifest no longer references.
+        """
+        results = {"pii_scan": {"email": ["a@example.com"]}}
+        with patch.object(report, "generate_summary_with_local_llama", return_value="Summary."):
+            manifest = report.generate_sharded_html_report(results, output_dir=self.tmp_dir)
+        shard = f"report/{manifest['checks'][0]['sections'][0]['shards'][0]}"
+        container = MagicMock()
+        container.list_blobs.return_value = [SimpleNamespace(name=shard), SimpleNamespace(name="report/shards/0-old-email-0.json")]
+        uploaded = []
+
+        def upload(client, artifacts):
+            uploaded.append(sorted(artifacts))
+            return {name: report.UPLOADED for name in artifacts}
+
+        with patch.object(report, "AZURE_STORAGE_CONNECTION_STRING", "UseDevelopmentStorage=true"), \
+                patch.object(report, "get_container_client", return_value=container), \
+                patch.object(report, "upload_artifacts", side_effect=upload):
+            statuses = report.upload_sharded_report(self.tmp_dir)
+
+        self.assertEqual(uploaded, [sorted([shard, "report/manifest.json"]), ["report/index.html"]])
+        container.list_blobs.assert_called_once_with(name_starts_with="report/shards/")
+        container.delete_blob.assert_called_once_with("report/shards/0-old-email-0.json")
+        self.assertEqual(statuses["report/shards/0-old-email-0.json"], report.DELETED)
+
+
+if __name__ == "__main__":
+    unittest.main()
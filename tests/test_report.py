@@ -71,3 +71,30 @@ def test_generate_markdown_report_handles_empty_findings():
         content = f.read().lower()
     assert "# compliance report" in content
     os.remove(test_path)
+
+def test_generate_markdown_report_streams_lines(sample_findings):
+    """
+    Test that the streamed Markdown report matches the lines yielded by iter_markdown_lines.
+    """
+    test_path = "data/results/test_streamed_report.md"
+    report.generate_markdown_report(sample_findings, output_path=test_path)
+    with open(test_path, "r") as f:
+        content = f.read()
+    timestamp = content.splitlines()[1][len("Generated: "):]
+    assert content == "\n".join(report.iter_markdown_lines(sample_findings, timestamp))
+    os.remove(test_path)
+
+def test_export_findings_jsonl_writes_one_record_per_finding(sample_findings):
+    """
+    Test that export_findings_jsonl writes one JSON object per finding with its check and section.
+    """
+    import json
+    test_path = "data/results/test_findings.jsonl"
+    count = report.export_findings_jsonl(sample_findings, output_path=test_path)
+    with open(test_path, "r") as f:
+        records = [json.loads(line) for line in f]
+    os.remove(test_path)
+    assert count == len(records) == 5
+    assert not any(record["section"] == "summary" for record in records)
+    assert {"check": "pii_scan", "section": "email", "finding": "test@example.com"} in records
+    assert {"check": "model_audit", "section": None, "finding": "Possible model bias detected."} in records
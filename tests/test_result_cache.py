@@ -0,0 +1,105 @@
+"""
+test_result_cache.py
+
+Unit tests for the result_cache module.
+Tests cache hits and misses, LRU eviction, and skipping checks whose inputs are unchanged.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import time
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from src.compliance_checker.checks import build_checks, build_inputs, pii_scan, tag_policy
+from src.compliance_checker.result_cache import ResultCache, fingerprint_files, fingerprint_value
+from src.compliance_checker.orchestrator import CheckSpec, run_checks
+
+calls = []
+
+
+def count_lines(paths):
+    calls.append(paths)
+    total = 0
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            total += len(f.readlines())
+    return total
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = ResultCache(os.path.join(self.tmp_dir, "cache"))
+        calls.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_get_put_round_trip(self):
+        key = ResultCache.make_key("pii_scan", {"b": 1, "a": 2}, "abc")
+        self.assertEqual(key, ResultCache.make_key("pii_scan", {"a": 2, "b": 1}, "abc"))
+        self.assertEqual(self.cache.get(key), (False, None))
+        self.cache.put(key, {"email": ["a@example.com"]})
+        self.assertEqual(self.cache.get(key), (True, {"email": ["a@example.com"]}))
+        self.assertNotEqual(fingerprint_value([1, 2]), fingerprint_value([2, 1]))
+
+    def test_evicts_least_recently_used(self):
+        cache = ResultCache(os.path.join(self.tmp_dir, "small"), max_entries=2)
+        cache.put("a", 1)
+        time.sleep(0.01)
+        cache.put("b", 2)
+        time.sleep(0.01)
+        cache.get("a")
+        time.sleep(0.01)
+        cache.put("c", 3)
+        self.assertEqual(cache.get("b"), (False, None))
+        self.assertEqual(cache.get("a"), (True, 1))
+        self.assertEqual(cache.stats()["entries"], 2)
+
+    def test_unchanged_inputs_skip_the_check(self):
+        log_path = os.path.join(self.tmp_dir, "app.log")
+        with open(log_path, "w", encoding="utf-8") as f:
+            f.write("one\ntwo\n")
+        checks = [CheckSpec("lines", count_lines, args=([log_path],), cache_key=fingerprint_files)]
+
+        results, _ = run_checks(checks, cache=self.cache)
+        self.assertEqual(results, {"lines": 2})
+        results, _ = run_checks(checks, cache=self.cache)
+        self.assertEqual(results, {"lines": 2})
+        self.assertEqual(len(calls), 1)
+
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write("three\n")
+        results, _ = run_checks(checks, cache=self.cache)
+        self.assertEqual(results, {"lines": 3})
+        self.assertEqual(len(calls), 2)
+
+    def test_changed_detection_config_misses_the_cache(self):
+        """
+        Test that changing the PII patterns or required tags invalidates cached results of unchanged inputs.
+        """
+        log_path = os.path.join(self.tmp_dir, "app.log")
+        with open(log_path, "w", encoding="utf-8") as f:
+            f.write("contact jane.doe@company.com\n")
+        checks, inputs = build_checks(["pii_scan"]), build_inputs([log_path])
+
+        results, _ = run_checks(checks, inputs=inputs, cache=self.cache)
+        run_checks(checks, inputs=inputs, cache=self.cache)
+        self.assertEqual(self.cache.stats()["entries"], 1)
+        with patch.dict(pii_scan.PII_PATTERNS, {"ipv4": r"\b\d{1,3}(?:\.\d{1,3}){3}\b"}):
+            run_checks(checks, inputs=inputs, cache=self.cache)
+        self.assertEqual(self.cache.stats()["entries"], 2)
+        self.assertEqual(results["pii_scan"]["email"], ["jane.doe@company.com"])
+
+        first = tag_policy.policy_config()
+        with patch.object(tag_policy, "DEFAULT_REQUIRED_TAGS", ["env"]):
+            self.assertNotEqual(tag_policy.policy_config(), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+test_results_archive.py
+
+Unit tests for the results_archive module.
+Tests appending runs to the columnar archive, filtering by check, resource type and time range,
+and selecting columns.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import json
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from src.compliance_checker import results_archive
+
+VM = "Microsoft.Compute/virtualMachines"
+STORAGE = "Microsoft.Storage/storageAccounts"
+
+
+def make_results(vm_names):
+    return {
+        "tag_policy": [{"resource_name": name, "resource_type": VM, "missing_tags": ["env"]} for name in vm_names]
+                      + [{"resource_name": "sa-1", "resource_type": STORAGE, "missing_tags": ["owner"]}],
+        "pii_scan": {"email": ["a@example.com"], "ssn": []},
+    }
+
+
+@unittest.skipIf(results_archive.pa is None, "pyarrow is not installed")
+class TestResultsArchive(unittest.TestCase):
+    """
+    Test suite for the columnar results archive.
+    """
+
+    def setUp(self):
+        self.archive_dir = tempfile.mkdtemp()
+        start = datetime(2025, 3, 3, 6, tzinfo=timezone.utc)  # a Monday
+        for day in range(14):
+            results_archive.append_run(make_results([f"vm-{i}" for i in range(day % 3 + 1)]), self.archive_dir,
+                                       run_time=start + timedelta(days=day), run_id=f"run-{day}")
+
+    def tearDown(self):
+        shutil.rmtree(self.archive_dir)
+
+    def test_query_filters_by_check_resource_type_and_time(self):
+        """
+        Test that only findings matching every filter are returned.
+        """
+        table = results_archive.query_findings(
+            self.archive_dir, checks=["tag_policy"], resource_types=[VM],
+            start=datetime(2025, 3, 4), end=datetime(2025, 3, 6), columns=["run_id", "resource_name"])
+        self.assertEqual(sorted(table.column("run_id").to_pylist()), ["run-1", "run-1", "run-2", "run-2", "run-2"])
+        self.assertEqual(table.column_names, ["run_id", "resource_name"])
+
+    def test_query_partition_column_and_unknown_columns(self):
+        """
+        Test that the run_date partition column can be selected and unknown columns are rejected.
+        """
+        table = results_archive.query_findings(self.archive_dir, checks=["pii_scan"], end=datetime(2025, 3, 5),
+                                               columns=["run_id", "run_date"])
+        self.assertEqual(sorted(table.column("run_date").to_pylist()), ["2025-03-03", "2025-03-04"])
+        with self.assertRaises(ValueError):
+            results_archive.query_findings(self.archive_dir, columns=["run_day"])
+
+    def test_summary_sections_are_not_archived(self):
+        """
+        Test that single-value sections such as the infrastructure summary are not counted as findings.
+        """
+        rows = results_archive.findings_to_rows({"infrastructure": {
+            "summary": {"total": 10, "non_compliant": 1},
+            "non_compliant_resources": [{"resource_name": "vm-1", "resource_type": VM}]}})
+        self.assertEqual((rows["section"], rows["resource_name"]), (["non_compliant_resources"], ["vm-1"]))
+
+    def test_count_per_week(self):
+        """
+        Test weekly finding counts and distinct resource counts.
+        """
+        filters = {"checks": ["tag_policy"], "resource_types": [VM]}
+        self.assertEqual(results_archive.count_per_period(self.archive_dir, "week", **filters),
+                         {"2025-03-03": 13, "2025-03-10": 14})
+        self.assertEqual(results_archive.count_per_period(self.archive_dir, "week", distinct_resources=True, **filters),
+                         {"2025-03-03": 3, "2025-03-10": 3})
+
+    def test_import_json_reports(self):
+        """
+        Test that exported JSON reports are imported with the run time from their filename.
+        """
+        reports_dir = tempfile.mkdtemp()
+        path = os.path.join(reports_dir, "compliance_report_20250401_120000.json")
+        with open(path, "w") as f:
+            json.dump(make_results(["vm-9"]), f)
+        self.assertEqual(results_archive.import_json_reports([path], self.archive_dir), 1)
+        shutil.rmtree(reports_dir)
+        table = results_archive.query_findings(self.archive_dir, start=datetime(2025, 4, 1))
+        self.assertEqual(set(table.column("resource_name").to_pylist()), {"vm-9", "sa-1", None})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+"""
+test_run_history.py
+
+Unit tests for the run_history module.
+Tests stable (and, for PII, keyed) finding fingerprints, diffs between runs and the changes section in reports.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+from src.compliance_checker.result_cache import fingerprint_value
+from src.compliance_checker.run_history import RunHistory, finding_fingerprint, redact_finding, _ONLY_IN_QUERY
+from src.compliance_checker import report
+
+
+def make_results(untagged, emails):
+    return {
+        "tag_policy": [{"resource_name": name, "missing_tags": ["env"]} for name in untagged],
+        "pii_scan": {"email": emails, "ssn": []},
+    }
+
+
+class TestRunHistory(unittest.TestCase):
+    """
+    Test suite for the SQLite run history.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.history = RunHistory(os.path.join(self.tmp_dir, "runs.db"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_fingerprint_ignores_key_order(self):
+        """
+        Test that the same finding gets the same fingerprint regardless of dict key order.
+        """
+        self.assertEqual(finding_fingerprint("tag_policy", None, {"a": 1, "b": [2]}),
+                         finding_fingerprint("tag_policy", None, {"b": [2], "a": 1}))
+        self.assertNotEqual(finding_fingerprint("tag_policy", None, {"a": 1}),
+                            finding_fingerprint("infrastructure", None, {"a": 1}))
+
+    def test_tag_violations_are_told_apart_by_resource_id(self):
+        """
+        Test that same-named resources in different resource groups are separate findings, and
+        that violations recorded before resource ids existed still match the same violation with an id.
+        """
+        def violation(group=None):
+            finding = {"resource_name": "vm", "resource_type": "Microsoft.Compute/virtualMachines", "missing_tags": ["env"]}
+            if group:
+                finding["resource_id"] = f"/subscriptions/sub/resourceGroups/{group}/providers/Microsoft.Compute/virtualMachines/vm"
+            return finding
+
+        self.history.record_run({"tag_policy": [violation("a"), violation("b")]})
+        diff = self.history.record_and_diff({"tag_policy": [violation("a")]})
+        self.assertEqual((diff["resolved"], diff["persisting"]),
+                         ([{"check": "tag_policy", "section": None, "finding": violation("b")}], 1))
+
+        legacy = RunHistory(os.path.join(self.tmp_dir, "legacy.db"))
+        legacy.record_run({"tag_policy": [violation(), dict(violation(), resource_name="vm-2")]})
+        diff = legacy.record_and_diff({"tag_policy": [violation("a")]})
+        self.assertEqual((diff["new"], diff["persisting"]), ([], 1))
+        self.assertEqual([record["finding"]["resource_name"] for record in diff["resolved"]], ["vm-2"])
+
+    def test_diff_runs_reports_new_resolved_and_persisting(self):
+        """
+        Test that diffing two runs splits findings into new, resolved and persisting.
+        """
+        self.assertIsNone(self.history.record_and_diff(make_results(["vm-1", "vm-2"], ["a@example.com"])))
+        diff = self.history.record_and_diff(make_results(["vm-2", "vm-3"], ["a@example.com", "b@example.com"]))
+
+        self.assertEqual(diff["new"], [
+            {"check": "pii_scan", "section": "email", "finding": "[EMAIL]"},
+            {"check": "tag_policy", "section": None, "finding": {"resource_name": "vm-3", "missing_tags": ["env"]}},
+        ])
+        self.assertEqual(diff["resolved"], [
+            {"check": "tag_policy", "section": None, "finding": {"resource_name": "vm-1", "missing_tags": ["env"]}},
+        ])
+        self.assertEqual(diff["persisting"], 2)
+        self.assertEqual([run["finding_count"] for run in self.history.list_runs()], [4, 3])
+
+    def test_pii_values_are_not_stored(self):
+        """
+        Test that PII values are masked in the database but distinct values still count as distinct findings.
+        """
+        self.history.record_run(make_results([], ["a@example.com", "b@example.com"]))
+        with sqlite3.connect(self.history.db_path) as connection:
+            stored = [row[0] for row in connection.execute("SELECT finding FROM findings")]
+        self.assertEqual(stored, ['"[EMAIL]"', '"[EMAIL]"'])
+        self.assertEqual(redact_finding({"note": "ssn 111-22-3333", "count": 1234567890123}),
+                         {"note": "ssn [SSN]", "count": 1234567890123})
+
+    def test_pii_fingerprints_are_keyed(self):
+        """
+        Test that findings with PII are fingerprinted under the history's key, never by a plain
+        hash of the value, and that the generated key file is readable by the owner only.
+        """
+        self.history.record_run(make_results([], ["111-22-3333"]))
+        with sqlite3.connect(self.history.db_path) as connection:
+            stored = [row[0] for row in connection.execute("SELECT fingerprint FROM findings")]
+        self.assertEqual(stored, [finding_fingerprint("pii_scan", "email", "111-22-3333", self.history.key)])
+        self.assertNotEqual(stored[0], fingerprint_value(["pii_scan", "email", "111-22-3333"])[:32])
+        self.assertNotEqual(stored[0], finding_fingerprint("pii_scan", "email", "111-22-3333", b"other key"))
+        with self.assertRaises(ValueError):
+            finding_fingerprint("pii_scan", "email", "111-22-3333")
+
+        key_path = self.history.db_path + ".key"
+        self.assertEqual(os.stat(key_path).st_mode & 0o777, 0o600)
+        self.assertEqual(RunHistory(self.history.db_path).key, self.history.key)
+        with patch.dict(os.environ, {"PII_TOKEN_KEY": "from-env"}):
+            self.assertEqual(RunHistory(self.history.db_path).key, b"from-env")
+
+    def test_summary_sections_are_not_findings(self):
+        """
+        Test that runs differing only in a summary count show no changes.
+        """
+        def infrastructure(total):
+            return {"infrastructure": {"summary": {"total": total, "non_compliant": 1},
+                                       "non_compliant_resources": [{"resource_name": "vm-1"}]}}
+
+        self.history.record_run(infrastructure(10))
+        diff = self.history.record_and_diff(infrastructure(11))
+        self.assertEqual((diff["new"], diff["resolved"], diff["persisting"]), ([], [], 1))
+
+    def test_diff_query_uses_index(self):
+        """
+        Test that the anti-join looks findings up by primary key instead of scanning.
+        """
+        with sqlite3.connect(self.history.db_path) as connection:
+            plan = " ".join(row[-1] for row in connection.execute("EXPLAIN QUERY PLAN " + _ONLY_IN_QUERY, (2, 1)))
+        self.assertIn("USING PRIMARY KEY", plan)
+
+    def test_markdown_report_includes_changes_section(self):
+        """
+        Test that a diff is rendered as a changes section in the Markdown report.
+        """
+        self.history.record_run(make_results(["vm-1"], []))
+        diff = self.history.record_and_diff(make_results(["vm-2"], []))
+        path = os.path.join(self.tmp_dir, "report.md")
+        report.generate_markdown_report(make_results(["vm-2"], []), output_path=path, diff=diff)
+        with open(path, "r") as f:
+            content = f.read()
+        self.assertIn("## Changes Since Previous Run", content)
+        self.assertIn("1 new, 1 resolved, 0 persisting", content)
+        self.assertIn("- [tag_policy] resource_name: vm-2, missing_tags: ['env']", content)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+test_summary_cache.py
+
+Unit tests for the summary_cache module.
+Tests result canonicalization, the two cache levels, and that cached summaries skip inference.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+from src.compliance_checker import llm_assist
+from src.compliance_checker.summary_cache import SummaryCache, summary_key
+
+
+class TestSummaryCache(unittest.TestCase):
+    """
+    Test suite for the executive summary cache.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_key_ignores_order_and_timestamps(self):
+        """
+        Test that reordered findings and new timestamps give the same key, but new findings do not.
+        """
+        first = {"pii_scan": {"email": ["a@x.com", "b@x.com"]}, "timestamp": "2025-01-01T00:00:00Z"}
+        second = {"timestamp": "2025-01-02T00:00:00Z", "pii_scan": {"email": ["b@x.com", "a@x.com"]}}
+        changed = {"pii_scan": {"email": ["a@x.com", "c@x.com"]}}
+        self.assertEqual(summary_key(first, "llama", 1), summary_key(second, "llama", 1))
+        self.assertNotEqual(summary_key(first, "llama", 1), summary_key(changed, "llama", 1))
+        self.assertNotEqual(summary_key(first, "llama", 1), summary_key(first, "llama", 2))
+
+    def test_disk_level_survives_new_cache_and_memory_is_bounded(self):
+        """
+        Test that summaries persist on disk across cache instances and the memory level is an LRU.
+        """
+        cache = SummaryCache(self.tmp_dir, memory_entries=2)
+        for key in ("a", "b", "c"):
+            cache.put(key, f"summary {key}")
+        self.assertEqual(list(cache._memory), ["b", "c"])
+        self.assertEqual(SummaryCache(self.tmp_dir).get("a"), "summary a")
+
+    def test_unchanged_results_skip_inference(self):
+        """
+        Test that the second summary of unchanged results does not call the model.
+        """
+        manager = MagicMock()
+        manager.generate.return_value = {"choices": [{"text": " All resources compliant. "}]}
+        results = {"tag_policy": [{"resource_name": "vm-1", "missing_tags": ["env"]}]}
+        with patch.object(llm_assist, "get_summary_cache", return_value=SummaryCache(self.tmp_dir)), \
+                patch.object(llm_assist, "Llama", object()), \
+                patch.object(llm_assist, "get_model_manager", return_value=manager):
+            first = llm_assist.generate_summary_with_local_llama(results)
+            second = llm_assist.generate_summary_with_local_llama(dict(results))
+        self.assertEqual(first, second)
+        self.assertEqual(first, "All resources compliant.")
+        self.assertEqual(manager.generate.call_count, 1)
+
+
+    def test_models_with_the_same_file_name_do_not_share_summaries(self):
+        """
+        Test that models in different folders with the same file name, and a model replaced in
+        place, each get their own summary.
+        """
+        paths = []
+        for folder in ("a", "b"):
+            os.makedirs(os.path.join(self.tmp_dir, folder))
+            paths.append(os.path.join(self.tmp_dir, folder, "model.gguf"))
+            with open(paths[-1], "wb") as f:
+                f.write(b"weights")
+        manager = MagicMock()
+        manager.generate.return_value = {"choices": [{"text": "Summary."}]}
+        results = {"tag_policy": [{"resource_name": "vm-1", "missing_tags": ["env"]}]}
+        with patch.object(llm_assist, "get_summary_cache", return_value=SummaryCache(os.path.join(self.tmp_dir, "cache"))), \
+                patch.object(llm_assist, "Llama", object()), \
+                patch.object(llm_assist, "get_model_manager", return_value=manager):
+            for path in paths:
+                llm_assist.generate_summary_with_local_llama(results, model_path=path)
+            with open(paths[0], "wb") as f:
+                f.write(b"new weights")
+            llm_assist.generate_summary_with_local_llama(results, model_path=paths[0])
+            llm_assist.generate_summary_with_local_llama(results, model_path=paths[0])
+        self.assertEqual(manager.generate.call_count, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
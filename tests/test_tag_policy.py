@@ -10,7 +10,7 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import unittest
-from src.compliance_checker.tag_policy import check_required_tags
+from src.compliance_checker.tag_policy import check_required_tags, run_tag_policy_check
 
 class TestTagPolicy(unittest.TestCase):
     """
@@ -66,5 +66,26 @@ class TestTagPolicy(unittest.TestCase):
         for v in violations:
             self.assertListEqual(v["missing_tags"], custom_required)
 
+    def test_run_tag_policy_check_uses_given_inventory(self):
+        """
+        Test that run_tag_policy_check evaluates a provided resource inventory instead of sample data.
+        """
+        violations = run_tag_policy_check(self.resources[:1])
+        self.assertEqual(violations, [{
+            "resource_name": "vm-prod-1",
+            "resource_type": "Microsoft.Compute/virtualMachines",
+            "missing_tags": ["cost_center"]
+        }])
+
+    def test_check_required_tags_includes_resource_id_when_known(self):
+        """
+        Test that violations carry the resource id when the inventory has one, for remediation.
+        """
+        resource_id = "/subscriptions/sub/resourceGroups/rg/providers/Microsoft.Compute/virtualMachines/vm-1"
+        resources = [{"id": resource_id, "name": "vm-1", "type": "Microsoft.Compute/virtualMachines", "tags": {"env": "dev"}}]
+        violations = check_required_tags(resources, ["env", "owner"])
+        self.assertEqual(violations[0]["resource_id"], resource_id)
+        self.assertNotIn("resource_id", check_required_tags(self.resources)[0])
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,187 @@
+"""
+test_tag_remediation.py
+
+Unit tests for the tag_remediation module.
+Builds plans from tag policy violations and applies them against a local fake of the Azure
+Resource Manager tags endpoint, testing Merge updates, bounded concurrency, retries on
+throttling and resuming from the progress file.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import json
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from azure.core.credentials import AccessToken
+from src.compliance_checker import tag_remediation
+from src.compliance_checker.tag_remediation import TagRemediator, build_plan, plan_diff
+
+TAGS_SUFFIX = "/providers/Microsoft.Resources/tags/default"
+
+
+def resource_id(name):
+    return f"/subscriptions/sub-1/resourceGroups/rg/providers/Microsoft.Compute/virtualMachines/{name}"
+
+
+class FakeArmHandler(BaseHTTPRequestHandler):
+    """
+    Answers PATCH <resource id>/providers/Microsoft.Resources/tags/default by merging the tags
+    into the server's "tags"; the server's "failures" map gives status codes to return for a
+    resource before succeeding.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def do_PATCH(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        target = self.path.split("?")[0][:-len(TAGS_SUFFIX)]
+        with server.lock:
+            server.requests.append(target)
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            failures = server.failures.get(target, [])
+            status = failures.pop(0) if failures else 200
+        time.sleep(0.005)
+        if self.headers["Authorization"] != "Bearer fake-token" or "api-version=2021-04-01" not in self.path:
+            status = 401
+        if status == 200:
+            assert body["operation"] == "Merge"
+            with server.lock:
+                tags = server.tags.setdefault(target, {})
+                tags.update(body["properties"]["tags"])
+                payload = {"id": target + TAGS_SUFFIX, "name": "default", "properties": {"tags": dict(tags)}}
+        else:
+            payload = {"error": {"code": "Failure", "message": f"status {status}"}}
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if status == 429:
+            self.send_header("Retry-After", "0")
+        self.end_headers()
+        self.wfile.write(data)
+        with server.lock:
+            server.in_flight -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeCredential:
+    def get_token(self, *scopes):
+        return AccessToken("fake-token", int(time.time()) + 3600)
+
+
+class TestTagRemediation(unittest.TestCase):
+    """
+    Test suite for batched tag remediation.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeArmHandler)
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.server.in_flight = self.server.max_in_flight = 0
+        self.server.failures = {}
+        self.server.tags = {}
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.endpoint = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.violations = [
+            {"resource_name": f"vm-{i}", "resource_type": "Microsoft.Compute/virtualMachines",
+             "missing_tags": ["env", "owner"], "resource_id": resource_id(f"vm-{i}")}
+            for i in range(30)
+        ]
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.tmp_dir)
+
+    def remediator(self, **kwargs):
+        return TagRemediator(credential=FakeCredential(), endpoint=self.endpoint, **kwargs)
+
+    def test_build_plan_and_dry_run_diff(self):
+        """
+        Test that values come from overrides before defaults, and that violations without an id
+        or a value are reported as unresolved.
+        """
+        violations = self.violations[:2] + [
+            {"resource_name": "vm-x", "resource_type": "t", "missing_tags": ["env"]},
+            {"resource_name": "vm-0", "resource_type": "t", "missing_tags": ["cost_center"], "resource_id": resource_id("vm-0")},
+        ]
+        plan = build_plan(violations, {"env": "dev", "owner": "platform"}, overrides={"vm-1": {"env": "prod"}})
+        self.assertEqual(plan["patches"], [
+            {"resource_id": resource_id("vm-0"), "resource_name": "vm-0", "tags": {"env": "dev", "owner": "platform"}},
+            {"resource_id": resource_id("vm-1"), "resource_name": "vm-1", "tags": {"env": "prod", "owner": "platform"}},
+        ])
+        self.assertEqual([item["reason"] for item in plan["unresolved"]], ["no resource id", "no value for tags: cost_center"])
+        diff = plan_diff(plan)
+        self.assertIn(f"~ {resource_id('vm-1')}\n    + env = \"prod\"\n    + owner = \"platform\"", diff)
+        self.assertTrue(diff.endswith("2 resource(s), 4 tag(s) to add; 2 unresolved"))
+        self.assertEqual(self.server.requests, [])
+
+    def test_cli_rejects_tag_without_value(self):
+        """
+        Test that --tag without KEY=VALUE is reported as a usage error before anything is loaded.
+        """
+        for tag in ("env", "=dev"):
+            with patch.object(sys, "argv", ["tag_remediation.py", "--tag", tag]), \
+                    patch.object(tag_remediation, "_load_violations") as load, \
+                    patch("sys.stderr"), self.assertRaises(SystemExit) as raised:
+                tag_remediation.main()
+            self.assertEqual(raised.exception.code, 2)
+            load.assert_not_called()
+
+    def test_apply_merges_tags_with_bounded_concurrency_and_retries(self):
+        """
+        Test that every patch is merged into the resource's tags, at most max_concurrency requests
+        are in flight, and throttled or failed requests are retried.
+        """
+        self.server.tags[resource_id("vm-0")] = {"keep": "me"}
+        self.server.failures = {resource_id("vm-3"): [429, 503], resource_id("vm-7"): [429]}
+        plan = build_plan(self.violations, {"env": "dev", "owner": "platform"})
+        remediator = self.remediator(max_concurrency=4)
+        with patch.object(tag_remediation, "backoff_delay", return_value=0):
+            result = remediator.apply(plan, state_path=None, batch_size=8)
+
+        self.assertEqual((result["applied"], result["skipped"], result["failed"]), (30, 0, []))
+        self.assertEqual(self.server.tags[resource_id("vm-0")], {"keep": "me", "env": "dev", "owner": "platform"})
+        self.assertTrue(all(tags["env"] == "dev" for tags in self.server.tags.values()))
+        self.assertLessEqual(self.server.max_in_flight, 4)
+        self.assertGreater(self.server.max_in_flight, 1)
+        self.assertEqual(result["stats"], {"requests": 33, "retries": 3, "throttled": 2})
+
+    def test_apply_resumes_from_state_file(self):
+        """
+        Test that a failed patch is reported and left pending, and a second run sends only what
+        was not done, skipping patches already recorded in the state file.
+        """
+        state_path = os.path.join(self.tmp_dir, "state", "tags.json")
+        self.server.failures = {resource_id("vm-5"): [403]}
+        plan = build_plan(self.violations, {"env": "dev", "owner": "platform"})
+
+        first = self.remediator().apply(plan, state_path=state_path, batch_size=10)
+        self.assertEqual(first["applied"], 29)
+        self.assertEqual([failure["resource_id"] for failure in first["failed"]], [resource_id("vm-5")])
+        self.assertIn("403", first["failed"][0]["error"])
+
+        self.server.requests.clear()
+        second = self.remediator().apply(plan, state_path=state_path, batch_size=10)
+        self.assertEqual((second["applied"], second["skipped"], second["failed"]), (1, 29, []))
+        self.assertEqual(self.server.requests, [resource_id("vm-5")])
+
+        changed = build_plan(self.violations[:1], {"env": "prod", "owner": "platform"})
+        self.assertEqual(self.remediator().apply(changed, state_path=state_path)["applied"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
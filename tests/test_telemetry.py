@@ -0,0 +1,154 @@
+"""
+test_telemetry.py
+
+Unit tests for the telemetry module.
+Tests per-check metrics collection through the orchestrator and JSON/Prometheus export.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import json
+import shutil
+import tempfile
+import time
+import threading
+import tracemalloc
+import unittest
+from src.compliance_checker.orchestrator import CheckSpec, run_checks, PROCESS
+from compliance_checker.telemetry import Telemetry, stage, instrumented_call
+
+
+def staged_check(resources):
+    with stage("prepare"):
+        names = [r["name"] for r in resources]
+    for _ in range(2):
+        with stage("evaluate"):
+            sorted(names)
+    return len(names)
+
+
+def failing_check():
+    raise RuntimeError("boom")
+
+
+class TestTelemetry(unittest.TestCase):
+    """
+    Test suite for telemetry module.
+    """
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir)
+
+    def run_instrumented(self, **telemetry_options):
+        telemetry = Telemetry(**telemetry_options)
+        inputs = [CheckSpec("resource_inventory", lambda: [{"name": "vm-1"}, {"name": "vm-2"}],
+                            count_items=lambda resources: {"resources": len(resources)})]
+        checks = [
+            CheckSpec("infrastructure", staged_check, requires=("resource_inventory",),
+                      count_items=lambda result, resources: {"resources": len(resources)}),
+            CheckSpec("pii_scan", staged_check, kind=PROCESS, requires=("resource_inventory",)),
+            CheckSpec("model_audit", failing_check),
+        ]
+        results, errors = run_checks(checks, inputs=inputs, telemetry=telemetry)
+        return telemetry, results, errors
+
+    def test_metrics_recorded_per_check_and_stage(self):
+        """
+        Test that wall/CPU time, memory, items, throughput and stages are recorded for thread and process checks.
+        """
+        telemetry, results, errors = self.run_instrumented()
+        self.assertEqual(results, {"infrastructure": 2, "pii_scan": 2})
+        self.assertIn("model_audit", errors)
+
+        checks = telemetry.to_dict()["checks"]
+        infra = checks["infrastructure"]
+        self.assertEqual(infra["status"], "succeeded")
+        self.assertEqual(infra["kind"], "check")
+        self.assertGreaterEqual(infra["wall_seconds"], 0)
+        self.assertIsNotNone(infra["peak_memory_bytes"])
+        self.assertEqual(infra["items"], {"resources": 2})
+        self.assertIn("resources", infra["throughput_per_second"])
+        self.assertEqual(infra["stages"]["evaluate"]["calls"], 2)
+        self.assertEqual(checks["pii_scan"]["executor"], PROCESS)
+        self.assertIn("prepare", checks["pii_scan"]["stages"])
+        self.assertEqual(checks["resource_inventory"]["kind"], "input")
+        self.assertEqual(checks["model_audit"]["status"], "failed")
+
+    def test_peak_memory_is_reset_between_sequential_checks(self):
+        """
+        Test that a check's peak does not include a larger peak reached before it started, and
+        that tracing started by the caller is left running.
+        """
+        tracemalloc.start()
+        try:
+            instrumented_call("large", lambda: len(bytearray(20 * 2**20)), trace_memory=True)
+            _, metrics = instrumented_call("small", lambda: len(bytearray(2**20)), trace_memory=True)
+            self.assertTrue(tracemalloc.is_tracing())
+        finally:
+            tracemalloc.stop()
+        self.assertLess(metrics["peak_memory_bytes"], 10 * 2**20)
+        self.assertEqual(metrics["peak_memory_scope"], "check")
+
+    def test_overlapping_checks_report_process_peak_and_profile_in_turn(self):
+        """
+        Test that checks overlapping in threads have their peak labelled process-wide, and that
+        profiled checks in threads do not run their profilers at the same time.
+        """
+        started, metrics = threading.Event(), {}
+
+        def hold():
+            started.set()
+            time.sleep(0.2)
+
+        first = threading.Thread(target=lambda: metrics.setdefault("first", instrumented_call("first", hold, trace_memory=True)[1]))
+        first.start()
+        started.wait(1)
+        metrics["second"] = instrumented_call("second", lambda: None, trace_memory=True)[1]
+        first.join()
+        self.assertEqual((metrics["first"]["peak_memory_scope"], metrics["second"]["peak_memory_scope"]), ("process", "process"))
+        self.assertFalse(tracemalloc.is_tracing())
+
+        profile_dir = os.path.join(self.output_dir, "profiles")
+        windows = []
+
+        def profiled(name):
+            def check():
+                windows.append((name, "start", time.monotonic()))
+                time.sleep(0.1)
+                windows.append((name, "end", time.monotonic()))
+            instrumented_call(name, check, profile_dir=profile_dir)
+
+        threads = [threading.Thread(target=profiled, args=(f"check_{i}",)) for i in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([event for _, event, _ in windows], ["start", "end"] * 3)
+        self.assertEqual(len(os.listdir(profile_dir)), 3)
+
+    def test_export_json_prometheus_and_profiles(self):
+        """
+        Test that metrics are written as JSON and Prometheus text, with a cProfile dump per check.
+        """
+        profile_dir = os.path.join(self.output_dir, "profiles")
+        telemetry, _, _ = self.run_instrumented(profile_dir=profile_dir)
+        json_path, prom_path = telemetry.write(self.output_dir)
+
+        with open(json_path) as f:
+            self.assertIn("infrastructure", json.load(f)["checks"])
+        with open(prom_path) as f:
+            prom = f.read()
+        self.assertIn("# TYPE compliance_check_wall_seconds gauge", prom)
+        self.assertIn('compliance_check_success{check="model_audit"} 0', prom)
+        self.assertIn('compliance_check_items{check="infrastructure",unit="resources"} 2', prom)
+        self.assertIn('compliance_stage_wall_seconds{check="infrastructure",stage="evaluate"}', prom)
+        self.assertTrue(os.path.exists(os.path.join(profile_dir, "infrastructure.prof")))
+        self.assertTrue(os.path.exists(os.path.join(profile_dir, "pii_scan.prof")))
+
+if __name__ == "__main__":
+    unittest.main()